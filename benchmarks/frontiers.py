@@ -0,0 +1,100 @@
+"""Frontier microbenchmark
+
+Runs DFS and BFS on open square grids of increasing size, once with the
+list based frontiers the solver used to have and once with the current ones.
+Time per expanded node stays flat for a linear frontier and grows with the
+grid for a quadratic one.
+
+Usage:
+    $ python benchmarks/frontiers.py [--sizes 125 250 500 1000] [--legacy-max 100]
+"""
+import argparse
+import contextlib
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import solver
+
+from grid import Grid
+from solver import Solver
+
+
+class LegacyStackFrontier:
+    """List based stack frontier, as it was before the deque implementation."""
+    def __init__(self):
+        self.list = []
+
+    def add(self, node):
+        self.list.append(node)
+
+    def contains_state(self, state):
+        return any(node.state == state for node in self.list)
+
+    def empty(self):
+        return len(self.list) == 0
+
+    def remove(self):
+        node = self.list[-1]
+        self.list = self.list[:-1]
+        return node
+
+
+class LegacyQueueFrontier(LegacyStackFrontier):
+    """List based queue frontier, as it was before the deque implementation."""
+    def remove(self):
+        node = self.list[0]
+        self.list = self.list[1:]
+        return node
+
+
+@contextlib.contextmanager
+def legacy_frontiers():
+    """Temporarily make the solver use the list based frontiers."""
+    stack, queue = solver.StackFrontier, solver.QueueFrontier
+    solver.StackFrontier, solver.QueueFrontier = LegacyStackFrontier, LegacyQueueFrontier
+    try:
+        yield
+    finally:
+        solver.StackFrontier, solver.QueueFrontier = stack, queue
+
+
+def run(size, algorithm):
+    environment = Grid(size, size)
+    environment.source = (0, 0)
+    environment.target = (size - 1, size - 1)
+
+    start = time.perf_counter()
+    Solver(environment).search_path(algorithm)
+    elapsed = time.perf_counter() - start
+
+    return elapsed, max(len(environment.explored), 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[125, 250, 500, 1000])
+    parser.add_argument('--legacy-max', type=int, default=100,
+                        help='largest grid side to run with the legacy frontiers')
+    args = parser.parse_args()
+
+    print(f"{'algorithm':<10}{'frontier':<10}{'grid':>12}{'expanded':>12}{'time (s)':>12}{'us/node':>10}")
+
+    for name, algorithm in (('DFS', Solver.DFS), ('BFS', Solver.BFS)):
+        for size in args.sizes:
+            runs = [('deque', contextlib.nullcontext())]
+            if size <= args.legacy_max:
+                runs.append(('list', legacy_frontiers()))
+
+            for frontier, context in runs:
+                with context:
+                    elapsed, expanded = run(size, algorithm)
+
+                print(f"{name:<10}{frontier:<10}{f'{size}x{size}':>12}{expanded:>12}"
+                      f"{elapsed:>12.3f}{elapsed / expanded * 1e6:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
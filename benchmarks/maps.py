@@ -0,0 +1,117 @@
+"""Deterministic map generators for benchmarks
+
+Every generator takes the grid size and a seed and returns a GridEnvironment
+with source and target set, always the same for the same arguments.
+"""
+import os
+import random
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from grid import GridEnvironment
+
+
+def _environment(walls, source, target):
+    """Build an environment making sure source and target are free."""
+    rows, cols = walls.shape
+    walls[source] = 0
+    walls[target] = 0
+
+    environment = GridEnvironment(rows, cols, walls)
+    environment.source = environment.encode(source)
+    environment.target = environment.encode(target)
+    return environment
+
+
+def open_grid(rows, cols, seed = 0):
+    """Grid without walls, from the top left to the bottom right corner."""
+    walls = np.zeros((rows, cols), dtype=np.uint8)
+    return _environment(walls, (0, 0), (rows - 1, cols - 1))
+
+
+def random_obstacles(rows, cols, seed = 0, density = 0.2):
+    """Grid where every cell is a wall with the given probability."""
+    rng = np.random.default_rng(seed)
+    walls = (rng.random((rows, cols)) < density).astype(np.uint8)
+    return _environment(walls, (0, 0), (rows - 1, cols - 1))
+
+
+def maze(rows, cols, seed = 0):
+    """Perfect maze carved with a recursive backtracker (iterative version).
+
+    Passages are the cells with even coordinates and the cells between them, so
+    there is exactly one path between any two free cells.
+    """
+    rng = random.Random(seed)
+
+    height, width = (rows + 1) // 2, (cols + 1) // 2
+
+    # Carving is done on flat Python buffers, NumPy scalar indexing is too slow here
+    walls = bytearray(b'\x01') * (rows * cols)
+    visited = bytearray(height * width)
+
+    visited[0] = 1
+    walls[0] = 0
+    stack = [(0, 0)]
+
+    while stack:
+        i, j = stack[-1]
+
+        neighbours = []
+        if i > 0 and not visited[(i - 1) * width + j]:
+            neighbours.append((i - 1, j))
+        if i < height - 1 and not visited[(i + 1) * width + j]:
+            neighbours.append((i + 1, j))
+        if j > 0 and not visited[i * width + j - 1]:
+            neighbours.append((i, j - 1))
+        if j < width - 1 and not visited[i * width + j + 1]:
+            neighbours.append((i, j + 1))
+
+        if not neighbours:
+            stack.pop()
+            continue
+
+        ni, nj = neighbours[rng.randrange(len(neighbours))]
+        visited[ni * width + nj] = 1
+        walls[2 * ni * cols + 2 * nj] = 0
+        walls[(i + ni) * cols + j + nj] = 0
+        stack.append((ni, nj))
+
+    walls = np.frombuffer(walls, dtype=np.uint8).reshape(rows, cols).copy()
+    return _environment(walls, (0, 0), (2 * (height - 1), 2 * (width - 1)))
+
+
+def rooms(rows, cols, seed = 0, room = 10):
+    """Square rooms separated by walls, with one door to the room on the right
+    and one to the room below placed at random."""
+    rng = np.random.default_rng(seed)
+    walls = np.zeros((rows, cols), dtype=np.uint8)
+
+    walls[room::room + 1, :] = 1
+    walls[:, room::room + 1] = 1
+
+    for top in range(0, rows, room + 1):
+        for left in range(0, cols, room + 1):
+            height = min(room, rows - top)
+            width = min(room, cols - left)
+
+            # Door in the wall on the right and in the wall below
+            if left + room < cols:
+                walls[top + rng.integers(height), left + room] = 0
+            if top + room < rows:
+                walls[top + room, left + rng.integers(width)] = 0
+
+    return _environment(walls, (0, 0), (rows - 1, cols - 1))
+
+
+GENERATORS = {
+    'open': open_grid,
+    'random-10': lambda rows, cols, seed = 0: random_obstacles(rows, cols, seed, 0.1),
+    'random-20': lambda rows, cols, seed = 0: random_obstacles(rows, cols, seed, 0.2),
+    'random-30': lambda rows, cols, seed = 0: random_obstacles(rows, cols, seed, 0.3),
+    'maze': maze,
+    'rooms': rooms,
+}
@@ -0,0 +1,90 @@
+"""Search memory benchmark
+
+Measures the peak memory of a BFS over an open square GridEnvironment with
+three ways of storing the search tree: Node objects with a __dict__ (as Node
+used to be), Node objects with __slots__, and the array based NodeStore of
+the compact mode.
+
+Usage:
+    $ python benchmarks/memory.py [--sizes 250 500 1000]
+"""
+import argparse
+import contextlib
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import solver
+
+from grid import GridEnvironment
+from solver import Node, Solver
+
+
+class LegacyNode:
+    """Node with a __dict__, as it was before __slots__ were added."""
+    def __init__(self, state, parent, action, cost = 1):
+        self.state = state
+        self.parent = parent
+        self.action = action
+
+        if parent is None:
+            self.cost_from_source = 0
+        else:
+            self.cost_from_source = parent.cost_from_source + cost
+
+    path = Node.path
+
+
+@contextlib.contextmanager
+def legacy_nodes():
+    """Temporarily make the solver use nodes with a __dict__."""
+    node = solver.Node
+    solver.Node = LegacyNode
+    try:
+        yield
+    finally:
+        solver.Node = node
+
+
+def run(size, compact):
+    environment = GridEnvironment(size, size)
+    environment.source = 0
+    environment.target = size * size - 1
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    Solver(environment, compact=compact).search_path(Solver.BFS)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[250, 500, 1000])
+    args = parser.parse_args()
+
+    modes = (
+        ('dict', legacy_nodes, False),
+        ('slots', contextlib.nullcontext, False),
+        ('compact', contextlib.nullcontext, True),
+    )
+
+    print(f"{'nodes':<10}{'grid':>12}{'time (s)':>12}{'peak (MB)':>12}{'bytes/cell':>12}")
+
+    for size in args.sizes:
+        for name, context, compact in modes:
+            with context():
+                elapsed, peak = run(size, compact)
+
+            print(f"{name:<10}{f'{size}x{size}':>12}{elapsed:>12.3f}"
+                  f"{peak / 2 ** 20:>12.1f}{peak / size ** 2:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
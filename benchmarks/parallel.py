@@ -0,0 +1,70 @@
+"""Parallel BFS benchmark
+
+Times ParallelBFS on open and randomly blocked square GridEnvironments, from one
+corner to the opposite one, with different numbers of processes, and the speedup
+over a single process. Every search is run once to start the workers before it
+is timed, so the times only include the search itself. Speedups need as many
+free CPUs as processes.
+
+Usage:
+    $ python benchmarks/parallel.py --sizes 2000 4000 --processes 1 2 4 8 16 32
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from grid import GridEnvironment
+from parallel import ParallelBFS
+
+# Fraction of wall cells of every map
+DENSITIES = {'open': 0.0, 'random': 0.2}
+
+
+def create(size, density, seed = 0):
+    walls = (np.random.default_rng(seed).random((size, size)) < density).astype(np.uint8)
+    environment = GridEnvironment(size, size, walls)
+    environment.source, environment.target = 0, size * size - 1
+    environment.set_wall(environment.source, False)
+    environment.set_wall(environment.target, False)
+    return environment
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[2000])
+    parser.add_argument('--processes', type=int, nargs='+', default=[1, 2, 4, os.cpu_count()])
+    parser.add_argument('--min-cells', type=int, default=32, help='smallest number of cells of a level given to a worker')
+    parser.add_argument('--repeat', type=int, default=3, help='searches timed, the best one is reported')
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} CPUs")
+    print(f"{'map':<10}{'size':>8}{'processes':>12}{'time (s)':>12}{'speedup':>10}")
+
+    for size in args.sizes:
+        for name, density in DENSITIES.items():
+            environment = create(size, density)
+            baseline = None
+
+            for processes in sorted(set(args.processes)):
+                with ParallelBFS(environment, processes, args.min_cells) as search:
+                    search.search_path()
+
+                    times = []
+                    for _ in range(args.repeat):
+                        start = time.perf_counter()
+                        search.search_path()
+                        times.append(time.perf_counter() - start)
+
+                elapsed = min(times)
+                baseline = baseline or elapsed
+
+                print(f"{name:<10}{size:>8}{processes:>12}{elapsed:>12.3f}{baseline / elapsed:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
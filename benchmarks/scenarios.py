@@ -0,0 +1,67 @@
+"""MovingAI scenario benchmark
+
+Runs every query of a MovingAI .scen file on its map and reports the total time,
+the number of paths found and how many were longer than the optimal length of
+the scenario. Queries are read one at a time, so scenario files of any size can
+be used. The map is searched with 4-connected moves, while the optimal lengths
+allow diagonals, so paths are expected to be longer on open maps.
+
+Usage:
+    $ python benchmarks/scenarios.py maps/arena.map.scen --algorithm A_STAR --limit 1000
+"""
+import argparse
+import itertools
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mapio import iter_scenarios, open_map
+from solver import Solver
+from suite import ALGORITHMS
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('scenarios', help='.scen file to be run')
+    parser.add_argument('--map', help='map file, by default the one named by the scenarios')
+    parser.add_argument('--algorithm', choices=ALGORITHMS, default='A_STAR')
+    parser.add_argument('--limit', type=int, help='number of queries to run')
+    parser.add_argument('--compact', action='store_true', help='use the compact search mode')
+    args = parser.parse_args()
+
+    environment = None
+    solver = None
+
+    found = longer = queries = 0
+    elapsed = 0.0
+
+    for scenario in itertools.islice(iter_scenarios(args.scenarios), args.limit):
+
+        # Map names are relative to the scenario file
+        if environment is None:
+            path = args.map or os.path.join(os.path.dirname(args.scenarios), scenario.map)
+            environment = open_map(path)
+            solver = Solver(environment, compact=args.compact)
+
+        scenario.apply(environment)
+
+        start = time.perf_counter()
+        path = solver.search_path(ALGORITHMS[args.algorithm])
+        elapsed += time.perf_counter() - start
+
+        queries += 1
+        if path is not None:
+            found += 1
+            longer += len(path) > scenario.optimal + 1e-6
+
+    if queries == 0:
+        sys.exit(f"{args.scenarios} has no queries")
+
+    print(f"{queries} queries, {found} paths found, {longer} longer than optimal")
+    print(f"{elapsed:.3f}s in total, {elapsed / queries * 1000:.3f}ms per query")
+
+
+if __name__ == '__main__':
+    main()
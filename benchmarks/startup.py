@@ -0,0 +1,90 @@
+"""Board startup benchmark
+
+Measures how long it takes to build a Board of increasing size and to draw
+it for the first time, as the runner does on its first frame, with the
+shared font cache and with one font loaded per cell (as Cell used to do).
+Runs without a window using SDL's dummy video driver.
+
+Usage:
+    $ python benchmarks/startup.py [--sizes 25 100 250]
+"""
+import argparse
+import contextlib
+import gc
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame
+
+import board
+
+from board import Board, Cell, OPEN_SANS
+
+
+class LegacyCell(Cell):
+    """Cell that loads its own font, as it was before the font cache."""
+    def __init__(self, board, position):
+        super().__init__(board, position)
+        self.font = pygame.font.Font(OPEN_SANS, self.font_size)
+
+
+@contextlib.contextmanager
+def legacy_cells():
+    """Temporarily make the board create cells with their own font."""
+    cell = board.Cell
+    board.Cell = LegacyCell
+    try:
+        yield
+    finally:
+        board.Cell = cell
+
+
+def run(screen, size):
+    board.load_font.cache_clear()
+    board.render_label.cache_clear()
+
+    # Boards from earlier runs, with their fonts, are not freed in the middle of this one
+    gc.collect()
+
+    start = time.perf_counter()
+    built = Board(screen, (20, 20), (560, 560), size, size)
+    build = time.perf_counter() - start
+
+    built.draw()
+    pygame.display.flip()
+    return build, time.perf_counter() - start - build
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[25, 100, 250])
+    args = parser.parse_args()
+
+    # Fonts are loaded with paths relative to the repository
+    os.chdir(ROOT)
+
+    pygame.init()
+    screen = pygame.display.set_mode((900, 600))
+
+    print(f"{'fonts':<10}{'board':>12}{'build (s)':>12}{'draw (s)':>12}{'total (s)':>12}")
+
+    for size in args.sizes:
+        for name, context in (('cached', contextlib.nullcontext), ('per cell', legacy_cells)):
+            with context():
+                try:
+                    build, draw = run(screen, size)
+                    result = f"{build:>12.3f}{draw:>12.3f}{build + draw:>12.3f}"
+                except OSError:
+                    # Every font keeps its file open, large boards run out of file descriptors
+                    result = f"{'failed':>12}"
+
+            print(f"{name:<10}{f'{size}x{size}':>12}{result}")
+
+
+if __name__ == '__main__':
+    main()
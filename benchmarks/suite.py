@@ -0,0 +1,222 @@
+"""Search benchmark suite
+
+Runs every Solver algorithm headlessly on deterministic seeded maps (open
+grids, random obstacles, mazes and rooms) and records wall time, nodes
+expanded and generated, peak frontier size, time spent in
+the frontier and the environment, and peak memory. Results are written as JSON
+and can be compared with a stored baseline to catch regressions.
+
+The memory-bounded algorithms, IDA_STAR and SMA_STAR, expand states again and
+again, so they only run on maps up to --bounded-size cells per side and with a
+shorter timeout. On larger maps they are reported with the status 'skipped'.
+
+Usage:
+    $ python benchmarks/suite.py --output results.json
+    $ python benchmarks/suite.py --preset full --output results.json --baseline baseline.json
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from maps import GENERATORS
+from solver import SearchStats, Solver
+
+ALGORITHMS = {
+    'DFS': Solver.DFS,
+    'BFS': Solver.BFS,
+    'GREEDY_BFS': Solver.GREEDY_BFS,
+    'A_STAR': Solver.A_STAR,
+    'BIDIRECTIONAL_BFS': Solver.BIDIRECTIONAL_BFS,
+    'BIDIRECTIONAL_A_STAR': Solver.BIDIRECTIONAL_A_STAR,
+    'JPS': Solver.JPS,
+    'DIJKSTRA': Solver.DIJKSTRA,
+    'IDA_STAR': Solver.IDA_STAR,
+    'SMA_STAR': Solver.SMA_STAR,
+}
+
+# Algorithms that only run on small maps, see --bounded-size and --bounded-timeout
+BOUNDED = ('IDA_STAR', 'SMA_STAR')
+
+PRESETS = {
+    'quick': [25, 100],
+    'default': [25, 100, 500],
+    'full': [25, 100, 500, 1000, 2000],
+}
+
+
+def run(environment, algorithm, compact, timeout, stats = None):
+    """Run one search, returning the path and the elapsed time (None on timeout)."""
+    task = Solver(environment, compact=compact).iter_search(algorithm, budget=1000, stats=stats)
+
+    start = time.perf_counter()
+    finished = task.run(timeout)
+    elapsed = time.perf_counter() - start
+
+    if not finished:
+        task.cancel()
+        return None, None
+
+    return task.path, elapsed
+
+
+def measure(name, size, algorithm, args):
+    """Benchmark one algorithm on one map."""
+    environment = GENERATORS[name](size, size, args.seed)
+
+    result = {
+        'map': name,
+        'size': size,
+        'algorithm': algorithm,
+        'compact': args.compact,
+    }
+
+    timeout = args.timeout
+
+    if algorithm in BOUNDED:
+        if size > args.bounded_size:
+            result['status'] = 'skipped'
+            return result
+
+        timeout = min(timeout, args.bounded_timeout)
+
+    times = []
+    for _ in range(args.repeat):
+        path, elapsed = run(environment, ALGORITHMS[algorithm], args.compact, timeout)
+
+        if elapsed is None:
+            result['status'] = 'timeout'
+            return result
+
+        times.append(elapsed)
+
+    # Counts come from a separate instrumented run, so they do not slow down the timed ones
+    stats = SearchStats()
+    run(environment, ALGORITHMS[algorithm], args.compact, None, stats)
+
+    result.update({
+        'status': 'ok' if path is not None else 'no path',
+        'time': min(times),
+        'expanded': stats.expanded,
+        'generated': stats.generated,
+        'duplicates': stats.duplicates,
+        'peak_frontier': stats.peak_frontier,
+        'heuristic_calls': stats.heuristic_calls,
+        'frontier_time': stats.frontier_time,
+        'environment_time': stats.environment_time,
+        'path_length': None if path is None else len(path),
+    })
+
+    if args.memory:
+        tracemalloc.start()
+        run(environment, ALGORITHMS[algorithm], args.compact, None)
+        result['peak_memory'] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return result
+
+
+def compare(results, baseline, tolerance, min_time):
+    """Compare results with a baseline, returning a list of regression messages.
+
+    Times below min_time are too noisy to be compared.
+    """
+    def key(result):
+        return result['map'], result['size'], result['algorithm'], result['compact']
+
+    previous = {key(result): result for result in baseline['results']}
+    regressions = []
+
+    for result in results:
+        old = previous.get(key(result))
+        if old is None or old.get('status') != 'ok':
+            continue
+
+        label = '{} {}x{} {}'.format(result['map'], result['size'], result['size'], result['algorithm'])
+
+        if result.get('status') != 'ok':
+            regressions.append(f"{label}: status {result.get('status')}, was ok")
+            continue
+
+        if old['time'] >= min_time and result['time'] > old['time'] * (1 + tolerance):
+            regressions.append(f"{label}: time {result['time']:.4f}s, was {old['time']:.4f}s")
+
+        for metric in ('expanded', 'peak_frontier', 'path_length', 'peak_memory'):
+            if metric not in result or metric not in old:
+                continue
+
+            # Counts are deterministic, memory can vary a little
+            limit = old[metric] * (1 + tolerance) if metric == 'peak_memory' else old[metric]
+            if result[metric] > limit:
+                regressions.append(f"{label}: {metric} {result[metric]}, was {old[metric]}")
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--preset', choices=PRESETS, default='default', help='map sizes to run')
+    parser.add_argument('--sizes', type=int, nargs='+', help='map sizes, overrides the preset')
+    parser.add_argument('--maps', nargs='+', choices=GENERATORS, default=list(GENERATORS))
+    parser.add_argument('--algorithms', nargs='+', choices=ALGORITHMS, default=list(ALGORITHMS))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3, help='runs per search, the best time is kept')
+    parser.add_argument('--timeout', type=float, default=60, help='seconds before a search is abandoned')
+    parser.add_argument('--bounded-size', type=int, default=100, help='largest map side for IDA_STAR and SMA_STAR')
+    parser.add_argument('--bounded-timeout', type=float, default=10, help='timeout for IDA_STAR and SMA_STAR')
+    parser.add_argument('--compact', action='store_true', help='use the compact search mode')
+    parser.add_argument('--no-memory', dest='memory', action='store_false', help='skip peak memory runs')
+    parser.add_argument('--output', help='JSON file to write the results to')
+    parser.add_argument('--baseline', help='JSON file with previous results to compare with')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed relative slowdown')
+    parser.add_argument('--min-time', type=float, default=0.01, help='shortest baseline time compared')
+    args = parser.parse_args()
+
+    sizes = args.sizes or PRESETS[args.preset]
+    results = []
+
+    print(f"{'map':<12}{'grid':>12}{'algorithm':>22}{'time (s)':>12}{'expanded':>12}"
+          f"{'frontier':>10}{'memory (MB)':>13}")
+
+    for name, size, algorithm in itertools.product(args.maps, sizes, args.algorithms):
+        result = measure(name, size, algorithm, args)
+        results.append(result)
+
+        if result['status'] in ('timeout', 'skipped'):
+            print(f"{name:<12}{f'{size}x{size}':>12}{algorithm:>22}{result['status']:>12}")
+            continue
+
+        memory = result['peak_memory'] / 2 ** 20 if 'peak_memory' in result else float('nan')
+        print(f"{name:<12}{f'{size}x{size}':>12}{algorithm:>22}{result['time']:>12.4f}"
+              f"{result['expanded']:>12}{result['peak_frontier']:>10}{memory:>13.1f}")
+
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': args.seed,
+        'results': results,
+    }
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file), args.tolerance, args.min_time)
+
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
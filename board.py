@@ -1,12 +1,53 @@
+import functools
+import time
+
 import pygame
 
-from solver import Environment
+from grid import Grid
+from solver import SearchObserver
+
+OPEN_SANS = "assets/fonts/OpenSans-Regular.ttf"
+
+
+@functools.lru_cache(maxsize=None)
+def load_font(path, size):
+    """Load font
 
-class Board(Environment):
+    Fonts are shared by the whole process, every (path, size) pair is loaded once.
+
+    Parameters:
+        path (str): Font file.
+        size (int): Font size.
+
+    Returns:
+        font (pygame.font.Font): Loaded font.
+    """
+    return pygame.font.Font(path, size)
+
+
+@functools.lru_cache(maxsize=None)
+def render_label(text, size, color = (0, 0, 0), path = OPEN_SANS):
+    """Render label
+
+    Labels are rendered once and the same surface is blitted every time.
+
+    Parameters:
+        text (str): Text of the label.
+        size (int): Font size.
+        color (tuple): Text color.
+        path (str): Font file.
+
+    Returns:
+        label (pygame.Surface): Rendered text.
+    """
+    return load_font(path, size).render(text, True, color)
+
+
+class Board(Grid, SearchObserver):
     """Board class
 
-    Subclass of environment with application specific methods.
-    Every state corresponds to the current coordinates of the agent.
+    Subclass of grid that draws itself in a PyGame display.
+    It observes the search to show every state reached by the algorithm.
 
     Attributes:
         source: Starting state of the system.
@@ -21,13 +62,26 @@ class Board(Environment):
 
         cells: Array with all the cell objects in the board.
         walls (set): Set with all the wall cells.
+        costs (dict): Cost of entering every cell whose cost is not 1.
         path (list): List of steps from source to target cell.
+
+        cell_size (int): Pixel size of every cell.
+        max_fps (int): Maximum number of display updates per second during a search.
+        dirty (dict): Style of every cell changed since the last display update.
+        background (pygame.Surface): Board with every cell empty, None until it is first drawn.
     """
-    def __init__(self, screen, origin, size, rows = 8, cols = 8):
+    def __init__(self, screen, origin, size, rows = 8, cols = 8, max_fps = 60):
         self.screen = screen
         self.origin = origin
         self.size = size
 
+        self.max_fps = max_fps
+        self.dirty = {}
+        self.last_update = 0
+        self.background = None
+
+        self.cell_size = int(min(size[0] / cols, size[1] / rows))
+
         self.rows = rows
         self.cols = cols
 
@@ -41,153 +95,164 @@ class Board(Environment):
                 row.append(cell)
             self.cells.append(row)
 
-        self.reset()
-
-    def reset(self):
-        """Reset board
+        super().__init__(rows, cols)
 
-        Resets the board to its initial state. With no source nor target and
-        without walls.
+    def clean(self):
+        """Clean board
 
-        Also cleans all explored and path cells.
+        Resets explored set and path. It does not modify selected source and
+        target cells and walls. Nothing is drawn, the whole board is drawn again
+        by the next call to draw, so building, loading or resetting a board does
+        not draw it more than once.
         """
-        self.walls = set()
-        self.source = None
-        self.target = None
-        self.clean()
+        super().clean()
+        self.dirty = {}
 
-    def clean(self):
-        """Clean board
+    def on_generate(self, node):
+        """Node generated
+
+        Highlights the cell of every state reached by the search.
 
-        Resets explored set, path and updates drawing. It does not modify
-        selected source and target cells and walls.
+        Parameters:
+            node (Node): Node that was generated.
         """
-        self.explored = set()
-        self.path = []
-        self.draw()
-        pygame.display.flip()
+        self.dirty[node.state] = Cell.ACTIVE
+        self.update()
 
-    def get_actions(self, state):
-        """Get actions from environment
+    def on_path(self, path):
+        """Path found
 
-        Returns a list of possible actions in the given state.
-        Each action is represented with a string value (up, down, left, right).
+        Shows the cells highlighted since the last display update.
 
         Parameters:
-            state: Current state (agent coordinates).
+            path (list): List of actions of the form (state, action).
+        """
+        self.update(force=True)
 
-        Returns:
-            actions (list): A list of actions that can be taken in a state.
+    def update(self, force = False):
+        """Update display
+
+        Draws the cells changed since the last update and pushes only their area
+        to the display. Updates are limited to max_fps per second, changes made
+        in between are batched in the next one.
+
+        Parameters:
+            force (bool): Update even if the last one was too recent.
         """
-        actions = set()
+        now = time.perf_counter()
+
+        if not self.dirty or (not force and now - self.last_update < 1 / self.max_fps):
+            return
 
-        if state[0] > 0:
-            actions.add('up')
-        if state[0] < self.rows - 1:
-            actions.add('down')
-        if state[1] > 0:
-            actions.add('left')
-        if state[1] < self.cols - 1:
-            actions.add('right')
+        rects = []
+        for (i, j), style in self.dirty.items():
+            cell = self.cells[i][j]
+            cell.draw(style)
+            rects.append(cell.rect)
 
-        return actions
+        pygame.display.update(rects)
 
-    def transition_model(self, state, action):
-        """Transition model
+        self.dirty = {}
+        self.last_update = now
 
-        Returns the new state resulting from performing given action in the
-        current state. If there is no wall in the direction indicated by action,
-        updates the display with the new position. Otherwise returns the same
-        state.
+    def cell_at(self, position):
+        """Cell at position
 
         Parameters:
-            state: Current state (agent coordinates).
-            action: Action to be taken.
+            position (tuple): Pixel coordinates in the screen.
 
         Returns:
-            new_state: State resulting from performing the action.
+            cell (tuple): Coordinates of the cell in that position.
+            None: If the position is outside the board.
         """
-        if action == 'up':
-            i, j = state[0]-1, state[1]
-        if action == 'down':
-            i, j = state[0]+1, state[1]
-        if action == 'left':
-            i, j = state[0], state[1]-1
-        if action == 'right':
-            i, j = state[0], state[1]+1
-
-        if (i, j) not in self.walls:
-            self.cells[i][j].draw(Cell.ACTIVE)
-            pygame.display.flip()
-
-            return i, j
-        else:
-            return state
-
-    def cost_to_target(self, cell):
-        """Estimate cost to target
-
-        Get estimated cost to reach target state from current state.
-        As every state is a pair of coordinates we calculate the Manhattan's 
-        distance from the current position to the target.
+        i = (position[1] - self.origin[1]) // self.cell_size
+        j = (position[0] - self.origin[0]) // self.cell_size
 
-        Parameters:
-            state: Current state.
+        if 0 <= i < self.rows and 0 <= j < self.cols:
+            return int(i), int(j)
+
+        return None
+
+    def draw_background(self):
+        """Draw background
+
+        Draws the board with every cell empty in a surface, with one fill and a
+        pair of lines for every row and column instead of a rectangle per cell.
 
         Returns:
-            cost (int): integer representing the estimated cost.
+            background (pygame.Surface): Surface with the empty board.
         """
-        return (abs(cell[0] - self.target[0]) + abs(cell[1] - self.target[1]))
+        size = self.cell_size
+        width, height = self.cols * size, self.rows * size
+
+        background = pygame.Surface((width, height))
+        background.fill((0, 0, 0))
+
+        # Every cell has its own border, so neighbours share a line two pixels wide
+        for j in range(self.cols):
+            for x in (j * size, (j + 1) * size - 1):
+                pygame.draw.line(background, (255, 255, 255), (x, 0), (x, height - 1))
+
+        for i in range(self.rows):
+            for y in (i * size, (i + 1) * size - 1):
+                pygame.draw.line(background, (255, 255, 255), (0, y), (width - 1, y))
+
+        return background
 
     def draw(self):
         """Draw board
 
-        Update the board in the display.
+        Update the board in the display. The empty board is blitted at once and
+        only the cells with another style are drawn on it. Cells waiting for an
+        update are drawn too, so they are discarded.
         """
-        for row in self.cells:
-            for cell in row:
-
-                if cell.position == self.source:
-                    cell.draw(Cell.SOURCE)
-                elif cell.position == self.target:
-                    cell.draw(Cell.TARGET)
-                elif self.path is not None and cell.position in [item[0] for item in self.path]:
-                    # If cell is part of the path found
-                    cell.draw(Cell.PATH)
-                elif cell.position in self.explored:
-                    cell.draw(Cell.EXPLORED)
-                elif cell.position in self.walls:
-                    cell.draw(Cell.WALL)
-                else:
-                    cell.draw()
-                
+        if self.background is None:
+            self.background = self.draw_background()
+
+        self.screen.blit(self.background, self.origin)
+        self.dirty = {}
+
+        # Later styles are drawn over earlier ones, as the source over the path
+        styles = (
+            (self.costs, Cell.TERRAIN),
+            (self.walls, Cell.WALL),
+            (self.explored, Cell.EXPLORED),
+            ([] if self.path is None else [state for state, _ in self.path], Cell.PATH),
+            ([self.target], Cell.TARGET),
+            ([self.source], Cell.SOURCE),
+        )
+
+        # Style of every cell that is not empty, keeping the one with the highest priority
+        cells = {}
+        for states, style in styles:
+            for state in states:
+                cells[state] = style
+
+        cells.pop(None, None)
+
+        for (i, j), style in cells.items():
+            self.cells[i][j].draw(style)
+
         
 class Cell:
     """Cell class
 
     Represents a cell in the board.
     """
-    EMPTY, WALL, PATH, EXPLORED, ACTIVE, SOURCE, TARGET = range(7)
+    EMPTY, WALL, PATH, EXPLORED, ACTIVE, SOURCE, TARGET, TERRAIN = range(8)
 
     def __init__(self, board, position):
         
         self.board = board
         self.position = self.i, self.j = position
 
-        self.size = int(min(board.size[0] / board.cols, board.size[1] / board.rows))
+        self.size = board.cell_size
         self.coord = (board.origin[0] + self.j * self.size, board.origin[1] + self.i * self.size)
-
-        OPEN_SANS = "assets/fonts/OpenSans-Regular.ttf"
-        self.font = pygame.font.Font(OPEN_SANS, int(self.size * 0.7))
+        self.rect = pygame.Rect(self.coord[0], self.coord[1], self.size, self.size)
+        self.font_size = int(self.size * 0.7)
 
     def draw(self, style = EMPTY):
 
-        self.rect = pygame.Rect(
-            self.coord[0],
-            self.coord[1],
-            self.size, self.size
-        )
-
         if style == self.EMPTY:
             color = (0, 0, 0)
             text = None
@@ -215,12 +280,18 @@ class Cell:
         elif style == self.ACTIVE:
             color = (128, 128, 64)
             text = None
+
+        elif style == self.TERRAIN:
+            # The more expensive the cell, the darker
+            cost = self.board.costs.get(self.position, 1)
+            color = (max(160 - 10 * cost, 40), max(110 - 8 * cost, 25), 40)
+            text = str(cost)
         
         pygame.draw.rect(self.board.screen, color, self.rect)
         pygame.draw.rect(self.board.screen, (255, 255, 255), self.rect, 1)
 
         if text is not None:
-            text = self.font.render(str(text), True, (0, 0, 0))
+            text = render_label(text, self.font_size)
             font_rect = text.get_rect()
             font_rect.center = self.rect.center
             self.board.screen.blit(text, font_rect)
\ No newline at end of file
@@ -0,0 +1,127 @@
+from collections import OrderedDict
+
+from solver import Solver
+
+
+class PathCache:
+    """Path cache
+
+    Bounded LRU cache of search results placed in front of a Solver. Every result
+    is stored under the fingerprint of the environment, its source and target and
+    the algorithm used, so a query is only answered from the cache while the
+    environment has not changed since the path was found.
+
+    Environments without a fingerprint are always searched.
+
+    Attributes:
+        maxsize (int): Maximum number of paths stored.
+        hits (int): Queries answered from the cache.
+        misses (int): Queries that needed a search.
+        evictions (int): Paths discarded to make room for newer ones.
+    """
+    def __init__(self, maxsize = 1024):
+        if maxsize < 1:
+            raise ValueError("Cache size must be at least 1")
+
+        self.maxsize = maxsize
+        self.paths = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.paths)
+
+    @staticmethod
+    def key(environment, algorithm):
+        """Cache key
+
+        Parameters:
+            environment (Environment): Environment to be searched.
+            algorithm: Algorithm to be used to perform the search.
+
+        Returns:
+            key (tuple): Key of the query, None if the environment has no fingerprint.
+        """
+        if environment.fingerprint is None:
+            return None
+
+        return environment.fingerprint, environment.source, environment.target, algorithm
+
+    def search_path(self, solver, algorithm = Solver.A_STAR, observer = None):
+        """Search path from source to target
+
+        Same as Solver.search_path, but cached. The observer is only notified when a
+        search is actually performed.
+
+        Parameters:
+            solver (Solver): Solver used on a cache miss.
+            algorithm: Algorithm to be used to perform the search.
+            observer (SearchObserver): Optional object notified of the search progress.
+
+        Returns:
+            path (list): List of actions of the form (state, action).
+            None: If there is no possible path.
+        """
+        key = self.key(solver.environment, algorithm)
+
+        if key is not None and key in self.paths:
+            self.hits += 1
+            self.paths.move_to_end(key)
+            path = self.paths[key]
+            return None if path is None else list(path)
+
+        self.misses += 1
+        path = solver.search_path(algorithm, observer)
+
+        if key is not None:
+            self.paths[key] = None if path is None else tuple(path)
+            self._evict()
+
+        return path
+
+    def invalidate(self, fingerprint = None):
+        """Invalidate
+
+        Parameters:
+            fingerprint: Discard only the paths found for this fingerprint. If it is None
+                the whole cache is cleared.
+        """
+        if fingerprint is None:
+            self.paths.clear()
+        else:
+            for key in [key for key in self.paths if key[0] == fingerprint]:
+                del self.paths[key]
+
+    def resize(self, maxsize):
+        """Resize
+
+        Parameters:
+            maxsize (int): New maximum number of paths, older paths are evicted if needed.
+        """
+        if maxsize < 1:
+            raise ValueError("Cache size must be at least 1")
+
+        self.maxsize = maxsize
+        self._evict()
+
+    def info(self):
+        """Cache statistics
+
+        Returns:
+            info (dict): Hits, misses, evictions, current size and maximum size.
+        """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self.paths),
+            'maxsize': self.maxsize,
+        }
+
+    def _evict(self):
+        """Discard the least recently used paths until the cache fits in maxsize."""
+        while len(self.paths) > self.maxsize:
+            self.paths.popitem(last=False)
+            self.evictions += 1
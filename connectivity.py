@@ -0,0 +1,338 @@
+from collections import deque
+
+import numpy as np
+
+from grid import GridEnvironment
+
+
+def label_components(walls):
+    """Label components
+
+    Labels the 4-connected regions of free cells of a grid. Every free cell starts
+    as its own tree, and in every round each tree is hooked to the smallest tree
+    it touches, followed by pointer jumping until every cell points to its root.
+    All the work is done with NumPy over arrays of edges, so large grids are
+    labelled without visiting the cells one by one in Python.
+
+    Parameters:
+        walls (numpy.ndarray): Array of shape (rows, cols), non zero for every wall cell.
+
+    Returns:
+        labels (numpy.ndarray): Flat int32 array with the component of every cell,
+            numbered from 0, and -1 for walls.
+        count (int): Number of components.
+    """
+    rows, cols = walls.shape
+    free = walls.reshape(-1) == 0
+
+    # Pairs of free cells next to each other
+    index = np.arange(rows * cols, dtype=np.int64).reshape(rows, cols)
+    horizontal = free.reshape(rows, cols)[:, :-1] & free.reshape(rows, cols)[:, 1:]
+    vertical = free.reshape(rows, cols)[:-1, :] & free.reshape(rows, cols)[1:, :]
+    first = np.concatenate((index[:, :-1][horizontal], index[:-1, :][vertical]))
+    second = np.concatenate((index[:, 1:][horizontal], index[1:, :][vertical]))
+
+    parents = np.arange(rows * cols, dtype=np.int64)
+
+    while True:
+        a, b = parents[first], parents[second]
+        different = a != b
+
+        if not different.any():
+            break
+
+        # Only the edges between different trees are needed from now on
+        first, second = first[different], second[different]
+        a, b = a[different], b[different]
+
+        np.minimum.at(parents, np.maximum(a, b), np.minimum(a, b))
+
+        while True:
+            jumped = parents[parents]
+            if np.array_equal(jumped, parents):
+                break
+            parents = jumped
+
+    labels = np.full(rows * cols, -1, dtype=np.int32)
+    roots, labels[free] = np.unique(parents[free], return_inverse=True)
+
+    return labels, len(roots)
+
+
+class ConnectivityIndex:
+    """Connectivity index
+
+    Keeps the connected component of every free cell of a Grid or GridEnvironment,
+    so whether a target can be reached from a source is answered in constant time,
+    without searching.
+
+    Components are labelled in one vectorized pass when the index is built, and
+    kept up to date when walls change:
+        - When a wall is removed, the components around the cell are joined in a
+          union-find structure over the labels, in almost constant time.
+        - When a wall is added, its component may be split. A breadth-first search
+          starts from every free neighbour of the cell, and the searches are run one
+          step at a time in turns. Searches that meet are joined, and a search that
+          ends without meeting the others has found a new component, whose cells
+          are relabelled. The work is proportional to the size of the smaller parts.
+
+    Changes are detected through the environment fingerprint, or can be reported
+    directly with update_walls. The index can be attached to an environment, so
+    Solver answers unreachable queries without searching:
+
+        environment.connectivity = ConnectivityIndex(environment)
+
+    Attributes:
+        environment: Grid or GridEnvironment to be indexed.
+        labels (numpy.ndarray): Flat array with the label of every cell, -1 for walls.
+            Labels joined by the union-find structure belong to the same component.
+        walls (numpy.ndarray): Flat array with the walls the index is up to date with.
+    """
+    def __init__(self, environment):
+        self.environment = environment
+
+        if isinstance(environment, GridEnvironment):
+            self._encode = self._decode = int
+        else:
+            self._encode = lambda cell: cell[0] * environment.cols + cell[1]
+            self._decode = lambda state: divmod(state, environment.cols)
+
+        self.build()
+
+    def build(self):
+        """Build index
+
+        Labels every component from scratch.
+        """
+        environment = self.environment
+        rows, cols = environment.rows, environment.cols
+
+        if isinstance(environment, GridEnvironment):
+            walls = environment.walls != 0
+        else:
+            walls = np.zeros((rows, cols), dtype=bool)
+            for cell in environment.walls:
+                walls[cell] = True
+
+        self.labels, count = label_components(walls)
+        self._labels = memoryview(self.labels)
+
+        # Union-find parent of every label
+        self.parents = list(range(count))
+
+        self.walls = walls.reshape(-1).copy()
+        self._walls = memoryview(self.walls)
+        self.fingerprint = environment.fingerprint
+
+    def is_reachable(self, source, target):
+        """Is reachable
+
+        Parameters:
+            source: Starting state.
+            target: Goal state.
+
+        Returns:
+            True: If there is a path from source to target.
+            False: If there is no path, or source or target are walls.
+        """
+        self.refresh()
+
+        source, target = self._encode(source), self._encode(target)
+
+        if self._walls[source] or self._walls[target]:
+            return False
+
+        return self._find(self._labels[source]) == self._find(self._labels[target])
+
+    def component(self, state):
+        """Component
+
+        Parameters:
+            state: Cell to be checked.
+
+        Returns:
+            component (int): Identifier of the component of the cell, the same for every
+                cell of a component until walls change.
+            None: If the cell is a wall.
+        """
+        self.refresh()
+
+        state = self._encode(state)
+
+        if self._walls[state]:
+            return None
+
+        return self._find(self._labels[state])
+
+    def count(self):
+        """Count components
+
+        Returns:
+            count (int): Number of components.
+        """
+        self.refresh()
+
+        roots = np.array([self._find(label) for label in range(len(self.parents))], dtype=np.int64)
+        return len(np.unique(roots[self.labels[~self.walls]]))
+
+    def refresh(self):
+        """Refresh
+
+        Applies the wall changes made since the last update, if the fingerprint of
+        the environment changed.
+        """
+        if self.environment.fingerprint != self.fingerprint:
+            self.update_walls(self._changed_walls())
+
+    def update_walls(self, cells):
+        """Update walls
+
+        Reports cells whose wall was added or removed, so the components are updated
+        without comparing the whole map.
+
+        Parameters:
+            cells: Iterable of states that changed.
+        """
+        environment = self.environment
+
+        for cell in cells:
+            state = self._encode(cell)
+            blocked = bool(environment.is_wall(cell))
+
+            if blocked != bool(self._walls[state]):
+                self._walls[state] = blocked
+
+                if blocked:
+                    self._add_wall(state)
+                else:
+                    self._remove_wall(state)
+
+        self.fingerprint = environment.fingerprint
+
+    def _changed_walls(self):
+        """Cells whose wall status differs from the indexed walls."""
+        walls = self.environment.walls
+
+        if isinstance(walls, np.ndarray):
+            return np.flatnonzero((walls.reshape(-1) != 0) != self.walls).tolist()
+
+        return list({self._decode(state) for state in np.flatnonzero(self.walls).tolist()} ^ walls)
+
+    def _find(self, label):
+        parents = self.parents
+
+        root = label
+        while parents[root] != root:
+            root = parents[root]
+
+        # Path compression
+        while parents[label] != root:
+            parents[label], label = root, parents[label]
+
+        return root
+
+    def _new_label(self):
+        self.parents.append(len(self.parents))
+        return len(self.parents) - 1
+
+    def _free_neighbours(self, state):
+        """Free cells next to a cell."""
+        environment = self.environment
+        rows, cols = environment.rows, environment.cols
+        walls = self._walls
+
+        i, j = divmod(state, cols)
+        neighbours = []
+
+        if i > 0 and not walls[state - cols]:
+            neighbours.append(state - cols)
+        if i < rows - 1 and not walls[state + cols]:
+            neighbours.append(state + cols)
+        if j > 0 and not walls[state - 1]:
+            neighbours.append(state - 1)
+        if j < cols - 1 and not walls[state + 1]:
+            neighbours.append(state + 1)
+
+        return neighbours
+
+    def _remove_wall(self, state):
+        """Join the components around a cell that became free."""
+        roots = {self._find(self._labels[neighbour]) for neighbour in self._free_neighbours(state)}
+
+        if not roots:
+            self._labels[state] = self._new_label()
+            return
+
+        root = min(roots)
+        for other in roots:
+            self.parents[other] = root
+
+        self._labels[state] = root
+
+    def _add_wall(self, state):
+        """Split the component of a cell that became a wall, if needed."""
+        self._labels[state] = -1
+
+        starts = self._free_neighbours(state)
+
+        if len(starts) < 2:
+            return
+
+        # Group of every search, joined when they meet, and the cells each one reached
+        groups = list(range(len(starts)))
+        owner = {start: number for number, start in enumerate(starts)}
+        queues = [deque([start]) for start in starts]
+        reached = [[start] for start in starts]
+
+        def group(number):
+            while groups[number] != number:
+                number = groups[number]
+            return number
+
+        active = set(range(len(starts)))
+
+        while len(active) > 1:
+            for number in list(active):
+
+                # Joined to another search earlier in this turn
+                if number not in active:
+                    continue
+
+                queue = queues[number]
+
+                # A search that ends alone has found a separate component
+                if not queue:
+                    label = self._new_label()
+                    for cell in reached[number]:
+                        self._labels[cell] = label
+
+                    active.discard(number)
+                    continue
+
+                cell = queue.popleft()
+
+                for neighbour in self._free_neighbours(cell):
+                    other = owner.get(neighbour)
+
+                    if other is None:
+                        owner[neighbour] = number
+                        queue.append(neighbour)
+                        reached[number].append(neighbour)
+                    elif group(other) != number:
+                        self._join(groups, queues, reached, active, number, group(other))
+
+                if len(active) <= 1:
+                    break
+
+    @staticmethod
+    def _join(groups, queues, reached, active, keep, other):
+        """Join the search other into keep."""
+        if keep == other:
+            return
+
+        groups[other] = keep
+        queues[keep].extend(queues[other])
+        reached[keep].extend(reached[other])
+        queues[other] = deque()
+        reached[other] = []
+        active.discard(other)
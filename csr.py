@@ -0,0 +1,408 @@
+import heapq
+
+from collections import OrderedDict, deque
+
+import numpy as np
+
+from grid import Grid, GridEnvironment
+
+# Compiled graphs kept in memory by compile_graph, by environment type, fingerprint and source
+CACHE_SIZE = 8
+_graphs = OrderedDict()
+
+
+class CompiledGraph:
+    """Compiled graph
+
+    Adjacency of a static Environment in compressed sparse row (CSR) format. Every
+    state gets an integer id, and the moves from the state with id i are the entries
+    offsets[i] to offsets[i+1] of the neighbours, costs and actions arrays. Searches
+    run on these flat arrays, so the environment is not called at all once the
+    graph is compiled.
+
+    GridEnvironments are compiled with NumPy from their moves masks, and their ids
+    are the states themselves. Any other environment is explored with
+    weighted_successors from a set of root states, every free cell for a Grid and
+    the source otherwise, so only the states reachable from them are compiled.
+
+    The graph is only valid while the environment does not change. It keeps the
+    fingerprint of the environment it was compiled from, and compile_graph reuses
+    a graph, in memory or saved to a file, only while the fingerprint is the same.
+
+    Attributes:
+        offsets (numpy.ndarray): int64 array of size n + 1, where the moves of the state
+            with id i start.
+        neighbours (numpy.ndarray): Id of the state reached by every move.
+        costs (numpy.ndarray): Positive cost of every move.
+        actions (numpy.ndarray): Code of the action of every move, an index of names.
+        names (list): Action of every action code.
+        states (list): State of every id, None if the ids are the states themselves.
+        fingerprint: Fingerprint of the compiled environment, None if unknown.
+        expanded (int): States expanded by the last search.
+    """
+    def __init__(self, offsets, neighbours, costs, actions, names, states = None, fingerprint = None):
+        self.offsets = offsets
+        self.neighbours = neighbours
+        self.costs = costs
+        self.actions = actions
+        self.names = list(names)
+        self.states = states
+        self.fingerprint = fingerprint
+        self.expanded = 0
+
+        self.ids = None if states is None else {state: number for number, state in enumerate(states)}
+        self.weighted = bool(len(costs)) and int(costs.max()) > 1
+
+        # Plain lists, faster than arrays when read one item at a time, built on the first search
+        self._lists = None
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    @classmethod
+    def compile(cls, environment, roots = None):
+        """Compile environment
+
+        Parameters:
+            environment (Environment): Environment to be compiled.
+            roots: Iterable of states the graph is explored from. By default every free
+                cell of a Grid, or the source of any other environment. Ignored for
+                GridEnvironments, which are always compiled whole.
+
+        Returns:
+            graph (CompiledGraph): Adjacency of the environment.
+        """
+        if isinstance(environment, GridEnvironment):
+            return cls._compile_grid(environment)
+
+        if roots is None:
+            if isinstance(environment, Grid):
+                walls = environment.walls
+                roots = [
+                    (i, j) for i in range(environment.rows) for j in range(environment.cols)
+                    if (i, j) not in walls
+                ]
+            else:
+                roots = [environment.source]
+
+        states = []
+        ids = {}
+        codes = {}
+
+        def identify(state):
+            if state not in ids:
+                ids[state] = len(states)
+                states.append(state)
+            return ids[state]
+
+        for root in roots:
+            identify(root)
+
+        offsets = [0]
+        neighbours, costs, actions = [], [], []
+
+        # Breadth-first, so every new state gets the next id
+        for state in states:
+            for action, new_state, cost in environment.weighted_successors(state):
+                neighbours.append(identify(new_state))
+                costs.append(cost)
+                actions.append(codes.setdefault(action, len(codes)))
+
+            offsets.append(len(neighbours))
+
+        return cls(
+            np.array(offsets, dtype=np.int64),
+            np.array(neighbours, dtype=np.int64),
+            np.array(costs, dtype=np.int64),
+            np.array(actions, dtype=np.uint8 if len(codes) <= 256 else np.int64),
+            list(codes),
+            states,
+            environment.fingerprint,
+        )
+
+    @classmethod
+    def _compile_grid(cls, environment):
+        """Compile a GridEnvironment from its moves masks, without visiting the cells."""
+        moves = environment.moves.reshape(-1)
+        size = environment.size
+
+        # One column per action, in the order of ACTIONS, so the valid entries read
+        # row by row are already sorted by state and action
+        valid = (moves[:, None] >> np.arange(4, dtype=np.uint8)) & 1 != 0
+        targets = np.arange(size, dtype=np.int64)[:, None] + np.array(environment.offsets, dtype=np.int64)
+
+        neighbours = targets[valid]
+        actions = np.broadcast_to(np.arange(4, dtype=np.uint8), (size, 4))[valid]
+
+        offsets = np.zeros(size + 1, dtype=np.int64)
+        np.cumsum(valid.sum(axis=1), out=offsets[1:])
+
+        return cls(
+            offsets, neighbours, environment.costs.reshape(-1)[neighbours],
+            actions, environment.ACTIONS, None, environment.fingerprint
+        )
+
+    def save(self, path):
+        """Save graph
+
+        Writes the arrays of the graph to a NumPy .npz file. The fingerprint, states
+        that are not integers nor tuples of integers, and actions that are not strings
+        are stored with pickle, so files must only be loaded from trusted sources.
+
+        Parameters:
+            path (str): File to be written.
+        """
+        # Filled after creating it, so tuples are not turned into arrays
+        fingerprint = np.empty((), dtype=object)
+        fingerprint[()] = self.fingerprint
+
+        arrays = {
+            'offsets': self.offsets,
+            'neighbours': self.neighbours,
+            'costs': self.costs,
+            'actions': self.actions,
+            'names': np.array(self.names, dtype=None if all(isinstance(name, str) for name in self.names) else object),
+            'fingerprint': fingerprint,
+        }
+
+        if self.states is not None:
+            try:
+                arrays['states'] = np.array(self.states, dtype=np.int64)
+            except (TypeError, ValueError):
+                arrays['states'] = np.empty(len(self.states), dtype=object)
+                arrays['states'][:] = self.states
+
+        with open(path, 'wb') as file:
+            np.savez(file, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        """Load graph
+
+        Parameters:
+            path (str): File written by save.
+
+        Returns:
+            graph (CompiledGraph): Graph stored in the file.
+        """
+        with np.load(path, allow_pickle=True) as data:
+            states = None
+
+            if 'states' in data:
+                states = data['states']
+                states = [tuple(state) for state in states.tolist()] if states.ndim == 2 else states.tolist()
+
+            # Stored as a pickled object, so it keeps its type and compares equal
+            fingerprint = data['fingerprint'].item()
+
+            return cls(
+                data['offsets'], data['neighbours'], data['costs'], data['actions'],
+                data['names'].tolist(), states, fingerprint
+            )
+
+    def id(self, state):
+        """State id
+
+        Parameters:
+            state: State of the environment.
+
+        Returns:
+            id (int): Id of the state in the graph.
+        """
+        if self.ids is None:
+            if not 0 <= state < len(self):
+                raise ValueError(f"State {state!r} is not in the compiled graph")
+            return state
+
+        if state not in self.ids:
+            raise ValueError(f"State {state!r} is not in the compiled graph")
+
+        return self.ids[state]
+
+    def state(self, number):
+        """State of an id
+
+        Parameters:
+            number (int): Id of the state in the graph.
+
+        Returns:
+            state: State of the environment.
+        """
+        return number if self.states is None else self.states[number]
+
+    def search_path(self, source, target, observer = None):
+        """Search path from source to target
+
+        Breadth-first search when every move costs 1, and Dijkstra's algorithm
+        otherwise, so the path found is always the cheapest one.
+
+        Parameters:
+            source: Starting state.
+            target: Goal state.
+            observer (SearchObserver): Optional object notified of the path found.
+
+        Returns:
+            path (list): List of actions of the form (state, action).
+            None: If there is no possible path.
+        """
+        source, target = self.id(source), self.id(target)
+
+        if self._lists is None:
+            self._lists = (self.offsets.tolist(), self.neighbours.tolist(), self.costs.tolist())
+
+        # Move used to reach every state, -1 for states not reached yet
+        moves = self._dijkstra(source, target) if self.weighted else self._bfs(source, target)
+
+        if source != target and moves[target] == -1:
+            return None
+
+        path = self._path(moves, source, target)
+
+        if observer is not None:
+            observer.on_path(path)
+
+        return path
+
+    def _bfs(self, source, target):
+        offsets, neighbours, _ = self._lists
+
+        moves = [-1] * len(self)
+        moves[source] = len(neighbours)
+        queue = deque([source])
+        expanded = 0
+
+        while queue:
+            state = queue.popleft()
+            expanded += 1
+
+            if state == target:
+                break
+
+            for move in range(offsets[state], offsets[state + 1]):
+                new_state = neighbours[move]
+
+                if moves[new_state] == -1:
+                    moves[new_state] = move
+                    queue.append(new_state)
+
+        self.expanded = expanded
+        return moves
+
+    def _dijkstra(self, source, target):
+        offsets, neighbours, costs = self._lists
+
+        moves = [-1] * len(self)
+        distances = [-1] * len(self)
+        distances[source] = 0
+        heap = [(0, source)]
+        expanded = 0
+
+        while heap:
+            distance, state = heapq.heappop(heap)
+
+            # Stale entry of a state already reached with a lower cost
+            if distance > distances[state]:
+                continue
+
+            expanded += 1
+
+            if state == target:
+                break
+
+            for move in range(offsets[state], offsets[state + 1]):
+                new_state = neighbours[move]
+                new_distance = distance + costs[move]
+
+                if distances[new_state] == -1 or new_distance < distances[new_state]:
+                    distances[new_state] = new_distance
+                    moves[new_state] = move
+                    heapq.heappush(heap, (new_distance, new_state))
+
+        self.expanded = expanded
+        return moves
+
+    def _path(self, moves, source, target):
+        """Follow the moves from the target back to the source."""
+        offsets = self.offsets
+        actions = self.actions
+        names = self.names
+
+        path = []
+        state = target
+
+        while state != source:
+            move = moves[state]
+            path.append((self.state(state), names[int(actions[move])]))
+
+            # State the move starts from
+            state = int(np.searchsorted(offsets, move, side='right')) - 1
+
+        path.reverse()
+        return path
+
+
+def clear_cache():
+    """Clear cache
+
+    Forgets every compiled graph kept in memory by compile_graph. Files are not removed.
+    """
+    _graphs.clear()
+
+
+def compile_graph(environment, path = None):
+    """Compile graph
+
+    Compiled graph of an environment, reused while the environment does not change.
+    Graphs are kept in memory for the last few fingerprints, and if a file is given
+    they are also saved to it and loaded from it when its fingerprint matches.
+    Environments without a fingerprint are compiled every time.
+
+    Environments other than grids are only compiled from their source, so their
+    graphs are also reused only for the same source, and a graph loaded from a file
+    is only used if the source is in it.
+
+    Parameters:
+        environment (Environment): Environment to be compiled.
+        path (str): Optional .npz file where the graph is stored.
+
+    Returns:
+        graph (CompiledGraph): Adjacency of the environment.
+    """
+    fingerprint = environment.fingerprint
+
+    if fingerprint is None:
+        return CompiledGraph.compile(environment)
+
+    # Grids are compiled whole, any other environment only from its source
+    whole = isinstance(environment, (Grid, GridEnvironment))
+    key = (type(environment), fingerprint) if whole else (type(environment), fingerprint, environment.source)
+
+    if key in _graphs:
+        _graphs.move_to_end(key)
+        return _graphs[key]
+
+    graph = None
+
+    if path is not None:
+        try:
+            graph = CompiledGraph.load(path)
+        except (OSError, ValueError, KeyError):
+            graph = None
+
+        if graph is not None and graph.fingerprint != fingerprint:
+            graph = None
+
+        if graph is not None and not whole and environment.source not in graph.ids:
+            graph = None
+
+    if graph is None:
+        graph = CompiledGraph.compile(environment)
+
+        if path is not None:
+            graph.save(path)
+
+    _graphs[key] = graph
+    while len(_graphs) > CACHE_SIZE:
+        _graphs.popitem(last=False)
+
+    return graph
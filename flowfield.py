@@ -0,0 +1,223 @@
+import numpy as np
+
+from grid import GridEnvironment
+
+# Action code that undoes every action code of GridEnvironment.ACTIONS
+OPPOSITE_CODES = (1, 0, 3, 2)
+
+
+class FlowField:
+    """Flow field
+
+    Distance to a single target from every cell of a grid, together with the move
+    to make from every cell to get closer to it. It is computed once with a reverse
+    search from the target, so any number of agents heading to the same target
+    read their paths from the field instead of searching, in time proportional to
+    the length of the path.
+
+    The field is computed as a wavefront over the whole grid with NumPy. Cells are
+    settled in order of distance, one bucket of equal distances at a time as in
+    Dial's algorithm, and all the neighbours of a bucket are relaxed at once. Without
+    terrain every bucket is a breadth-first search level.
+
+    Works with a Grid or a GridEnvironment, and states are given and returned in the
+    format of the environment. The field is rebuilt on the next query after the
+    walls, the costs or the target change, as detected through the fingerprint.
+
+    Attributes:
+        environment: Grid or GridEnvironment the field is computed on.
+        target: Target of the field, or None to follow the target of the environment.
+        distances (numpy.ndarray): int64 array of shape (rows, cols) with the cost of the
+            cheapest path from every cell to the target, -1 where it can not be reached.
+        moves (numpy.ndarray): int8 array of shape (rows, cols) with the code of the first
+            action of that path, an index of GridEnvironment.ACTIONS, -1 where there is none.
+    """
+    def __init__(self, environment, target = None):
+        self.environment = environment
+        self.target = target
+
+        self.distances = None
+        self.moves = None
+        self._key = None
+
+        if isinstance(environment, GridEnvironment):
+            self._encode = self._decode = int
+        else:
+            self._encode = lambda cell: cell[0] * environment.cols + cell[1]
+            self._decode = lambda state: divmod(state, environment.cols)
+
+    def refresh(self):
+        """Refresh
+
+        Rebuilds the field if the environment or the target changed since it was
+        computed.
+        """
+        environment = self.environment
+        target = environment.target if self.target is None else self.target
+
+        if target is None:
+            raise ValueError("The flow field needs a target")
+
+        key = environment.fingerprint, target
+
+        if key != self._key:
+            self.build(target)
+            self._key = key
+
+    def build(self, target):
+        """Build field
+
+        Computes the distances and moves of every cell to the target.
+
+        Parameters:
+            target: Target cell.
+        """
+        environment = self.environment
+
+        if not isinstance(environment, GridEnvironment):
+            environment = GridEnvironment.from_grid(environment)
+
+        rows, cols = environment.rows, environment.cols
+        masks = environment.moves.reshape(-1)
+        costs = environment.costs.reshape(-1).astype(np.int64)
+        offsets = environment.offsets
+
+        # Cells not reached yet are at the largest distance until the end
+        unreached = np.iinfo(np.int64).max
+        distances = np.full(rows * cols, unreached, dtype=np.int64)
+        moves = np.full(rows * cols, -1, dtype=np.int8)
+        settled = np.zeros(rows * cols, dtype=bool)
+
+        target = self._encode(target)
+
+        buckets = {}
+
+        if not environment.is_wall(target):
+            distances[target] = 0
+            buckets[0] = [np.array([target], dtype=np.int64)]
+
+        while buckets:
+            distance = min(buckets)
+            states = np.unique(np.concatenate(buckets.pop(distance)))
+
+            # Cells already settled, or improved after being pushed into this bucket
+            states = states[~settled[states] & (distances[states] == distance)]
+
+            if not len(states):
+                continue
+
+            settled[states] = True
+
+            # Moving from a neighbour into a cell costs the cost of the cell
+            new_distances = distance + costs[states]
+            state_masks = masks[states]
+
+            for code, offset in enumerate(offsets):
+                has_move = (state_masks & (1 << code)) != 0
+                neighbours = states[has_move] + offset
+                candidates = new_distances[has_move]
+
+                better = ~settled[neighbours] & (candidates < distances[neighbours])
+                neighbours, candidates = neighbours[better], candidates[better]
+
+                if not len(neighbours):
+                    continue
+
+                # Several cells can reach the same neighbour, any of the cheapest wins
+                np.minimum.at(distances, neighbours, candidates)
+                winners = distances[neighbours] == candidates
+
+                moves[neighbours[winners]] = OPPOSITE_CODES[code]
+
+                for value in np.unique(candidates[winners]).tolist():
+                    buckets.setdefault(value, []).append(neighbours[winners][candidates[winners] == value])
+
+        distances[distances == unreached] = -1
+
+        self.distances = distances.reshape(rows, cols)
+        self.moves = moves.reshape(rows, cols)
+
+    def distance(self, state):
+        """Distance to target
+
+        Parameters:
+            state: Cell of the agent.
+
+        Returns:
+            distance (int): Cost of the cheapest path to the target.
+            None: If the target can not be reached.
+        """
+        self.refresh()
+
+        distance = int(self.distances.reshape(-1)[self._encode(state)])
+        return None if distance < 0 else distance
+
+    def next_move(self, state):
+        """Next move
+
+        Parameters:
+            state: Cell of the agent.
+
+        Returns:
+            action (str): Action to be taken to get closer to the target.
+            None: If the agent is at the target or it can not be reached.
+        """
+        self.refresh()
+
+        code = int(self.moves.reshape(-1)[self._encode(state)])
+        return None if code < 0 else GridEnvironment.ACTIONS[code]
+
+    def path_from(self, state):
+        """Path from a cell
+
+        Follows the moves of the field from a cell to the target.
+
+        Parameters:
+            state: Cell of the agent.
+
+        Returns:
+            path (list): List of actions of the form (state, action), as returned by
+                Solver.search_path.
+            None: If the target can not be reached.
+        """
+        self.refresh()
+
+        moves = self.moves.reshape(-1)
+        state = self._encode(state)
+
+        if self.distances.reshape(-1)[state] < 0:
+            return None
+
+        cols = self.environment.cols
+        offsets = (-cols, cols, -1, 1)
+        actions = GridEnvironment.ACTIONS
+
+        path = []
+        code = moves[state]
+
+        while code >= 0:
+            state += offsets[code]
+            path.append((self._decode(state), actions[code]))
+            code = moves[state]
+
+        return path
+
+    def step(self, states):
+        """Step agents
+
+        Moves many agents one step towards the target at once. Agents at the target
+        or that can not reach it stay where they are.
+
+        Parameters:
+            states (numpy.ndarray): Flat indexes (row * cols + col) of the cells of the agents.
+
+        Returns:
+            states (numpy.ndarray): Flat indexes of the cells after the step.
+        """
+        self.refresh()
+
+        cols = self.environment.cols
+        offsets = np.array((-cols, cols, -1, 1, 0), dtype=np.int64)
+
+        # Code -1 reads the last offset, which keeps the agent in place
+        return states + offsets[self.moves.reshape(-1)[states]]
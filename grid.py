@@ -0,0 +1,931 @@
+import numpy as np
+
+from solver import Environment
+
+# Action that undoes every action
+OPPOSITE = {'up': 'down', 'down': 'up', 'left': 'right', 'right': 'left'}
+
+MASK_64 = (1 << 64) - 1
+
+
+def wall_key(state):
+    """Wall key
+
+    Pseudo random 64 bit key of a flat cell index (SplitMix64). The fingerprint
+    of a set of walls is the XOR of the keys of its cells, so it can be updated
+    in constant time when a single wall changes.
+
+    Parameters:
+        state (int): Flat index of the cell.
+
+    Returns:
+        key (int): 64 bit key.
+    """
+    z = (state + 0x9E3779B97F4A7C15) & MASK_64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK_64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK_64
+    return z ^ (z >> 31)
+
+
+def wall_keys(states):
+    """Wall keys
+
+    Vectorized version of wall_key.
+
+    Parameters:
+        states (numpy.ndarray): Flat indices of the cells.
+
+    Returns:
+        keys (numpy.ndarray): uint64 key of every cell.
+    """
+    z = states.astype(np.uint64) + np.uint64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+class WallSet(set):
+    """WallSet class
+
+    Set of wall cells that keeps a fingerprint of its contents up to date. The
+    fingerprint is the XOR of the hashes of all the cells, so it changes whenever
+    a wall is added or removed and costs constant time per change.
+
+    Attributes:
+        fingerprint (int): Hash of the current contents.
+    """
+    def __init__(self, cells = ()):
+        super().__init__()
+        self.fingerprint = 0
+        self.update(cells)
+
+    def add(self, cell):
+        if cell not in self:
+            super().add(cell)
+            self.fingerprint ^= hash(cell)
+
+    def discard(self, cell):
+        if cell in self:
+            super().discard(cell)
+            self.fingerprint ^= hash(cell)
+
+    def remove(self, cell):
+        super().remove(cell)
+        self.fingerprint ^= hash(cell)
+
+    def pop(self):
+        cell = super().pop()
+        self.fingerprint ^= hash(cell)
+        return cell
+
+    def clear(self):
+        super().clear()
+        self.fingerprint = 0
+
+    def update(self, *others):
+        for other in others:
+            for cell in other:
+                self.add(cell)
+
+    def difference_update(self, *others):
+        for other in others:
+            for cell in list(other):
+                self.discard(cell)
+
+    def intersection_update(self, *others):
+        for cell in [cell for cell in self if not all(cell in other for other in others)]:
+            self.discard(cell)
+
+    def symmetric_difference_update(self, other):
+        for cell in set(other):
+            if cell in self:
+                self.discard(cell)
+            else:
+                self.add(cell)
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def __isub__(self, other):
+        self.difference_update(other)
+        return self
+
+    def __iand__(self, other):
+        self.intersection_update(other)
+        return self
+
+    def __ixor__(self, other):
+        self.symmetric_difference_update(other)
+        return self
+
+
+class CostMap(dict):
+    """CostMap class
+
+    Dictionary with the cost of entering every cell whose cost is not 1. As in
+    WallSet, a fingerprint of the contents is kept up to date in constant time per
+    change. Costs must be positive integers, assigning 1 removes the cell.
+
+    Attributes:
+        fingerprint (int): Hash of the current contents.
+    """
+    def __init__(self, costs = ()):
+        super().__init__()
+        self.fingerprint = 0
+        self.update(costs)
+
+    def __setitem__(self, cell, cost):
+        if cost < 1 or cost != int(cost):
+            raise ValueError(f"Cost must be a positive integer, got {cost!r}")
+
+        cost = int(cost)
+        self.pop(cell, None)
+
+        if cost != 1:
+            super().__setitem__(cell, cost)
+            self.fingerprint ^= hash((cell, cost))
+
+    def __delitem__(self, cell):
+        self.fingerprint ^= hash((cell, self[cell]))
+        super().__delitem__(cell)
+
+    def pop(self, cell, *default):
+        if cell in self:
+            self.fingerprint ^= hash((cell, self[cell]))
+        return super().pop(cell, *default)
+
+    def popitem(self):
+        cell, cost = super().popitem()
+        self.fingerprint ^= hash((cell, cost))
+        return cell, cost
+
+    def clear(self):
+        super().clear()
+        self.fingerprint = 0
+
+    def setdefault(self, cell, cost = 1):
+        if cell not in self:
+            self[cell] = cost
+        return self.get(cell, 1)
+
+    def update(self, *others, **costs):
+        for other in others + (costs,):
+            for cell, cost in (other.items() if hasattr(other, 'items') else other):
+                self[cell] = cost
+
+
+class Grid(Environment):
+    """Grid class
+
+    Subclass of environment for a rectangular grid with walls.
+    Every state corresponds to the current coordinates of the agent.
+
+    It does not depend on PyGame, so it can be used to run searches without a
+    display (e.g. in servers or batch jobs).
+
+    Attributes:
+        source: Starting state of the system.
+        target: Goal state of the system.
+        explored (set): Set of explored states.
+
+        rows: Row quantity.
+        cols: Column quantity.
+
+        walls (WallSet): Set with all the wall cells. Any set assigned is converted.
+        costs (CostMap): Cost of entering every cell whose cost is not 1, such as mud
+            or water. Any dictionary assigned is converted.
+        path (list): List of steps from source to target cell.
+        heuristic: Optional estimator with estimate(state, target) and refresh(environment)
+            methods, such as a LandmarkIndex, used by cost_to_target and refreshed by
+            Solver at the start of every search.
+        connectivity: Optional index with an is_reachable(source, target) method, such
+            as a ConnectivityIndex, used by is_reachable.
+    """
+    heuristic = None
+    connectivity = None
+
+    def __init__(self, rows = 8, cols = 8):
+        self.rows = rows
+        self.cols = cols
+
+        self.reset()
+
+    @property
+    def walls(self):
+        return self._walls
+
+    @walls.setter
+    def walls(self, cells):
+        self._walls = cells if isinstance(cells, WallSet) else WallSet(cells)
+
+    @property
+    def costs(self):
+        return self._costs
+
+    @costs.setter
+    def costs(self, costs):
+        self._costs = costs if isinstance(costs, CostMap) else CostMap(costs)
+
+    @property
+    def weighted(self):
+        """True if some cell costs more than 1."""
+        return len(self._costs) > 0
+
+    @property
+    def fingerprint(self):
+        """Fingerprint
+
+        Value that identifies the size, walls and costs of the grid. It changes
+        whenever a wall is added or removed or a cost is changed.
+        """
+        return hash((self.rows, self.cols, self._walls.fingerprint, self._costs.fingerprint))
+
+    def reset(self):
+        """Reset grid
+
+        Resets the grid to its initial state. With no source nor target,
+        without walls and with every cell costing 1.
+
+        Also cleans all explored and path cells.
+        """
+        self.walls = set()
+        self.costs = {}
+        self.source = None
+        self.target = None
+        self.heuristic = None
+        self.clean()
+
+    def load(self, environment):
+        """Load environment
+
+        Copies the walls, costs, source and target of a GridEnvironment of the same
+        size, such as a map loaded from a file.
+
+        Parameters:
+            environment (GridEnvironment): Environment to be copied.
+        """
+        if (environment.rows, environment.cols) != (self.rows, self.cols):
+            raise ValueError("The environment must have the same size as the grid")
+
+        decode = environment.decode
+        costs = environment.costs.reshape(-1)
+
+        self.walls = [decode(state) for state in np.flatnonzero(environment.walls).tolist()]
+        self.costs = [(decode(state), int(costs[state])) for state in np.flatnonzero(costs != 1).tolist()]
+        self.source = None if environment.source is None else decode(environment.source)
+        self.target = None if environment.target is None else decode(environment.target)
+        self.clean()
+
+    def clean(self):
+        """Clean grid
+
+        Resets explored set and path. It does not modify selected source and
+        target cells and walls.
+        """
+        self.explored = set()
+        self.path = []
+
+    def get_actions(self, state):
+        """Get actions from environment
+
+        Returns a list of possible actions in the given state.
+        Each action is represented with a string value (up, down, left, right).
+
+        Parameters:
+            state: Current state (agent coordinates).
+
+        Returns:
+            actions (list): A list of actions that can be taken in a state.
+        """
+        actions = set()
+
+        if state[0] > 0:
+            actions.add('up')
+        if state[0] < self.rows - 1:
+            actions.add('down')
+        if state[1] > 0:
+            actions.add('left')
+        if state[1] < self.cols - 1:
+            actions.add('right')
+
+        return actions
+
+    def transition_model(self, state, action):
+        """Transition model
+
+        Returns the new state resulting from performing given action in the
+        current state. If there is a wall in the direction indicated by action
+        returns the same state.
+
+        Parameters:
+            state: Current state (agent coordinates).
+            action: Action to be taken.
+
+        Returns:
+            new_state: State resulting from performing the action.
+        """
+        if action == 'up':
+            i, j = state[0]-1, state[1]
+        if action == 'down':
+            i, j = state[0]+1, state[1]
+        if action == 'left':
+            i, j = state[0], state[1]-1
+        if action == 'right':
+            i, j = state[0], state[1]+1
+
+        if (i, j) not in self.walls:
+            return i, j
+        else:
+            return state
+
+    def successors(self, state):
+        """Get successors
+
+        Returns every cell next to the given one that is not a wall.
+
+        Parameters:
+            state: Current state (agent coordinates).
+
+        Returns:
+            successors (list): A list of pairs of the form (action, new_state).
+        """
+        i, j = state
+        successors = []
+
+        if i > 0 and (i-1, j) not in self.walls:
+            successors.append(('up', (i-1, j)))
+        if i < self.rows - 1 and (i+1, j) not in self.walls:
+            successors.append(('down', (i+1, j)))
+        if j > 0 and (i, j-1) not in self.walls:
+            successors.append(('left', (i, j-1)))
+        if j < self.cols - 1 and (i, j+1) not in self.walls:
+            successors.append(('right', (i, j+1)))
+
+        return successors
+
+    def weighted_successors(self, state):
+        """Get weighted successors
+
+        Moving to a cell costs the cost of the cell.
+
+        Parameters:
+            state: Current state (agent coordinates).
+
+        Returns:
+            successors (list): A list of tuples of the form (action, new_state, cost).
+        """
+        costs = self._costs
+        return [(action, new_state, costs.get(new_state, 1)) for action, new_state in self.successors(state)]
+
+    def predecessors(self, state):
+        """Get predecessors
+
+        Moves are reversible, so the predecessors of a free cell are its successors
+        with the opposite action. A wall cell can not be reached from anywhere.
+
+        Parameters:
+            state: Current state (agent coordinates).
+
+        Returns:
+            predecessors (list): A list of pairs of the form (action, previous_state).
+        """
+        if state in self.walls:
+            return []
+
+        return [(OPPOSITE[action], previous) for action, previous in self.successors(state)]
+
+    def weighted_predecessors(self, state):
+        """Get weighted predecessors
+
+        Every move into a cell costs the cost of the cell.
+
+        Parameters:
+            state: Current state (agent coordinates).
+
+        Returns:
+            predecessors (list): A list of tuples of the form (action, previous_state, cost).
+        """
+        cost = self._costs.get(state, 1)
+        return [(action, previous, cost) for action, previous in self.predecessors(state)]
+
+    def is_wall(self, cell):
+        """Is wall
+
+        Parameters:
+            cell: Cell to be checked.
+
+        Returns:
+            True: If there is a wall in the cell.
+            False: If the cell is free.
+        """
+        return cell in self.walls
+
+    def set_cost(self, cell, cost):
+        """Set cost
+
+        Parameters:
+            cell: Cell to be modified.
+            cost (int): Positive cost of entering the cell.
+        """
+        self._costs[cell] = cost
+
+    def is_reachable(self, source, target):
+        """Is reachable
+
+        Parameters:
+            source: Starting state.
+            target: Goal state.
+
+        Returns:
+            True: If there may be a path from source to target, always without a connectivity index.
+            False: If there is no path.
+        """
+        if self.connectivity is None:
+            return True
+
+        return self.connectivity.is_reachable(source, target)
+
+    def cost_to_target(self, cell):
+        """Estimate cost to target
+
+        Get estimated cost to reach target state from current state.
+        As every state is a pair of coordinates we calculate the Manhattan's 
+        distance from the current position to the target. If a heuristic such as
+        a LandmarkIndex is attached, the best of both estimates is used.
+
+        Parameters:
+            state: Current state.
+
+        Returns:
+            cost (int): integer representing the estimated cost.
+        """
+        cost = abs(cell[0] - self.target[0]) + abs(cell[1] - self.target[1])
+
+        if self.heuristic is not None:
+            cost = max(cost, self.heuristic.estimate(cell, self.target))
+
+        return cost
+
+    def cost_to_source(self, cell):
+        """Estimate cost from source
+
+        Manhattan's distance from the source to the current position.
+
+        Parameters:
+            state: Current state.
+
+        Returns:
+            cost (int): integer representing the estimated cost.
+        """
+        return (abs(cell[0] - self.source[0]) + abs(cell[1] - self.source[1]))
+
+
+class GridEnvironment(Environment):
+    """GridEnvironment class
+
+    Subclass of environment for large grids backed by NumPy arrays.
+    Every state is the flat index of a cell (row * cols + col), so states are plain
+    integers instead of tuples.
+
+    Walls are stored in a uint8 array and every cell keeps a bit mask with the
+    directions that lead to a free cell. Successors are read from a table indexed
+    by that mask, so moves against walls or the border are never generated.
+
+    Entering a cell costs the value of the cell in the costs array, 1 by default.
+
+    Attributes:
+        source (int): Starting state of the system.
+        target (int): Goal state of the system.
+        explored (Bitmap): Explored states.
+
+        rows: Row quantity.
+        cols: Column quantity.
+
+        walls (numpy.ndarray): Array of shape (rows, cols), 1 for every wall cell.
+        costs (numpy.ndarray): uint16 array of shape (rows, cols) with the positive cost
+            of entering every cell.
+        moves (numpy.ndarray): Array of shape (rows, cols) with the valid directions of each cell.
+        fingerprint (int): Value that identifies the size, walls and costs of the grid,
+            it is kept up to date by set_wall, set_cost and compute_moves.
+        min_cost (int): Lowest cost of a cell. It is a lower bound after set_cost
+            raises the cost of the cheapest cells, until compute_moves is called.
+        heuristic: Optional estimator with estimate(state, target) and refresh(environment)
+            methods, such as a LandmarkIndex, used by cost_to_target and refreshed by
+            Solver at the start of every search.
+        connectivity: Optional index with an is_reachable(source, target) method, such
+            as a ConnectivityIndex, used by is_reachable.
+    """
+    ACTIONS = ('up', 'down', 'left', 'right')
+
+    heuristic = None
+    connectivity = None
+
+    def __init__(self, rows, cols, walls = None, costs = None):
+        self.rows = rows
+        self.cols = cols
+        self.size = rows * cols
+
+        if walls is None:
+            self.walls = np.zeros((rows, cols), dtype=np.uint8)
+        else:
+            self.walls = np.ascontiguousarray(walls, dtype=np.uint8).reshape(rows, cols)
+
+        if costs is None:
+            self.costs = np.ones((rows, cols), dtype=np.uint16)
+        else:
+            self.costs = np.ascontiguousarray(costs, dtype=np.uint16).reshape(rows, cols)
+
+        # Offset of the flat index for every action
+        self.offsets = (-cols, cols, -1, 1)
+
+        # For every possible mask, the (action code, offset) pairs it allows
+        self.table = [
+            tuple((code, self.offsets[code]) for code in range(4) if mask & (1 << code))
+            for mask in range(16)
+        ]
+
+        self.moves = np.zeros((rows, cols), dtype=np.uint8)
+        self.compute_moves()
+
+        self.source = None
+        self.target = None
+        self.explored = self.create_explored()
+
+    @classmethod
+    def from_grid(cls, grid):
+        """From grid
+
+        Builds an environment with the same size, walls, costs, source and target as a grid.
+
+        Parameters:
+            grid (Grid): Grid to be converted.
+
+        Returns:
+            environment (GridEnvironment): Equivalent environment.
+        """
+        walls = np.zeros((grid.rows, grid.cols), dtype=np.uint8)
+        for i, j in grid.walls:
+            walls[i, j] = 1
+
+        costs = np.ones((grid.rows, grid.cols), dtype=np.uint16)
+        for (i, j), cost in grid.costs.items():
+            costs[i, j] = cost
+
+        environment = cls(grid.rows, grid.cols, walls, costs)
+
+        if grid.source is not None:
+            environment.source = environment.encode(grid.source)
+        if grid.target is not None:
+            environment.target = environment.encode(grid.target)
+
+        return environment
+
+    def encode(self, cell):
+        """Encode cell
+
+        Parameters:
+            cell (tuple): Coordinates of the form (row, col).
+
+        Returns:
+            state (int): Flat index of the cell.
+        """
+        return cell[0] * self.cols + cell[1]
+
+    def decode(self, state):
+        """Decode state
+
+        Parameters:
+            state (int): Flat index of the cell.
+
+        Returns:
+            cell (tuple): Coordinates of the form (row, col).
+        """
+        return divmod(state, self.cols)
+
+    def decode_path(self, path):
+        """Decode path
+
+        Parameters:
+            path (list): List of actions of the form (state, action).
+
+        Returns:
+            path (list): Same path with the states as (row, col) coordinates.
+        """
+        return [(self.decode(state), action) for state, action in path]
+
+    def compute_moves(self):
+        """Compute moves
+
+        Rebuilds the mask of valid directions of every cell, the cost summary and
+        the fingerprint from the walls and costs arrays. Must be called after
+        modifying the arrays directly.
+        """
+        if (self.costs == 0).any():
+            raise ValueError("Costs must be positive")
+
+        free = self.walls == 0
+        moves = self.moves
+
+        moves.fill(0)
+        moves[1:, :] |= free[:-1, :] * np.uint8(1)
+        moves[:-1, :] |= free[1:, :] * np.uint8(2)
+        moves[:, 1:] |= free[:, :-1] * np.uint8(4)
+        moves[:, :-1] |= free[:, 1:] * np.uint8(8)
+        moves[~free] = 0
+
+        # Flat views sharing memory with the arrays, indexing them returns plain ints
+        self._walls = memoryview(self.walls.reshape(-1))
+        self._moves = memoryview(moves.reshape(-1))
+        self._costs = memoryview(self.costs.reshape(-1))
+
+        # Cells that cost more than 1 and lowest cost of a cell, walls included
+        # since they can be removed later
+        weighted = np.flatnonzero(self.costs != 1)
+        self.weighted_cells = len(weighted)
+        self.min_cost = int(self.costs.min()) if self.size else 1
+
+        keys = wall_keys(np.flatnonzero(self.walls))
+        cost_keys = wall_keys(self.costs.reshape(-1)[weighted].astype(np.uint64) * np.uint64(self.size) + weighted)
+        self.fingerprint = hash((self.rows, self.cols)) ^ int(
+            np.bitwise_xor.reduce(keys, initial=np.uint64(0)) ^ np.bitwise_xor.reduce(cost_keys, initial=np.uint64(0))
+        )
+
+    @property
+    def weighted(self):
+        """True if some cell costs more than 1."""
+        return self.weighted_cells > 0
+
+    def set_wall(self, state, blocked = True):
+        """Set wall
+
+        Adds or removes a wall, updating the valid directions of the cell and its
+        neighbours.
+
+        Parameters:
+            state (int): Cell to be modified.
+            blocked (bool): True to add a wall, False to remove it.
+        """
+        i, j = self.decode(state)
+
+        if bool(self.walls[i, j]) != blocked:
+            self.walls[i, j] = 1 if blocked else 0
+            self.fingerprint ^= wall_key(state)
+
+        for cell in ((i, j), (i-1, j), (i+1, j), (i, j-1), (i, j+1)):
+            if 0 <= cell[0] < self.rows and 0 <= cell[1] < self.cols:
+                self._update_moves(*cell)
+
+    def set_cost(self, state, cost):
+        """Set cost
+
+        Parameters:
+            state (int): Cell to be modified.
+            cost (int): Positive cost of entering the cell.
+        """
+        if not 0 < cost < 1 << 16:
+            raise ValueError(f"Cost must be a positive integer below 65536, got {cost!r}")
+
+        old = self._costs[state]
+
+        if old != cost:
+            # Cells that cost 1 are not part of the fingerprint
+            if old != 1:
+                self.fingerprint ^= wall_key(old * self.size + state)
+                self.weighted_cells -= 1
+            if cost != 1:
+                self.fingerprint ^= wall_key(cost * self.size + state)
+                self.weighted_cells += 1
+
+            self._costs[state] = cost
+            self.min_cost = min(self.min_cost, cost)
+
+    def _update_moves(self, i, j):
+        mask = 0
+
+        if not self.walls[i, j]:
+            if i > 0 and not self.walls[i-1, j]:
+                mask |= 1
+            if i < self.rows - 1 and not self.walls[i+1, j]:
+                mask |= 2
+            if j > 0 and not self.walls[i, j-1]:
+                mask |= 4
+            if j < self.cols - 1 and not self.walls[i, j+1]:
+                mask |= 8
+
+        self.moves[i, j] = mask
+
+    def is_wall(self, state):
+        """Is wall
+
+        Parameters:
+            state (int): Cell to be checked.
+
+        Returns:
+            True: If there is a wall in the cell.
+            False: If the cell is free.
+        """
+        return self._walls[state] != 0
+
+    def get_actions(self, state):
+        """Get actions from environment
+
+        Returns the actions that lead to a free cell.
+
+        Parameters:
+            state (int): Current state.
+
+        Returns:
+            actions (list): A list of actions that can be taken in a state.
+        """
+        return [self.ACTIONS[code] for code, _ in self.table[self._moves[state]]]
+
+    def transition_model(self, state, action):
+        """Transition model
+
+        Parameters:
+            state (int): Current state.
+            action: Action to be taken, it must be one of the actions returned by get_actions.
+
+        Returns:
+            new_state (int): State resulting from performing the action.
+        """
+        return state + self.offsets[self.ACTIONS.index(action)]
+
+    def successors(self, state):
+        """Get successors
+
+        Parameters:
+            state (int): Current state.
+
+        Returns:
+            successors (list): A list of pairs of the form (action, new_state).
+        """
+        actions = self.ACTIONS
+        return [(actions[code], state + offset) for code, offset in self.table[self._moves[state]]]
+
+    def neighbours(self, state):
+        """Get neighbours
+
+        Same as successors, but actions are returned as their index in ACTIONS.
+
+        Parameters:
+            state (int): Current state.
+
+        Returns:
+            neighbours (list): A list of pairs of the form (action code, new_state).
+        """
+        return [(code, state + offset) for code, offset in self.table[self._moves[state]]]
+
+    def weighted_successors(self, state):
+        """Get weighted successors
+
+        Moving to a cell costs the cost of the cell.
+
+        Parameters:
+            state (int): Current state.
+
+        Returns:
+            successors (list): A list of tuples of the form (action, new_state, cost).
+        """
+        actions, costs = self.ACTIONS, self._costs
+        return [
+            (actions[code], state + offset, costs[state + offset])
+            for code, offset in self.table[self._moves[state]]
+        ]
+
+    def predecessors(self, state):
+        """Get predecessors
+
+        Parameters:
+            state (int): Current state.
+
+        Returns:
+            predecessors (list): A list of pairs of the form (action, previous_state).
+        """
+        actions = self.ACTIONS
+        return [(actions[code ^ 1], state + offset) for code, offset in self.table[self._moves[state]]]
+
+    def weighted_predecessors(self, state):
+        """Get weighted predecessors
+
+        Every move into a cell costs the cost of the cell.
+
+        Parameters:
+            state (int): Current state.
+
+        Returns:
+            predecessors (list): A list of tuples of the form (action, previous_state, cost).
+        """
+        actions, cost = self.ACTIONS, self._costs[state]
+        return [(actions[code ^ 1], state + offset, cost) for code, offset in self.table[self._moves[state]]]
+
+    def create_explored(self):
+        """Create explored set
+
+        Returns:
+            explored (Bitmap): An empty bitmap with room for every cell.
+        """
+        return Bitmap(self.size)
+
+    def is_reachable(self, source, target):
+        """Is reachable
+
+        Parameters:
+            source: Starting state.
+            target: Goal state.
+
+        Returns:
+            True: If there may be a path from source to target, always without a connectivity index.
+            False: If there is no path.
+        """
+        if self.connectivity is None:
+            return True
+
+        return self.connectivity.is_reachable(source, target)
+
+    def cost_to_target(self, state):
+        """Estimate cost to target
+
+        Manhattan's distance from the current cell to the target, scaled by the
+        lowest cost of a cell, or the estimate of the attached heuristic if it is better.
+
+        Parameters:
+            state (int): Current state.
+
+        Returns:
+            cost (int): integer representing the estimated cost.
+        """
+        i, j = divmod(state, self.cols)
+        ti, tj = divmod(self.target, self.cols)
+        cost = (abs(i - ti) + abs(j - tj)) * self.min_cost
+
+        if self.heuristic is not None:
+            cost = max(cost, self.heuristic.estimate(state, self.target))
+
+        return cost
+
+    def cost_to_source(self, state):
+        """Estimate cost from source
+
+        Manhattan's distance from the source to the current cell, scaled by the
+        lowest cost of a cell.
+
+        Parameters:
+            state (int): Current state.
+
+        Returns:
+            cost (int): integer representing the estimated cost.
+        """
+        i, j = divmod(state, self.cols)
+        si, sj = divmod(self.source, self.cols)
+        return (abs(i - si) + abs(j - sj)) * self.min_cost
+
+
+class Bitmap:
+    """Bitmap class
+
+    Set of integer states in the range [0, size) stored as one bit per state, the
+    state s being bit s & 7 of byte s >> 3, as in np.packbits with little bit order.
+
+    Attributes:
+        size (int): Number of states that fit in the set.
+        bits (numpy.ndarray): uint8 array of (size + 7) // 8 bytes with the bits of the states.
+    """
+    def __init__(self, size):
+        self.size = size
+        self.bits = np.zeros((size + 7) >> 3, dtype=np.uint8)
+        self._bits = memoryview(self.bits)
+
+    def __contains__(self, state):
+        return self._bits[state >> 3] & (1 << (state & 7)) != 0
+
+    def __iter__(self):
+        return iter(np.flatnonzero(self.mask()).tolist())
+
+    def __len__(self):
+        return int(np.unpackbits(self.bits).sum(dtype=np.int64))
+
+    def mask(self):
+        """Mask
+
+        Returns:
+            mask (numpy.ndarray): Boolean array of size states, True for every state in the set.
+        """
+        return np.unpackbits(self.bits, count=self.size, bitorder='little').view(bool)
+
+    def add(self, state):
+        """Add state
+
+        Parameters:
+            state (int): State to be added.
+        """
+        self._bits[state >> 3] |= 1 << (state & 7)
+
+    def discard(self, state):
+        """Discard state
+
+        Parameters:
+            state (int): State to be removed, if present.
+        """
+        self._bits[state >> 3] &= ~(1 << (state & 7)) & 0xFF
@@ -0,0 +1,516 @@
+import heapq
+import itertools
+
+from collections import deque
+
+import numpy as np
+
+from grid import GridEnvironment
+from solver import Node
+
+# Border runs of free cells at least this long get two transitions, one at every end
+LONG_ENTRANCE = 6
+
+
+class HierarchicalPlanner:
+    """Hierarchical path-finding planner (HPA*)
+
+    Plans paths on large GridEnvironments through a small abstract graph. The map
+    is split into square clusters. Every run of free cells along the border between
+    two clusters is an entrance, crossed by one or two transitions: pairs of free
+    cells facing each other, one at each side of the border. The cells of the
+    transitions are the nodes of the abstract graph, connected by the transitions
+    themselves (cost 1) and by the distances between the nodes of every cluster
+    without leaving it.
+
+    A query links the source and target to the nodes of their clusters, searches the
+    abstract graph with A*, and refines every abstract edge into cells only when it
+    is needed. Paths are near optimal, usually within a few percent of the shortest path.
+
+    Distances inside the clusters are computed with a breadth-first search that
+    runs for one node of every cluster at once, vectorized with NumPy. Every move
+    costs 1, searching a grid with terrain costs raises ValueError.
+
+    When walls change, the clusters that contain them are rebuilt: their entrances,
+    the distances between their nodes, and the links of the new nodes of their
+    neighbours. Changes are detected through the environment fingerprint, or can be
+    reported directly with update_walls.
+
+    Attributes:
+        environment (GridEnvironment): Grid to be searched.
+        cluster_size (int): Side of the clusters, in cells.
+        edges (dict): For every abstract node, the cost to every node it is connected to.
+        expanded (int): Abstract nodes expanded by the last search.
+    """
+    def __init__(self, environment, cluster_size = 16):
+        if not isinstance(environment, GridEnvironment):
+            raise ValueError("HierarchicalPlanner needs a GridEnvironment")
+
+        self.environment = environment
+        self.cluster_size = cluster_size
+        self.expanded = 0
+
+        self.build()
+
+    def build(self):
+        """Build abstract graph
+
+        Computes the entrances of every cluster and the distances between their
+        nodes. Called on creation, it only needs to be called again when the size of
+        the map changes.
+        """
+        environment = self.environment
+        size = self.cluster_size
+
+        self.cluster_rows = -(-environment.rows // size)
+        self.cluster_cols = -(-environment.cols // size)
+
+        # Abstract nodes of every cluster, and transitions of every border
+        self.entrances = {}
+        self.transitions = {}
+        self.references = {}
+        self.edges = {}
+
+        # Distances of the breadth-first searches, -1 for cells not reached
+        self._distances = np.full(environment.size, -1, dtype=np.int32)
+
+        # Directions of every cell that do not leave its cluster, as in GridEnvironment.moves
+        rows, cols = np.indices((environment.rows, environment.cols))
+        inside = np.zeros((environment.rows, environment.cols), dtype=np.uint8)
+        inside |= (rows % size != 0) * np.uint8(1)
+        inside |= (rows % size != size - 1) * np.uint8(2)
+        inside |= (cols % size != 0) * np.uint8(4)
+        inside |= (cols % size != size - 1) * np.uint8(8)
+        self._inside = inside.reshape(-1)
+
+        new = []
+        for cluster in range(self.cluster_rows * self.cluster_cols):
+            for neighbour in self._forward_neighbours(cluster):
+                new.extend(self._build_border(cluster, neighbour))
+
+        self._link(new)
+        self._snapshot()
+
+    def search_path(self, observer = None):
+        """Search path from source to target
+
+        Parameters:
+            observer (SearchObserver): Optional object notified of the abstract nodes
+                expanded and the path found.
+
+        Returns:
+            path (list): List of actions of the form (state, action).
+            None: If there is no possible path.
+        """
+        steps = self.iter_path(observer)
+
+        if steps is None:
+            return None
+
+        path = list(steps)
+
+        if observer is not None:
+            observer.on_path(path)
+
+        return path
+
+    def iter_path(self, observer = None):
+        """Iterate path from source to target
+
+        Searches the abstract graph and returns an iterator over the steps of the
+        path. Every abstract edge is refined into cells when the iterator reaches
+        it, so an agent can start moving before the whole path is known.
+
+        Parameters:
+            observer (SearchObserver): Optional object notified of the abstract nodes expanded.
+
+        Returns:
+            steps (iterator): Steps of the form (state, action).
+            None: If there is no possible path.
+        """
+        if self.environment.weighted:
+            raise ValueError("HPA* needs a grid where every move costs 1")
+
+        if self.environment.fingerprint != self.fingerprint:
+            self.update_walls(self._changed_walls())
+
+        nodes = self._search_abstract(observer)
+
+        if nodes is None:
+            return None
+
+        return self._refine(nodes)
+
+    def update_walls(self, cells):
+        """Update walls
+
+        Rebuilds the clusters that contain cells whose wall was added or removed.
+
+        Parameters:
+            cells: Iterable of states that changed.
+        """
+        clusters = {self._cluster(cell) for cell in cells}
+
+        for cluster in clusters:
+            self._rebuild(cluster)
+
+        self._snapshot()
+
+    def _snapshot(self):
+        """Remember the current walls to detect later changes."""
+        self.walls = self.environment.walls.copy()
+        self.fingerprint = self.environment.fingerprint
+
+    def _changed_walls(self):
+        """Cells whose wall status differs from the last snapshot."""
+        return np.flatnonzero(self.environment.walls != self.walls).tolist()
+
+    def _cluster(self, state):
+        """Cluster of a cell."""
+        i, j = divmod(state, self.environment.cols)
+        return i // self.cluster_size * self.cluster_cols + j // self.cluster_size
+
+    def _forward_neighbours(self, cluster):
+        """Clusters to the right and below a cluster."""
+        ci, cj = divmod(cluster, self.cluster_cols)
+        neighbours = []
+
+        if cj + 1 < self.cluster_cols:
+            neighbours.append(cluster + 1)
+        if ci + 1 < self.cluster_rows:
+            neighbours.append(cluster + self.cluster_cols)
+
+        return neighbours
+
+    def _adjacent_clusters(self, cluster):
+        """Every cluster that shares a border with a cluster, as (first, second) pairs in order."""
+        borders = [(cluster, neighbour) for neighbour in self._forward_neighbours(cluster)]
+        ci, cj = divmod(cluster, self.cluster_cols)
+
+        if cj > 0:
+            borders.append((cluster - 1, cluster))
+        if ci > 0:
+            borders.append((cluster - self.cluster_cols, cluster))
+
+        return borders
+
+    def _build_border(self, first, second):
+        """Build border
+
+        Finds the transitions of the border between a cluster and the one to its right
+        or below it, and adds their cells as abstract nodes.
+
+        Returns:
+            new (list): Nodes that did not exist before.
+        """
+        environment = self.environment
+        size, cols = self.cluster_size, environment.cols
+        walls = environment.walls
+
+        ci, cj = divmod(first, self.cluster_cols)
+
+        if second == first + 1 and self.cluster_cols > 1:
+            # Vertical border: cells of the last column of first and the first of second
+            start = ci * size
+            end = min(start + size, environment.rows)
+            column = cj * size + size - 1
+            free = (walls[start:end, column] == 0) & (walls[start:end, column + 1] == 0)
+            cells = [((start + k) * cols + column, (start + k) * cols + column + 1) for k in range(end - start)]
+        else:
+            # Horizontal border: cells of the last row of first and the first of second
+            start = cj * size
+            end = min(start + size, cols)
+            row = ci * size + size - 1
+            free = (walls[row, start:end] == 0) & (walls[row + 1, start:end] == 0)
+            cells = [(row * cols + start + k, (row + 1) * cols + start + k) for k in range(end - start)]
+
+        transitions = []
+        run = []
+
+        for k, open_ in enumerate(free.tolist() + [False]):
+            if open_:
+                run.append(k)
+                continue
+
+            if len(run) >= LONG_ENTRANCE:
+                transitions.extend((cells[run[0]], cells[run[-1]]))
+            elif run:
+                transitions.append(cells[run[(len(run) - 1) // 2]])
+
+            run = []
+
+        self.transitions[first, second] = transitions
+
+        new = []
+        for a, b in transitions:
+            for state, other, cluster in ((a, b, first), (b, a, second)):
+                if state not in self.edges:
+                    self.edges[state] = {}
+                    self.references[state] = 0
+                    self.entrances.setdefault(cluster, set()).add(state)
+                    new.append(state)
+
+                self.references[state] += 1
+                self.edges[state][other] = 1
+
+        return new
+
+    def _remove_border(self, first, second):
+        """Remove the transitions of a border, and the nodes only used by them."""
+        for a, b in self.transitions.pop((first, second), ()):
+            self.edges[a].pop(b, None)
+            self.edges[b].pop(a, None)
+
+            for state, cluster in ((a, first), (b, second)):
+                self.references[state] -= 1
+
+                if self.references[state] == 0:
+                    self._remove_node(state, cluster)
+
+    def _remove_node(self, state, cluster):
+        for other in self.edges.pop(state):
+            self.edges[other].pop(state, None)
+
+        del self.references[state]
+        self.entrances[cluster].discard(state)
+
+    def _rebuild(self, cluster):
+        """Rebuild cluster
+
+        Replaces the entrances of a cluster and the distances between its nodes. The
+        neighbours keep their nodes and distances, only their new nodes are linked.
+        """
+        borders = self._adjacent_clusters(cluster)
+
+        for first, second in borders:
+            self._remove_border(first, second)
+
+        new = []
+        for first, second in borders:
+            new.extend(self._build_border(first, second))
+
+        # Distances inside the cluster may have changed for every node
+        for state in self.entrances.get(cluster, ()):
+            edges = self.edges[state]
+            for other in [other for other in edges if self._cluster(other) == cluster]:
+                del edges[other]
+
+        self._link(list(self.entrances.get(cluster, ())) + [state for state in new if self._cluster(state) != cluster])
+
+    def _link(self, states):
+        """Link nodes
+
+        Connects every node to the other nodes of its cluster reachable without
+        leaving it. Nodes are processed in rounds, with at most one node of every
+        cluster per round, and every round is a single vectorized breadth-first search.
+
+        Parameters:
+            states (list): Nodes to be linked.
+        """
+        if not states:
+            return
+
+        states = np.array(states, dtype=np.int64)
+        clusters = self._clusters(states)
+
+        # Round of every node: its position among the nodes of the same cluster
+        order = np.argsort(clusters, kind='stable')
+        states, clusters = states[order], clusters[order]
+        first = np.r_[0, np.flatnonzero(np.diff(clusters)) + 1]
+        rounds = np.arange(len(states)) - np.repeat(first, np.diff(np.r_[first, len(states)]))
+
+        # Nodes of the clusters involved, the targets of the searches
+        involved = np.unique(clusters)
+        targets = np.array([state for cluster in involved.tolist() for state in self.entrances.get(cluster, ())], dtype=np.int64)
+        target_clusters = self._clusters(targets)
+
+        for number in range(int(rounds.max()) + 1):
+            sources = states[rounds == number]
+            source_clusters = clusters[rounds == number]
+            visited = self._bfs(sources)
+
+            source_of = np.full(self.cluster_rows * self.cluster_cols, -1, dtype=np.int64)
+            source_of[source_clusters] = sources
+
+            origins = source_of[target_clusters]
+            distances = self._distances[targets]
+            found = (origins >= 0) & (distances > 0)
+
+            for origin, target, distance in zip(origins[found].tolist(), targets[found].tolist(), distances[found].tolist()):
+                self.edges[origin][target] = distance
+                self.edges[target][origin] = distance
+
+            self._distances[visited] = -1
+
+    def _clusters(self, states):
+        """Vectorized version of _cluster."""
+        rows, cols = np.divmod(states, self.environment.cols)
+        return rows // self.cluster_size * self.cluster_cols + cols // self.cluster_size
+
+    def _bfs(self, sources):
+        """Breadth-first search inside clusters
+
+        Fills the distances from every source to the cells of its cluster. There must
+        be at most one source per cluster.
+
+        Parameters:
+            sources (numpy.ndarray): Starting cells.
+
+        Returns:
+            visited (numpy.ndarray): Every cell reached, to be reset afterwards.
+        """
+        cols = self.environment.cols
+        moves = self.environment.moves.reshape(-1)
+        inside = self._inside
+        distances = self._distances
+
+        frontier = sources
+        distances[frontier] = 0
+        visited = [frontier]
+        distance = 0
+
+        while frontier.size:
+            distance += 1
+            masks = moves[frontier] & inside[frontier]
+
+            reached = np.concatenate((
+                frontier[masks & 1 != 0] - cols,
+                frontier[masks & 2 != 0] + cols,
+                frontier[masks & 4 != 0] - 1,
+                frontier[masks & 8 != 0] + 1,
+            ))
+            reached = reached[distances[reached] < 0]
+
+            # Cells reached more than once keep only the last position they were written to
+            positions = np.arange(reached.size, dtype=np.int32)
+            distances[reached] = -2 - positions
+            frontier = reached[distances[reached] == -2 - positions]
+
+            distances[frontier] = distance
+            visited.append(frontier)
+
+        return np.concatenate(visited)
+
+    def _search_abstract(self, observer):
+        """Search abstract graph
+
+        Adds the source and target as temporary nodes when they are not nodes
+        already, and searches the abstract graph with A*.
+
+        Returns:
+            nodes (list): Abstract nodes from source to target.
+            None: If there is no possible path.
+        """
+        environment = self.environment
+        source, target = environment.source, environment.target
+
+        self.expanded = 0
+
+        if source == target:
+            return [source]
+
+        # The target is added first, so the source is linked to it if they share a cluster
+        temporary = [state for state in (target, source) if state not in self.edges and not environment.is_wall(state)]
+
+        for state in temporary:
+            self.edges[state] = {}
+            self.references[state] = 0
+            self.entrances.setdefault(self._cluster(state), set()).add(state)
+            self._link([state])
+
+        try:
+            return self._a_star(source, target, observer)
+        finally:
+            for state in temporary:
+                self._remove_node(state, self._cluster(state))
+
+    def _a_star(self, source, target, observer):
+        if source not in self.edges or target not in self.edges:
+            return None
+
+        cols = self.environment.cols
+        ti, tj = divmod(target, cols)
+
+        def heuristic(state):
+            i, j = divmod(state, cols)
+            return abs(i - ti) + abs(j - tj)
+
+        counter = itertools.count()
+        costs = {source: 0}
+        parents = {source: None}
+        frontier = [(heuristic(source), next(counter), source)]
+        closed = set()
+
+        while frontier:
+            _, _, state = heapq.heappop(frontier)
+
+            if state in closed:
+                continue
+
+            if state == target:
+                nodes = []
+                while state is not None:
+                    nodes.append(state)
+                    state = parents[state]
+                nodes.reverse()
+                return nodes
+
+            closed.add(state)
+            self.expanded += 1
+
+            if observer is not None:
+                observer.on_expand(Node(state=state, parent=None, action=None))
+
+            for other, distance in self.edges[state].items():
+                cost = costs[state] + distance
+
+                if other not in closed and cost < costs.get(other, cost + 1):
+                    costs[other] = cost
+                    parents[other] = state
+                    heapq.heappush(frontier, (cost + heuristic(other), next(counter), other))
+
+        return None
+
+    def _refine(self, nodes):
+        """Steps of the path through the abstract nodes, refined one edge at a time."""
+        actions = self.environment.ACTIONS
+        offsets = self.environment.offsets
+
+        for start, end in zip(nodes, nodes[1:]):
+
+            # Transitions are a single step between clusters
+            if self._cluster(start) != self._cluster(end):
+                yield end, actions[offsets.index(end - start)]
+            else:
+                yield from self._segment(start, end)
+
+    def _segment(self, start, end):
+        """Shortest path between two cells of the same cluster without leaving it."""
+        environment = self.environment
+        actions = environment.ACTIONS
+        cluster = self._cluster(start)
+
+        parents = {start: None}
+        queue = deque([start])
+
+        while queue:
+            state = queue.popleft()
+
+            if state == end:
+                break
+
+            for code, new_state in environment.neighbours(state):
+                if new_state not in parents and self._cluster(new_state) == cluster:
+                    parents[new_state] = (state, code)
+                    queue.append(new_state)
+
+        path = []
+        state = end
+
+        while parents[state] is not None:
+            previous, code = parents[state]
+            path.append((state, actions[code]))
+            state = previous
+
+        path.reverse()
+        return path
@@ -0,0 +1,253 @@
+import heapq
+import itertools
+
+import numpy as np
+
+from grid import GridEnvironment
+from solver import Node
+
+INFINITY = float('inf')
+
+
+class DStarLite:
+    """D* Lite incremental planner
+
+    Plans the shortest path from source to target on a Grid or GridEnvironment
+    and keeps the search state (g and rhs values and the priority queue) between
+    queries. When walls are added or removed, or the source moves, only the
+    states whose distance to the target changed are processed again, so the cost
+    of replanning depends on the size of the change and not on the size of the map.
+
+    The search runs backwards from the target, so g(s) is the distance from s to
+    the target and the path is read by following the cheapest successors from the
+    source. Changes to the walls are detected through the environment fingerprint,
+    or can be reported directly with update_walls.
+
+    Every move costs 1, planning on a grid with terrain costs raises ValueError.
+
+    Attributes:
+        environment: Grid or GridEnvironment to be searched.
+        expanded (int): States expanded by the last call to plan.
+    """
+    def __init__(self, environment):
+        self.environment = environment
+
+        if isinstance(environment, GridEnvironment):
+            self._coords = environment.decode
+        else:
+            self._coords = tuple
+
+        self._initialize()
+
+    def _initialize(self):
+        """Start a new search for the current source, target and walls."""
+        environment = self.environment
+
+        self.target = environment.target
+        self.start = self.last = environment.source
+        self.key_modifier = 0
+
+        self.g = {}
+        self.rhs = {self.target: 0}
+
+        self.queue = []
+        self.queued = {}
+        self.counter = itertools.count()
+
+        self.expanded = 0
+
+        self._snapshot()
+        self._push(self.target)
+
+    def _snapshot(self):
+        """Remember the current walls to detect later changes."""
+        walls = self.environment.walls
+        self.walls = walls.copy() if isinstance(walls, np.ndarray) else set(walls)
+        self.fingerprint = self.environment.fingerprint
+
+    def plan(self, observer = None):
+        """Plan path from source to target
+
+        Brings the search up to date with the environment and returns the path.
+        The first call performs a full search.
+
+        Parameters:
+            observer (SearchObserver): Optional object notified of the states expanded
+                and the path found.
+
+        Returns:
+            path (list): List of actions of the form (state, action).
+            None: If there is no possible path.
+        """
+        environment = self.environment
+
+        if environment.weighted:
+            raise ValueError("D* Lite needs a grid where every move costs 1")
+
+        if environment.target != self.target:
+            self._initialize()
+
+        if environment.source != self.start:
+            self.move_source(environment.source)
+
+        if environment.fingerprint != self.fingerprint:
+            self.update_walls(self._changed_walls())
+
+        self.expanded = 0
+        self._compute_shortest_path(observer)
+
+        path = self._extract_path()
+
+        if observer is not None and path is not None:
+            observer.on_path(path)
+
+        return path
+
+    def move_source(self, source):
+        """Move source
+
+        Parameters:
+            source: New starting state.
+        """
+        self.key_modifier += self._distance(self.last, source)
+        self.start = self.last = source
+
+    def update_walls(self, cells):
+        """Update walls
+
+        Reports cells whose wall was added or removed since the last plan, so they
+        are repaired on the next call without comparing the whole map.
+
+        Parameters:
+            cells: Iterable of states that changed.
+        """
+        environment = self.environment
+
+        for cell in cells:
+            if isinstance(self.walls, np.ndarray):
+                self.walls[self._coords(cell)] = environment.walls[self._coords(cell)]
+            elif environment.is_wall(cell):
+                self.walls.add(cell)
+            else:
+                self.walls.discard(cell)
+
+            # The edges of the cell and all its neighbours may have changed
+            self._update_vertex(cell)
+            for state in self._adjacent(cell):
+                self._update_vertex(state)
+
+        self.fingerprint = environment.fingerprint
+
+    def _changed_walls(self):
+        """Cells whose wall status differs from the last snapshot."""
+        walls = self.environment.walls
+
+        if isinstance(walls, np.ndarray):
+            return np.flatnonzero(walls != self.walls).tolist()
+
+        return list(self.walls ^ walls)
+
+    def _adjacent(self, state):
+        """Every state next to a cell, whether it is a wall or not."""
+        i, j = self._coords(state)
+        rows, cols = self.environment.rows, self.environment.cols
+
+        cells = [(i + di, j + dj) for di, dj in ((-1, 0), (1, 0), (0, -1), (0, 1))
+                 if 0 <= i + di < rows and 0 <= j + dj < cols]
+
+        if isinstance(self.environment, GridEnvironment):
+            return [self.environment.encode(cell) for cell in cells]
+
+        return cells
+
+    def _distance(self, a, b):
+        """Manhattan's distance between two states."""
+        (ai, aj), (bi, bj) = self._coords(a), self._coords(b)
+        return abs(ai - bi) + abs(aj - bj)
+
+    def _key(self, state):
+        cost = min(self.g.get(state, INFINITY), self.rhs.get(state, INFINITY))
+        return cost + self._distance(self.start, state) + self.key_modifier, cost
+
+    def _push(self, state):
+        key = self._key(state)
+        self.queued[state] = key
+        heapq.heappush(self.queue, (key, next(self.counter), state))
+
+    def _top(self):
+        """Discard outdated entries and return the top entry, None if the queue is empty."""
+        while self.queue:
+            key, _, state = self.queue[0]
+
+            if self.queued.get(state) == key:
+                return self.queue[0]
+
+            heapq.heappop(self.queue)
+
+        return None
+
+    def _update_vertex(self, state):
+        environment = self.environment
+
+        if state != self.target:
+            if environment.is_wall(state):
+                self.rhs[state] = INFINITY
+            else:
+                self.rhs[state] = min((1 + self.g.get(successor, INFINITY)
+                                       for _, successor in environment.successors(state)), default=INFINITY)
+
+        self.queued.pop(state, None)
+
+        if self.g.get(state, INFINITY) != self.rhs.get(state, INFINITY):
+            self._push(state)
+
+    def _compute_shortest_path(self, observer):
+        environment = self.environment
+        g, rhs = self.g, self.rhs
+
+        while True:
+            top = self._top()
+            start = self.start
+
+            if top is None or (top[0] >= self._key(start) and rhs.get(start, INFINITY) == g.get(start, INFINITY)):
+                break
+
+            old_key, _, state = heapq.heappop(self.queue)
+            del self.queued[state]
+
+            new_key = self._key(state)
+
+            if old_key < new_key:
+                self._push(state)
+                continue
+
+            self.expanded += 1
+
+            if observer is not None:
+                observer.on_expand(Node(state=state, parent=None, action=None))
+
+            if g.get(state, INFINITY) > rhs.get(state, INFINITY):
+                g[state] = rhs[state]
+            else:
+                g[state] = INFINITY
+                self._update_vertex(state)
+
+            for _, predecessor in environment.predecessors(state):
+                self._update_vertex(predecessor)
+
+    def _extract_path(self):
+        """Follow the cheapest successors from the source to the target."""
+        environment = self.environment
+        g = self.g
+
+        state = self.start
+        if g.get(state, INFINITY) == INFINITY and state != self.target:
+            return None
+
+        path = []
+
+        while state != self.target:
+            action, state = min(environment.successors(state), key=lambda successor: g.get(successor[1], INFINITY))
+            path.append((state, action))
+
+        return path
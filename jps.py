@@ -0,0 +1,235 @@
+import heapq
+import itertools
+
+from solver import Node, complete
+
+# Action that moves in every (row, col) direction
+ACTIONS = {(-1, 0): 'up', (1, 0): 'down', (0, -1): 'left', (0, 1): 'right'}
+
+
+class JumpPointSearch:
+    """Jump Point Search
+
+    A* variant for uniform-cost 4-connected grids. Instead of adding every
+    neighbour to the frontier, it moves in straight lines ("jumps") until it finds
+    a cell where the optimal path may need to turn (a jump point), so symmetric
+    paths through open areas are never expanded.
+
+    Horizontal jumps stop at cells with a forced neighbour: a free cell above or
+    below whose previous cell in the same row is blocked. Vertical jumps stop at
+    cells with a forced neighbour to the left or right, and also at every cell
+    from which a horizontal jump finds a jump point.
+
+    Works with Grid (cells as coordinates) and GridEnvironment (cells as flat indices).
+    Terrain costs are not supported, searching a weighted grid raises ValueError.
+
+    Attributes:
+        environment: Grid like environment to be searched.
+    """
+    def __init__(self, environment):
+        self.environment = environment
+
+        rows, cols = environment.rows, environment.cols
+
+        # GridEnvironment numbers the cells, Grid uses the coordinates as states
+        if hasattr(environment, 'decode'):
+            walls = environment.walls
+            self.free = lambda i, j: 0 <= i < rows and 0 <= j < cols and not walls[i, j]
+            self.encode, self.decode = environment.encode, environment.decode
+        else:
+            walls = environment.walls
+            self.free = lambda i, j: 0 <= i < rows and 0 <= j < cols and (i, j) not in walls
+            self.encode = self.decode = tuple
+
+    def search_path(self, observer = None):
+        """Search path from source to target
+
+        Parameters:
+            observer (SearchObserver): Optional object notified of the search progress.
+                It is notified only for jump points.
+
+        Returns:
+            path (list): List of actions of the form (state, action), with every
+                step between jump points.
+            None: If there is no possible path.
+        """
+        return complete(self.expansions(observer))
+
+    def expansions(self, observer = None):
+        """Search generator
+
+        Same as search_path, yielding after every jump point expanded.
+
+        Parameters:
+            observer (SearchObserver): Optional object notified of the search progress.
+
+        Returns:
+            path (list): List of actions of the form (state, action).
+            None: If there is no possible path.
+        """
+        environment = self.environment
+
+        if environment.weighted:
+            raise ValueError("Jump point search needs a grid where every move costs 1")
+
+        environment.explored = environment.create_explored()
+
+        source = tuple(self.decode(environment.source))
+        target = tuple(self.decode(environment.target))
+
+        def heuristic(cell):
+            return abs(cell[0] - target[0]) + abs(cell[1] - target[1])
+
+        counter = itertools.count()
+
+        # Previous jump point and cost of every jump point reached
+        parents = {source: None}
+        costs = {source: 0}
+        frontier = [(heuristic(source), heuristic(source), next(counter), source, 0)]
+        closed = set()
+
+        while frontier:
+            _, _, _, cell, cost = heapq.heappop(frontier)
+
+            if cell in closed or cost != costs[cell]:
+                continue
+
+            if cell == target:
+                path = self._expand_path(parents, target)
+
+                if observer is not None:
+                    observer.on_path(path)
+
+                return path
+
+            closed.add(cell)
+
+            if observer is not None:
+                observer.on_expand(Node(state=self.encode(cell), parent=None, action=None))
+
+            for direction in self._directions(cell, parents[cell]):
+                jump_point = self._jump(cell, direction, target)
+
+                if jump_point is None or jump_point in closed:
+                    continue
+
+                new_cost = cost + abs(jump_point[0] - cell[0]) + abs(jump_point[1] - cell[1])
+
+                if jump_point in costs and costs[jump_point] <= new_cost:
+                    continue
+
+                parents[jump_point] = cell
+                costs[jump_point] = new_cost
+
+                if observer is not None:
+                    observer.on_generate(Node(state=self.encode(jump_point), parent=None, action=ACTIONS[direction]))
+
+                h = heuristic(jump_point)
+                heapq.heappush(frontier, (new_cost + h, h, next(counter), jump_point, new_cost))
+
+            environment.explored.add(self.encode(cell))
+
+            yield
+
+        return None
+
+    def _directions(self, cell, parent):
+        """Directions to jump from a cell
+
+        The source is expanded in every direction. Other jump points keep moving
+        in the direction they were reached, and may also turn 90 degrees.
+
+        Parameters:
+            cell (tuple): Jump point being expanded.
+            parent (tuple): Jump point it was reached from, None for the source.
+
+        Returns:
+            directions (list): List of (row, col) unit steps.
+        """
+        free = self.free
+        i, j = cell
+
+        if parent is None:
+            candidates = list(ACTIONS)
+        else:
+            di = (i > parent[0]) - (i < parent[0])
+            dj = (j > parent[1]) - (j < parent[1])
+
+            if di == 0:
+                candidates = [(0, dj), (-1, 0), (1, 0)]
+            else:
+                candidates = [(di, 0), (0, -1), (0, 1)]
+
+        return [(di, dj) for di, dj in candidates if free(i + di, j + dj)]
+
+    def _jump(self, cell, direction, target):
+        """Jump
+
+        Moves from a cell in a straight line until a jump point is found.
+
+        Parameters:
+            cell (tuple): Starting cell.
+            direction (tuple): (row, col) unit step.
+            target (tuple): Target cell.
+
+        Returns:
+            jump_point (tuple): The first jump point in that direction.
+            None: If a wall or the border is reached first.
+        """
+        free = self.free
+        i, j = cell
+        di, dj = direction
+
+        while True:
+            i, j = i + di, j + dj
+
+            if not free(i, j):
+                return None
+
+            if (i, j) == target:
+                return i, j
+
+            if di == 0:
+                if (free(i-1, j) and not free(i-1, j-dj)) or (free(i+1, j) and not free(i+1, j-dj)):
+                    return i, j
+            else:
+                if (free(i, j-1) and not free(i-di, j-1)) or (free(i, j+1) and not free(i-di, j+1)):
+                    return i, j
+
+                # A vertical jump stops where a horizontal one would find a jump point
+                if self._jump((i, j), (0, -1), target) or self._jump((i, j), (0, 1), target):
+                    return i, j
+
+    def _expand_path(self, parents, target):
+        """Expand path
+
+        Builds the full step by step path from the chain of jump points.
+
+        Parameters:
+            parents (dict): Previous jump point of every jump point.
+            target (tuple): Last jump point.
+
+        Returns:
+            path (list): List of actions of the form (state, action).
+        """
+        jump_points = []
+
+        cell = target
+        while cell is not None:
+            jump_points.append(cell)
+            cell = parents[cell]
+
+        jump_points.reverse()
+
+        path = []
+
+        for (i, j), end in zip(jump_points, jump_points[1:]):
+            di = (end[0] > i) - (end[0] < i)
+            dj = (end[1] > j) - (end[1] < j)
+            action = ACTIONS[(di, dj)]
+
+            while (i, j) != end:
+                i, j = i + di, j + dj
+                path.append((self.encode((i, j)), action))
+
+        return path
@@ -0,0 +1,302 @@
+import hashlib
+
+from collections import deque
+
+import numpy as np
+
+from grid import GridEnvironment
+
+
+def wall_fingerprint(environment):
+    """Wall fingerprint
+
+    Digest of the size and walls of a grid, used to know whether an index built
+    for it is still valid.
+
+    Parameters:
+        environment: Grid or GridEnvironment.
+
+    Returns:
+        fingerprint (str): Hexadecimal digest.
+    """
+    if isinstance(environment, GridEnvironment):
+        walls = environment.walls
+    else:
+        walls = np.zeros((environment.rows, environment.cols), dtype=np.uint8)
+        if environment.walls:
+            walls[tuple(np.array(list(environment.walls)).T)] = 1
+
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.array(walls.shape, dtype=np.int64).tobytes())
+    digest.update(np.packbits(walls).tobytes())
+    return digest.hexdigest()
+
+
+def as_grid_environment(environment):
+    """As grid environment
+
+    Parameters:
+        environment: Grid or GridEnvironment.
+
+    Returns:
+        environment (GridEnvironment): The same environment, or an equivalent one for a Grid.
+    """
+    if isinstance(environment, GridEnvironment):
+        return environment
+    return GridEnvironment.from_grid(environment)
+
+
+def bfs_distances(environment, state):
+    """BFS distances
+
+    Exact number of steps from a cell to every other cell of a grid.
+
+    Parameters:
+        environment (GridEnvironment): Grid to be explored.
+        state (int): Starting cell.
+
+    Returns:
+        distances (numpy.ndarray): Flat int32 array, -1 for unreachable cells.
+    """
+    distances = np.full(environment.size, -1, dtype=np.int32)
+    view = memoryview(distances)
+    neighbours = environment.neighbours
+
+    view[state] = 0
+    queue = deque([state])
+
+    while queue:
+        state = queue.popleft()
+        distance = view[state] + 1
+
+        for _, new_state in neighbours(state):
+            if view[new_state] < 0:
+                view[new_state] = distance
+                queue.append(new_state)
+
+    return distances
+
+
+class LandmarkIndex:
+    """Landmark index
+
+    Heuristic based on landmarks (ALT). The exact distance from a few landmark cells
+    to every cell is precomputed, and by the triangle inequality
+    |d(L, n) - d(L, target)| <= d(n, target) for every landmark L, so the maximum
+    over all landmarks is an admissible and consistent estimate. On maps with many
+    walls it is much closer to the real cost than Manhattan's distance.
+
+    The index is only valid for the walls it was built with (see fingerprint).
+    Once built it can be attached to a Grid or GridEnvironment, whose
+    cost_to_target then uses the best of both estimates. Solver refreshes the index
+    at the start of every search, so it is rebuilt when the walls change:
+
+        environment.heuristic = LandmarkIndex.load_or_build(environment, 'map.landmarks.npz')
+
+    Attributes:
+        rows: Row quantity.
+        cols: Column quantity.
+        landmarks (numpy.ndarray): Flat index of every landmark.
+        distances (numpy.ndarray): Array of shape (landmarks, cells) with the distance
+            from every landmark to every cell, UNREACHABLE if there is no path.
+        fingerprint (str): Fingerprint of the walls the index was built for.
+        environment_fingerprint: Fingerprint of the environment the index was last
+            checked against, None if it was never checked.
+    """
+    UNREACHABLE = -1
+
+    def __init__(self, rows, cols, landmarks, distances, fingerprint):
+        self.rows = rows
+        self.cols = cols
+        self.landmarks = landmarks
+        self.distances = distances
+        self.fingerprint = fingerprint
+        self.environment_fingerprint = None
+
+        self._target = None
+        self._estimates = None
+
+    @classmethod
+    def build(cls, environment, count = 8):
+        """Build index
+
+        Selects landmarks by farthest point sampling: the first one is the farthest
+        cell from the first free cell, and every next one is the cell farthest from
+        all the landmarks selected so far. Landmarks on the border of the map give
+        the best estimates, and this tends to find them.
+
+        Parameters:
+            environment: Grid or GridEnvironment.
+            count (int): Number of landmarks.
+
+        Returns:
+            index (LandmarkIndex): Index for the current walls.
+        """
+        grid = as_grid_environment(environment)
+
+        free = np.flatnonzero(grid.walls.reshape(-1) == 0)
+        if len(free) == 0:
+            raise ValueError("Grid without free cells")
+
+        landmarks, distances = [], []
+
+        # Distance to the closest landmark, starting with a single free cell
+        closest = bfs_distances(grid, int(free[0]))
+
+        for _ in range(count):
+            candidates = np.where(closest < 0, -1, closest)
+            landmark = int(np.argmax(candidates))
+
+            if candidates[landmark] <= 0 and landmarks:
+                break
+
+            landmark_distances = bfs_distances(grid, landmark)
+            landmarks.append(landmark)
+            distances.append(landmark_distances)
+
+            reached = landmark_distances >= 0
+            closest = np.where(reached & ((closest < 0) | (landmark_distances < closest)),
+                               landmark_distances, closest)
+            closest[landmarks] = 0
+
+        index = cls(grid.rows, grid.cols, np.array(landmarks, dtype=np.int64),
+                    cls._compact(np.stack(distances)), wall_fingerprint(grid))
+        index.environment_fingerprint = environment.fingerprint
+
+        return index
+
+    @classmethod
+    def load(cls, path):
+        """Load index
+
+        Parameters:
+            path: File written by save.
+
+        Returns:
+            index (LandmarkIndex): Loaded index.
+        """
+        with np.load(path) as data:
+            rows, cols = (int(value) for value in data['shape'])
+            return cls(rows, cols, data['landmarks'], data['distances'], str(data['fingerprint']))
+
+    @classmethod
+    def load_or_build(cls, environment, path, count = 8):
+        """Load or build index
+
+        Loads the index saved in path if it was built for the current walls.
+        Otherwise builds a new one and saves it there.
+
+        Parameters:
+            environment: Grid or GridEnvironment.
+            path: File to be read or written.
+            count (int): Number of landmarks of a new index.
+
+        Returns:
+            index (LandmarkIndex): Index valid for the current walls.
+        """
+        try:
+            index = cls.load(path)
+        except (OSError, KeyError, ValueError):
+            index = None
+
+        if index is None or not index.matches(environment):
+            index = cls.build(environment, count)
+            index.save(path)
+        else:
+            index.environment_fingerprint = environment.fingerprint
+
+        return index
+
+    @staticmethod
+    def _compact(distances):
+        """Store distances in the smallest unsigned type that fits them."""
+        dtype = np.uint16 if distances.max(initial=0) < np.iinfo(np.uint16).max else np.uint32
+        return np.where(distances < 0, np.iinfo(dtype).max, distances).astype(dtype)
+
+    def save(self, path):
+        """Save index
+
+        Parameters:
+            path: File to be written (NumPy .npz format).
+        """
+        with open(path, 'wb') as file:
+            np.savez_compressed(file, shape=np.array([self.rows, self.cols]), landmarks=self.landmarks,
+                                distances=self.distances, fingerprint=np.array(self.fingerprint))
+
+    def matches(self, environment):
+        """Matches environment
+
+        Parameters:
+            environment: Grid or GridEnvironment.
+
+        Returns:
+            True: If the index was built for the current walls of the environment.
+            False: If the walls or size are different and the index must be rebuilt.
+        """
+        return self.fingerprint == wall_fingerprint(environment)
+
+    def refresh(self, environment):
+        """Refresh
+
+        Rebuilds the index in place, with the same number of landmarks, if the walls
+        of the environment changed since it was built. The fingerprint of the
+        environment is compared first, so the walls are only compared again after
+        the environment changes.
+
+        Parameters:
+            environment: Grid or GridEnvironment the index is attached to.
+        """
+        if environment.fingerprint == self.environment_fingerprint:
+            return
+
+        # Changes of the costs alone keep the index valid
+        if not self.matches(environment):
+            index = self.build(environment, len(self.landmarks))
+
+            self.rows, self.cols = index.rows, index.cols
+            self.landmarks = index.landmarks
+            self.distances = index.distances
+            self.fingerprint = index.fingerprint
+            self._target = self._estimates = None
+
+        self.environment_fingerprint = environment.fingerprint
+
+    def estimate(self, state, target):
+        """Estimate cost
+
+        Lower bound of the cost from a cell to a target. The estimates for every cell
+        are computed at once the first time a target is used.
+
+        Parameters:
+            state: Cell, as coordinates or flat index.
+            target: Target cell, as coordinates or flat index.
+
+        Returns:
+            cost (int): integer representing the estimated cost.
+        """
+        if target != self._target:
+            self._prepare(target)
+
+        if type(state) is tuple:
+            state = state[0] * self.cols + state[1]
+
+        return self._estimates[state]
+
+    def _prepare(self, target):
+        """Compute the estimate from every cell to the given target."""
+        flat = target[0] * self.cols + target[1] if type(target) is tuple else target
+        unreachable = np.iinfo(self.distances.dtype).max
+
+        estimates = np.zeros(self.rows * self.cols, dtype=np.int64)
+
+        for distances in self.distances:
+            to_target = int(distances[flat])
+            if to_target == unreachable:
+                continue
+
+            difference = np.abs(distances.astype(np.int64) - to_target)
+            difference[distances == unreachable] = 0
+            np.maximum(estimates, difference, out=estimates)
+
+        self._target = target
+        self._estimates = memoryview(estimates)
@@ -0,0 +1,225 @@
+import struct
+
+from collections import namedtuple
+
+import numpy as np
+
+from grid import GridEnvironment
+
+# Header of the binary map format: magic, version, flags, rows, cols, source and
+# target (-1 when not set). It is 32 bytes long, so the data that follows is aligned
+HEADER = struct.Struct('<4sBB2xIIqq')
+MAGIC = b'VGSM'
+VERSION = 1
+
+# Header flags
+PACKED = 1
+COSTS = 2
+
+# Terrain of the MovingAI maps that can be walked on. Water (W) is only passable
+# from other water cells, so it is treated as a wall as in most 4-connected benchmarks
+MOVINGAI_PASSABLE = b'.GS'
+
+
+def save_map(environment, path, packed = True):
+    """Save map
+
+    Writes the walls, costs, source and target of a grid in the binary map format:
+    a fixed size header followed by the walls, one bit per cell if packed or one
+    byte per cell otherwise, and the uint16 costs only if some cell costs more than 1.
+
+    Packed files are 8 times smaller, unpacked files are loaded without copying the
+    walls.
+
+    Parameters:
+        environment: Grid or GridEnvironment to be saved.
+        path (str): File to be written.
+        packed (bool): Store the walls as bits.
+    """
+    if not isinstance(environment, GridEnvironment):
+        environment = GridEnvironment.from_grid(environment)
+
+    flags = (PACKED if packed else 0) | (COSTS if environment.weighted else 0)
+
+    source = -1 if environment.source is None else environment.source
+    target = -1 if environment.target is None else environment.target
+
+    walls = environment.walls.reshape(-1)
+
+    with open(path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, flags, environment.rows, environment.cols, source, target))
+        file.write((np.packbits(walls) if packed else walls).tobytes())
+
+        if flags & COSTS:
+            # Costs start at an even offset so they can be mapped as uint16
+            file.write(b'\0' * (file.tell() % 2))
+            file.write(environment.costs.astype('<u2').tobytes())
+
+
+def load_map(path, mode = 'c'):
+    """Load map
+
+    Reads a map written by save_map through numpy.memmap. The walls and costs of
+    unpacked files are used directly from the mapped file, so no copy is made and
+    only the pages that are read are loaded. Packed walls are unpacked into memory.
+
+    Parameters:
+        path (str): File to be read.
+        mode (str): numpy.memmap mode. With 'c' changes to the grid are kept in memory,
+            with 'r+' they are written to the file (unpacked walls and costs only).
+
+    Returns:
+        environment (GridEnvironment): Grid with the walls, costs, source and target of the file.
+    """
+    with open(path, 'rb') as file:
+        header = file.read(HEADER.size)
+
+    if len(header) < HEADER.size:
+        raise ValueError(f"{path} is not a map file")
+
+    magic, version, flags, rows, cols, source, target = HEADER.unpack(header)
+
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a map file")
+    if version != VERSION:
+        raise ValueError(f"Unsupported map version {version}")
+
+    size = rows * cols
+    offset = HEADER.size
+
+    if flags & PACKED:
+        length = (size + 7) // 8
+        bits = np.memmap(path, dtype=np.uint8, mode='r', offset=offset, shape=(length,))
+        walls = np.unpackbits(bits, count=size)
+    else:
+        length = size
+        walls = np.memmap(path, dtype=np.uint8, mode=mode, offset=offset, shape=(size,))
+
+    costs = None
+    if flags & COSTS:
+        offset += length + length % 2
+        costs = np.memmap(path, dtype='<u2', mode=mode, offset=offset, shape=(size,))
+
+    environment = GridEnvironment(rows, cols, walls, costs)
+    environment.source = None if source < 0 else source
+    environment.target = None if target < 0 else target
+
+    return environment
+
+
+def read_movingai_map(path):
+    """Read MovingAI map
+
+    Reads a map of the MovingAI benchmarks (https://movingai.com/benchmarks/formats.html).
+    Cells marked with '.', 'G' or 'S' are free, any other terrain is a wall.
+
+    Parameters:
+        path (str): .map file to be read.
+
+    Returns:
+        environment (GridEnvironment): Grid with the walls of the map.
+    """
+    rows = cols = None
+
+    with open(path, 'rb') as file:
+        for line in file:
+            key, _, value = line.strip().partition(b' ')
+
+            if key == b'height':
+                rows = int(value)
+            elif key == b'width':
+                cols = int(value)
+            elif key == b'map':
+                break
+
+        if rows is None or cols is None:
+            raise ValueError(f"{path} is not a MovingAI map")
+
+        # Rows are read as a single block and checked with a lookup table
+        data = np.frombuffer(b''.join(line.rstrip(b'\r\n') for line in file), dtype=np.uint8)
+
+    if data.size != rows * cols:
+        raise ValueError(f"{path} has {data.size} cells, expected {rows}x{cols}")
+
+    # Wall value of every byte
+    table = np.ones(256, dtype=np.uint8)
+    table[list(MOVINGAI_PASSABLE)] = 0
+
+    return GridEnvironment(rows, cols, table[data])
+
+
+class Scenario(namedtuple('Scenario', ('bucket', 'map', 'rows', 'cols', 'source', 'target', 'optimal'))):
+    """Scenario
+
+    Query of a MovingAI scenario file.
+
+    Attributes:
+        bucket (int): Group of scenarios of similar length.
+        map (str): Name of the map file.
+        rows (int): Row quantity of the map.
+        cols (int): Column quantity of the map.
+        source (tuple): Starting cell of the form (row, col).
+        target (tuple): Goal cell of the form (row, col).
+        optimal (float): Length of the optimal path allowing diagonal moves, so it
+            is a lower bound of the length of 4-connected paths.
+    """
+    __slots__ = ()
+
+    def apply(self, environment):
+        """Apply scenario
+
+        Sets the source and target of a grid to the ones of the scenario.
+
+        Parameters:
+            environment: Grid or GridEnvironment of the map.
+        """
+        if isinstance(environment, GridEnvironment):
+            environment.source = environment.encode(self.source)
+            environment.target = environment.encode(self.target)
+        else:
+            environment.source, environment.target = self.source, self.target
+
+
+def iter_scenarios(path):
+    """Iterate scenarios
+
+    Reads a MovingAI .scen file one line at a time, so files with any number of
+    queries can be processed without loading them in memory.
+
+    Parameters:
+        path (str): .scen file to be read.
+
+    Yields:
+        scenario (Scenario): Every query of the file, in order.
+    """
+    with open(path) as file:
+        for line in file:
+            fields = line.split()
+
+            # The version line and blank lines are skipped
+            if len(fields) < 9:
+                continue
+
+            bucket, name, width, height, start_x, start_y, goal_x, goal_y, optimal = fields[:9]
+
+            yield Scenario(
+                int(bucket), name, int(height), int(width),
+                (int(start_y), int(start_x)), (int(goal_y), int(goal_x)), float(optimal)
+            )
+
+
+def open_map(path):
+    """Open map
+
+    Loads a MovingAI .map file or a map in the binary format, depending on the extension.
+
+    Parameters:
+        path (str): File to be read.
+
+    Returns:
+        environment (GridEnvironment): Loaded grid.
+    """
+    if path.endswith('.map'):
+        return read_movingai_map(path)
+
+    return load_map(path)
@@ -0,0 +1,430 @@
+import multiprocessing
+import threading
+import weakref
+
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from grid import GridEnvironment
+
+# Arrays of the process, set by _attach in every worker and by ParallelBFS in the main process
+_shared = {}
+
+# Fields of the control block shared by the main process and the workers, followed
+# by the number of cells found by every worker in the current level
+COMMAND, TARGET, LENGTH, CURRENT, MIN_CELLS, LEVELS, EXPANDED = range(7)
+CONTROL_FIELDS = 7
+
+# Commands of the workers
+STOP, SEARCH = 0, 1
+
+# Seconds to wait for the workers to stop before they are terminated
+STOP_TIMEOUT = 10
+
+
+def _open_buffer(name):
+    """Attach to an existing shared memory block without taking ownership of it."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python older than 3.13 always registers the block. The workers share the
+        # resource tracker of the main process, so unregistering it afterwards would
+        # also drop the registration of its owner: it is not registered at all
+        register = resource_tracker.register
+        resource_tracker.register = lambda name, rtype: None
+
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+def _attach(names, size, dtype, offsets, processes):
+    """Map the shared arrays of the search into a worker."""
+    buffers = [_open_buffer(name) for name in names]
+
+    _shared['buffers'] = buffers
+    _shared['moves'] = np.ndarray(size, dtype=np.uint8, buffer=buffers[0].buf)
+    _shared['parents'] = np.ndarray(size, dtype=dtype, buffer=buffers[1].buf)
+    _shared['frontiers'] = (
+        np.ndarray(size, dtype=dtype, buffer=buffers[2].buf),
+        np.ndarray(size, dtype=dtype, buffer=buffers[3].buf),
+    )
+    _shared['control'] = np.ndarray(CONTROL_FIELDS + processes, dtype=np.int64, buffer=buffers[4].buf)
+    _shared['offsets'] = offsets
+
+
+def _expand(frontier):
+    """Expand a slice of the frontier
+
+    Marks every unvisited neighbour of the states of the slice with its parent, in
+    the shared parents array. Two workers can reach the same cell in the same level
+    and overwrite each other's parent, which is harmless: both parents are at the
+    same depth, so either one gives a shortest path.
+
+    Parameters:
+        frontier (numpy.ndarray): States to be expanded.
+
+    Returns:
+        states (numpy.ndarray): States reached for the first time, possibly repeated.
+        previous (numpy.ndarray): State every one of them was reached from.
+    """
+    parents = _shared['parents']
+    moves = _shared['moves'][frontier]
+
+    reached, previous = [], []
+    for code, offset in enumerate(_shared['offsets']):
+        states = frontier[(moves & (1 << code)) != 0]
+        new_states = states + offset
+
+        unvisited = parents[new_states] == -1
+        new_states, states = new_states[unvisited], states[unvisited]
+
+        parents[new_states] = states
+        reached.append(new_states)
+        previous.append(states)
+
+    return np.concatenate(reached), np.concatenate(previous)
+
+
+def _release(buffers, workers, handover):
+    """Release a search
+
+    Stops the workers and unlinks the shared memory of a ParallelBFS. Called by
+    close, or by the garbage collector when the search is dropped without closing it.
+
+    Parameters:
+        buffers (list): Shared memory blocks of the search, emptied.
+        workers (list): Worker processes, emptied.
+        handover (multiprocessing.Barrier): Barrier of the workers and the main process.
+    """
+    if workers:
+        np.ndarray(CONTROL_FIELDS, dtype=np.int64, buffer=buffers[4].buf)[COMMAND] = STOP
+
+        try:
+            handover.wait(STOP_TIMEOUT)
+        except threading.BrokenBarrierError:
+            for worker in workers:
+                worker.terminate()
+
+        for worker in workers:
+            worker.join()
+
+        workers.clear()
+
+    # Views must be dropped before the memory is closed
+    _shared.clear()
+
+    for buffer in buffers:
+        buffer.close()
+        buffer.unlink()
+
+    buffers.clear()
+
+
+def _work(index, processes, names, size, dtype, offsets, handover, level):
+    """Worker process
+
+    Waits for the main process to hand over a wide level, searches with the other
+    workers until the levels get narrow again or the target is found, and hands the
+    frontier back. Runs until the main process sends the STOP command.
+
+    Parameters:
+        index (int): Position of the worker, from 0 to processes - 1.
+        processes (int): Number of workers.
+        names (list): Names of the shared memory blocks.
+        size (int): Number of cells of the grid.
+        dtype: Type of the states.
+        offsets (tuple): Offset of the flat index of every action.
+        handover (multiprocessing.Barrier): Barrier of the workers and the main process.
+        level (multiprocessing.Barrier): Barrier of the workers.
+    """
+    _attach(names, size, dtype, offsets, processes)
+    control = _shared['control']
+
+    while True:
+        handover.wait()
+
+        if control[COMMAND] == STOP:
+            break
+
+        _search_levels(index, processes, level)
+        handover.wait()
+
+    _shared.clear()
+
+
+def _search_levels(index, processes, level):
+    """Search levels with all the workers
+
+    Every level is split evenly across as many workers as it has min_cells cells,
+    up to all of them. After expanding its slice, every worker keeps the cells whose
+    parent it wrote last, so every cell of the next level is kept by a single
+    worker, and writes them to the other frontier buffer after the cells of the
+    workers before it.
+
+    Parents are only read between the barriers, while no worker writes them, so
+    every worker decides the same when to stop. The main process only hands over
+    levels where the target is not reached yet.
+    """
+    control = _shared['control']
+    counts = control[CONTROL_FIELDS:]
+    parents = _shared['parents']
+    frontiers = _shared['frontiers']
+
+    target = int(control[TARGET])
+    min_cells = int(control[MIN_CELLS])
+    current = int(control[CURRENT])
+    length = int(control[LENGTH])
+
+    found = False
+
+    while length >= min_cells and not found:
+        workers = min(processes, length // min_cells)
+
+        if index < workers:
+            start, end = length * index // workers, length * (index + 1) // workers
+            states, previous = _expand(frontiers[current][start:end])
+        else:
+            states = previous = frontiers[current][:0]
+
+        # Every parent of the level is written
+        level.wait()
+
+        found = parents[target] != -1
+        states = np.unique(states[parents[states] == previous])
+        counts[index] = len(states)
+
+        # Every worker knows where its cells go
+        level.wait()
+
+        offset = int(counts[:index].sum())
+        frontiers[1 - current][offset:offset + len(states)] = states
+
+        if index == 0:
+            control[LEVELS] += 1
+            control[EXPANDED] += length
+
+        length = int(counts.sum())
+        current = 1 - current
+
+        # The next level is complete
+        level.wait()
+
+    if index == 0:
+        control[CURRENT] = current
+        control[LENGTH] = length
+
+
+class ParallelBFS:
+    """Parallel breadth-first search
+
+    Searches a GridEnvironment level by level, splitting the levels of the frontier
+    across worker processes. The valid moves of every cell, the parent of every
+    reached cell and the frontier live in shared memory blocks, so workers read
+    them and write the parents they find without copying.
+
+    The workers are started on the first wide level and kept alive between levels
+    and searches. Once the main process hands them a level, they search on their
+    own, synchronized by a barrier after every phase of a level, and only hand the
+    frontier back when the levels get narrow again or the target is found, so no
+    data goes through pipes while they search.
+
+    Every level is split evenly across as many workers as it has min_cells cells,
+    up to all of them, so the split follows the width of the level and the number
+    of processes. Levels with less than two workers' worth of cells are expanded
+    in the main process with the same vectorized code, as the barriers would cost
+    more than the expansion itself. The levels of a grid hold up to about rows +
+    cols cells, so open areas and rooms of large grids use all the workers, while
+    narrow corridors and mazes are searched mostly in the main process.
+
+    Paths are shortest paths in number of steps, in the same format as
+    Solver.search_path. Move costs are not taken into account.
+
+    The workers and the shared memory are released by close, at the end of a with
+    block, or when the search is garbage collected:
+
+        with ParallelBFS(environment, processes=8) as search:
+            path = search.search_path()
+
+    Attributes:
+        environment (GridEnvironment): Grid to be searched.
+        processes (int): Number of worker processes, by default the number of CPUs.
+        min_cells (int): Smallest number of cells of a level given to a worker.
+        expanded (int): States expanded by the last search.
+        levels (int): Levels expanded by the last search.
+    """
+    def __init__(self, environment, processes = None, min_cells = 32):
+        if not isinstance(environment, GridEnvironment):
+            raise ValueError("ParallelBFS needs a GridEnvironment")
+
+        self.environment = environment
+        self.processes = processes or multiprocessing.cpu_count()
+        self.min_cells = min_cells
+        self.expanded = 0
+        self.levels = 0
+
+        size = environment.size
+        self.dtype = np.int32 if size < 1 << 31 else np.int64
+        itemsize = np.dtype(self.dtype).itemsize
+
+        self._buffers = [
+            shared_memory.SharedMemory(create=True, size=max(size, 1)),
+            shared_memory.SharedMemory(create=True, size=max(size * itemsize, 1)),
+            shared_memory.SharedMemory(create=True, size=max(size * itemsize, 1)),
+            shared_memory.SharedMemory(create=True, size=max(size * itemsize, 1)),
+            shared_memory.SharedMemory(create=True, size=(CONTROL_FIELDS + self.processes) * 8),
+        ]
+
+        self.moves = np.ndarray(size, dtype=np.uint8, buffer=self._buffers[0].buf)
+        self.parents = np.ndarray(size, dtype=self.dtype, buffer=self._buffers[1].buf)
+        self.frontier = np.ndarray(size, dtype=self.dtype, buffer=self._buffers[2].buf)
+        self.control = np.ndarray(CONTROL_FIELDS + self.processes, dtype=np.int64, buffer=self._buffers[4].buf)
+
+        self.fingerprint = None
+
+        # Workers are started on the first wide level
+        self._workers = []
+        self._handover = multiprocessing.Barrier(self.processes + 1)
+        self._level = multiprocessing.Barrier(self.processes)
+
+        # Releases everything even if the search is dropped without calling close
+        self._finalizer = weakref.finalize(self, _release, self._buffers, self._workers, self._handover)
+
+    def search_path(self, observer = None):
+        """Search path from source to target
+
+        Parameters:
+            observer (SearchObserver): Optional object notified of the path found.
+
+        Returns:
+            path (list): List of actions of the form (state, action).
+            None: If there is no possible path.
+        """
+        environment = self.environment
+        source, target = environment.source, environment.target
+
+        self.expanded = self.levels = 0
+
+        if source is None or target is None:
+            raise ValueError("Source and target must be set")
+
+        if environment.is_wall(source) or environment.is_wall(target) or \
+                not environment.is_reachable(source, target):
+            return None
+
+        # Moves are only copied when walls changed since the last search
+        if environment.fingerprint != self.fingerprint:
+            self.moves[:] = environment.moves.reshape(-1)
+            self.fingerprint = environment.fingerprint
+
+        parents = self.parents
+        parents.fill(-1)
+        parents[source] = source
+
+        self.frontier[0] = source
+        length = 1
+
+        while length and parents[target] == -1:
+            if self.processes > 1 and length >= 2 * self.min_cells:
+                length = self._search_parallel(length, target)
+                continue
+
+            self.levels += 1
+            self.expanded += length
+
+            reached = np.unique(self._expand_local(length))
+            length = len(reached)
+            self.frontier[:length] = reached
+
+        if parents[target] == -1:
+            return None
+
+        path = self._path(target)
+
+        if observer is not None:
+            observer.on_path(path)
+
+        return path
+
+    def close(self):
+        """Close
+
+        Stops the worker processes and releases the shared memory.
+        """
+        self.moves = self.parents = self.frontier = self.control = None
+        self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+    def _expand_local(self, length):
+        """Expand the frontier in the main process."""
+        if _shared.get('parents') is not self.parents:
+            _shared.update(moves=self.moves, parents=self.parents, offsets=self.environment.offsets)
+
+        return _expand(self.frontier[:length])[0]
+
+    def _search_parallel(self, length, target):
+        """Hand the frontier to the workers until the levels get narrow again."""
+        if not self._workers:
+            self._start_workers()
+
+        control = self.control
+        control[COMMAND] = SEARCH
+        control[TARGET] = target
+        control[LENGTH] = length
+        control[CURRENT] = 0
+        control[MIN_CELLS] = self.min_cells
+        control[LEVELS] = control[EXPANDED] = 0
+
+        # Once to start the workers, and once more when they are done
+        self._handover.wait()
+        self._handover.wait()
+
+        self.levels += int(control[LEVELS])
+        self.expanded += int(control[EXPANDED])
+        length = int(control[LENGTH])
+
+        # The workers leave the frontier in either buffer
+        if control[CURRENT] == 1:
+            frontier = np.ndarray(self.environment.size, dtype=self.dtype, buffer=self._buffers[3].buf)
+            self.frontier[:length] = frontier[:length]
+
+        return length
+
+    def _start_workers(self):
+        """Start the worker processes, mapped to the shared memory of the search."""
+        arguments = (
+            self.processes, [buffer.name for buffer in self._buffers], self.environment.size,
+            self.dtype, self.environment.offsets, self._handover, self._level
+        )
+
+        for index in range(self.processes):
+            worker = multiprocessing.Process(target=_work, args=(index,) + arguments, daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def _path(self, target):
+        """Follow the parents from the target back to the source."""
+        environment = self.environment
+        parents = self.parents
+
+        # Action of every offset between a cell and its parent. With a single column
+        # the offsets of up and left are the same, and only up is possible
+        actions = dict(zip(reversed(environment.offsets), reversed(environment.ACTIONS)))
+
+        path = []
+        state = target
+
+        while parents[state] != state:
+            previous = int(parents[state])
+            path.append((state, actions[state - previous]))
+            state = previous
+
+        path.reverse()
+        return path
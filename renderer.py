@@ -0,0 +1,328 @@
+import time
+
+import numpy as np
+import pygame
+
+from board import Cell
+from grid import GridEnvironment
+from solver import SearchObserver
+
+
+class ArrayRenderer(SearchObserver):
+    """Array renderer
+
+    Alternative to Board for very large grids. The style of every cell is kept
+    in a NumPy uint8 array (using the Cell style constants), turned into colours
+    with a palette lookup and copied to the display with pygame.surfarray in a
+    single blit, instead of drawing one rect per cell.
+
+    Cells are scaled by an integer factor to fill the available size. If the grid
+    has more cells than pixels, blocks of cells are merged into one pixel keeping
+    the most relevant style of the block (e.g. a path cell wins over explored ones).
+
+    It can be used as a search observer, highlighting generated states at most
+    max_fps times per second.
+
+    Attributes:
+        screen: PyGame display.
+        origin (tuple): Coordinates for the top left corner of the board.
+        rows: Row quantity.
+        cols: Column quantity.
+        states (numpy.ndarray): Style of every cell, shape (rows, cols).
+        scale (int): Pixels per cell (when cells are bigger than a pixel).
+        block (int): Cells per pixel (when cells are smaller than a pixel).
+        max_fps (int): Maximum number of display updates per second during a search.
+    """
+    # Colour of every cell style, indexed by the Cell constants
+    PALETTE = np.zeros((8, 3), dtype=np.uint8)
+    PALETTE[Cell.EMPTY] = (0, 0, 0)
+    PALETTE[Cell.WALL] = (64, 64, 64)
+    PALETTE[Cell.PATH] = (255, 255, 0)
+    PALETTE[Cell.EXPLORED] = (128, 128, 128)
+    PALETTE[Cell.ACTIVE] = (128, 128, 64)
+    PALETTE[Cell.SOURCE] = (255, 0, 0)
+    PALETTE[Cell.TARGET] = (0, 255, 0)
+    PALETTE[Cell.TERRAIN] = (110, 75, 40)
+
+    # Styles from least to most relevant when several cells share a pixel
+    PRIORITY = (Cell.EMPTY, Cell.TERRAIN, Cell.WALL, Cell.EXPLORED, Cell.ACTIVE, Cell.PATH, Cell.SOURCE, Cell.TARGET)
+
+    def __init__(self, screen, origin, size, rows, cols, max_fps = 60):
+        self.screen = screen
+        self.origin = origin
+        self.rows = rows
+        self.cols = cols
+        self.max_fps = max_fps
+        self.last_update = 0
+
+        self.states = np.zeros((rows, cols), dtype=np.uint8)
+
+        # Cells per pixel and pixels per cell, one of them is always 1
+        self.block = max(1, -(-cols // int(size[0])), -(-rows // int(size[1])))
+        self.scale = max(1, int(min(size[0] / cols, size[1] / rows))) if self.block == 1 else 1
+
+        height, width = -(-rows // self.block), -(-cols // self.block)
+        self.surface = pygame.Surface((width, height))
+        self.scaled = pygame.Surface((width * self.scale, height * self.scale))
+        self.rect = self.scaled.get_rect(topleft=origin)
+
+        self.rank = np.zeros(len(self.PRIORITY), dtype=np.uint8)
+        self.rank[list(self.PRIORITY)] = np.arange(len(self.PRIORITY))
+        self.unrank = np.array(self.PRIORITY, dtype=np.uint8)
+
+    def load(self, environment):
+        """Load environment
+
+        Sets the style of every cell from a Grid or GridEnvironment: terrain, walls,
+        explored states, path, source and target.
+
+        Parameters:
+            environment: Grid or GridEnvironment with the same size as the renderer.
+        """
+        states = self.states
+        states.fill(Cell.EMPTY)
+
+        if isinstance(environment, GridEnvironment):
+            states[environment.costs != 1] = Cell.TERRAIN
+            states[environment.walls != 0] = Cell.WALL
+            explored = environment.explored
+            if hasattr(explored, 'mask'):
+                states.reshape(-1)[explored.mask()] = Cell.EXPLORED
+            else:
+                states.reshape(-1)[list(explored)] = Cell.EXPLORED
+        else:
+            for cell in environment.costs:
+                states[cell] = Cell.TERRAIN
+            for cell in environment.walls:
+                states[cell] = Cell.WALL
+            for cell in environment.explored:
+                states[cell] = Cell.EXPLORED
+
+        for state, _ in getattr(environment, 'path', None) or ():
+            states[self._cell(state)] = Cell.PATH
+
+        if environment.source is not None:
+            states[self._cell(environment.source)] = Cell.SOURCE
+        if environment.target is not None:
+            states[self._cell(environment.target)] = Cell.TARGET
+
+    def set_path(self, path):
+        """Set path
+
+        Parameters:
+            path (list): List of actions of the form (state, action).
+        """
+        for state, _ in path:
+            cell = self._cell(state)
+            if self.states[cell] not in (Cell.SOURCE, Cell.TARGET):
+                self.states[cell] = Cell.PATH
+
+    def _cell(self, state):
+        """Coordinates of a state, given as coordinates or flat index."""
+        return divmod(state, self.cols) if type(state) is not tuple else state
+
+    def draw(self):
+        """Draw grid
+
+        Copies the whole grid to the screen.
+
+        Returns:
+            rect (pygame.Rect): Area of the screen that was drawn.
+        """
+        states = self.states
+
+        if self.block > 1:
+            states = self._merge(states)
+
+        # surfarray uses (x, y) indexing, so rows and columns are swapped
+        pygame.surfarray.blit_array(self.surface, self.PALETTE[states].swapaxes(0, 1))
+
+        if self.scale > 1:
+            pygame.transform.scale(self.surface, self.scaled.get_size(), self.scaled)
+            self.screen.blit(self.scaled, self.origin)
+        else:
+            self.screen.blit(self.surface, self.origin)
+
+        return self.rect
+
+    def _merge(self, states):
+        """Merge blocks of cells keeping the most relevant style of each one."""
+        block = self.block
+        height, width = -(-self.rows // block), -(-self.cols // block)
+
+        ranks = np.zeros((height * block, width * block), dtype=np.uint8)
+        ranks[:self.rows, :self.cols] = self.rank[states]
+
+        # Maximum of strided views, much faster than reducing a reshaped array
+        merged = ranks[::block, ::block].copy()
+        for i in range(block):
+            for j in range(block):
+                np.maximum(merged, ranks[i::block, j::block], out=merged)
+
+        return self.unrank[merged]
+
+    def update(self, force = False):
+        """Update display
+
+        Draws the grid and pushes its area to the display, at most max_fps times
+        per second.
+
+        Parameters:
+            force (bool): Update even if the last one was too recent.
+        """
+        now = time.perf_counter()
+
+        if not force and now - self.last_update < 1 / self.max_fps:
+            return
+
+        pygame.display.update(self.draw())
+        self.last_update = now
+
+    def on_generate(self, node):
+        """Node generated
+
+        Parameters:
+            node (Node): Node that was generated.
+        """
+        cell = self._cell(node.state)
+        if self.states[cell] in (Cell.EMPTY, Cell.TERRAIN):
+            self.states[cell] = Cell.ACTIVE
+        self.update()
+
+    def on_path(self, path):
+        """Path found
+
+        Parameters:
+            path (list): List of actions of the form (state, action).
+        """
+        self.set_path(path)
+        self.update(force=True)
+
+    def cell_at(self, position):
+        """Cell at position
+
+        Parameters:
+            position (tuple): Pixel coordinates in the screen.
+
+        Returns:
+            cell (tuple): Coordinates of the cell in that position, the first cell of
+                the block when several cells share a pixel.
+            None: If the position is outside the grid.
+        """
+        i = (position[1] - self.origin[1]) // self.scale * self.block
+        j = (position[0] - self.origin[0]) // self.scale * self.block
+
+        if 0 <= i < self.rows and 0 <= j < self.cols:
+            return int(i), int(j)
+
+        return None
+
+
+class MapWalls:
+    """Walls of a MapView, as a set of cells backed by the walls array."""
+    def __init__(self, view):
+        self.view = view
+
+    def __contains__(self, cell):
+        return bool(self.view.environment.walls[cell])
+
+    def add(self, cell):
+        self.view.environment.set_wall(self.view.environment.encode(cell))
+
+
+class MapView:
+    """Map view
+
+    Board replacement for maps with more cells than pixels. It keeps a
+    GridEnvironment and draws it through an ArrayRenderer, with the part of the
+    Board interface used by the runner: cells are given as (row, col) coordinates,
+    and cells changed through walls, set_cost or dirty are shown on the next update.
+
+    Attributes:
+        environment (GridEnvironment): Grid to be searched.
+        renderer (ArrayRenderer): Renderer of the grid, also the search observer.
+        walls (MapWalls): Wall cells, supporting `in` and add.
+        dirty (dict): Style of every cell changed since the last display update.
+        path (list): Path found by the last search, None if there is none.
+    """
+    def __init__(self, screen, origin, size, environment, max_fps = 60):
+        self.environment = environment
+        self.renderer = ArrayRenderer(screen, origin, size, environment.rows, environment.cols, max_fps)
+        self.walls = MapWalls(self)
+        self.dirty = {}
+        self.path = None
+
+    @property
+    def source(self):
+        source = self.environment.source
+        return None if source is None else self.environment.decode(source)
+
+    @source.setter
+    def source(self, cell):
+        self.environment.source = None if cell is None else self.environment.encode(cell)
+
+    @property
+    def target(self):
+        target = self.environment.target
+        return None if target is None else self.environment.decode(target)
+
+    @target.setter
+    def target(self, cell):
+        self.environment.target = None if cell is None else self.environment.encode(cell)
+
+    def set_cost(self, cell, cost):
+        """Set cost
+
+        Parameters:
+            cell (tuple): Cell to be modified.
+            cost (int): Positive cost of entering the cell.
+        """
+        self.environment.set_cost(self.environment.encode(cell), cost)
+
+    def cell_at(self, position):
+        """Cell at position, see ArrayRenderer.cell_at."""
+        return self.renderer.cell_at(position)
+
+    def clean(self):
+        """Clean map
+
+        Resets the explored states and the path, keeping walls, costs, source and target.
+        """
+        self.environment.explored = self.environment.create_explored()
+        self.path = None
+        self.draw()
+
+    def reset(self):
+        """Reset map
+
+        Removes the source and target and cleans the map. Walls and costs are kept,
+        since they come from the map file.
+        """
+        self.environment.source = self.environment.target = None
+        self.clean()
+
+    def draw(self):
+        """Draw map
+
+        Draws every cell from the state of the environment.
+        """
+        self.renderer.load(self.environment)
+        if self.path:
+            self.renderer.set_path(self.path)
+
+        self.dirty = {}
+        self.renderer.draw()
+
+    def update(self, force = False):
+        """Update display
+
+        Shows the cells changed since the last update.
+
+        Parameters:
+            force (bool): Update even if the last one was too recent.
+        """
+        for cell, style in self.dirty.items():
+            self.renderer.states[cell] = style
+
+        self.dirty = {}
+        self.renderer.update(force)
@@ -1,12 +1,41 @@
 import pygame
 import sys
-import time
 
 from solver import Solver
-from board import Board
+from board import Board, Cell, render_label
+from mapio import open_map
+from renderer import MapView
 
+# Label, algorithm and vertical offset of every search button
+SEARCH_BUTTONS = (
+    ("DFS", Solver.DFS, -190),
+    ("BFS", Solver.BFS, -130),
+    ("GREEDY BFS", Solver.GREEDY_BFS, -70),
+    ("A*", Solver.A_STAR, -10),
+    ("DIJKSTRA", Solver.DIJKSTRA, 50),
+)
 
-def main():
+# Number keys select a terrain brush with that cost, W goes back to walls
+TERRAIN_KEYS = {getattr(pygame, f"K_{cost}"): cost for cost in range(1, 10)}
+
+MAX_FPS = 60
+
+# Expansions performed between checks of the time slice of a frame
+SEARCH_BUDGET = 64
+
+
+def line(start, end):
+    """Cells in a straight line between two cells, both included."""
+    steps = max(abs(end[0] - start[0]), abs(end[1] - start[1]), 1)
+
+    return [
+        (round(start[0] + (end[0] - start[0]) * step / steps),
+         round(start[1] + (end[1] - start[1]) * step / steps))
+        for step in range(steps + 1)
+    ]
+
+
+def main(path = None):
     width = 900
     height = 600
     
@@ -14,173 +43,174 @@ def main():
 
     pygame.init()
     screen = pygame.display.set_mode((width, height))
-
-    # Fonts
-    OPEN_SANS = "assets/fonts/OpenSans-Regular.ttf"
-    smallFont = pygame.font.Font(OPEN_SANS, 20)
-    mediumFont = pygame.font.Font(OPEN_SANS, 28)
-    largeFont = pygame.font.Font(OPEN_SANS, 40)
+    clock = pygame.time.Clock()
 
     # Compute board size 
     board_width = ((2 / 3) * width) - (padding * 2)
     board_height = height - (padding * 2)
 
-    board = Board(screen, (padding, padding), (board_width, board_height), 25, 25)
+    if path is None:
+        board = Board(screen, (padding, padding), (board_width, board_height), 25, 25, max_fps=MAX_FPS)
+    else:
+        environment = open_map(path)
+
+        # Maps with cells smaller than a pixel are drawn as an array
+        if environment.rows > board_height or environment.cols > board_width:
+            board = MapView(screen, (padding, padding), (board_width, board_height), environment, max_fps=MAX_FPS)
+        else:
+            board = Board(screen, (padding, padding), (board_width, board_height),
+                          environment.rows, environment.cols, max_fps=MAX_FPS)
+            board.load(environment)
+
+    # Environment searched and observer of the searches
+    if isinstance(board, MapView):
+        searched, observer = board.environment, board.renderer
+    else:
+        searched, observer = board, board
+
+    # Buttons are laid out and rendered only once
+    buttons = []
+    for label, action, offset in SEARCH_BUTTONS + (("Clean", "clean", 140), ("Reset", "reset", 200)):
+        rect = pygame.Rect(
+            (2 / 3) * width + padding, (1 / 3) * height + offset,
+            (width / 3) - padding * 2, 50
+        )
+        text = render_label(label, 28)
+        buttons.append((rect, text, text.get_rect(center=rect.center), action))
 
-    while True:
-        # Check if game quit
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                sys.exit()
+    hint = render_label("1-9: terrain cost, W: walls", 16, (255, 255, 255))
+    hint_rect = hint.get_rect(center=((5 / 6) * width, height - padding * 2))
 
+    def draw():
         screen.fill((0, 0, 0))
         board.draw()
 
-        # DFS button
-        dfsButton = pygame.Rect(
-            (2 / 3) * width + padding, (1 / 3) * height - 170,
-            (width / 3) - padding * 2, 50
-        )
-        buttonText = mediumFont.render("DFS", True, (0, 0, 0))
-        buttonRect = buttonText.get_rect()
-        buttonRect.center = dfsButton.center
-        pygame.draw.rect(screen, (255, 255, 255), dfsButton)
-        screen.blit(buttonText, buttonRect)
-
-        # BFS button
-        bfsButton = pygame.Rect(
-            (2 / 3) * width + padding, (1 / 3) * height - 100,
-            (width / 3) - padding * 2, 50
-        )
-        buttonText = mediumFont.render("BFS", True, (0, 0, 0))
-        buttonRect = buttonText.get_rect()
-        buttonRect.center = bfsButton.center
-        pygame.draw.rect(screen, (255, 255, 255), bfsButton)
-        screen.blit(buttonText, buttonRect)
-
-        # GREEDY BFS button
-        greedyBfsButton = pygame.Rect(
-            (2 / 3) * width + padding, (1 / 3) * height - 30,
-            (width / 3) - padding * 2, 50
-        )
-        buttonText = mediumFont.render("GREEDY BFS", True, (0, 0, 0))
-        buttonRect = buttonText.get_rect()
-        buttonRect.center = greedyBfsButton.center
-        pygame.draw.rect(screen, (255, 255, 255), greedyBfsButton)
-        screen.blit(buttonText, buttonRect)
-
-        # A* button
-        aStarButton = pygame.Rect(
-            (2 / 3) * width + padding, (1 / 3) * height + 40,
-            (width / 3) - padding * 2, 50
-        )
-        buttonText = mediumFont.render("A*", True, (0, 0, 0))
-        buttonRect = buttonText.get_rect()
-        buttonRect.center = aStarButton.center
-        pygame.draw.rect(screen, (255, 255, 255), aStarButton)
-        screen.blit(buttonText, buttonRect)
-
-        # Clean button
-        cleanButton = pygame.Rect(
-            (2 / 3) * width + padding, (1 / 3) * height + 150,
-            (width / 3) - padding * 2, 50
-        )
-        buttonText = mediumFont.render("Clean", True, (0, 0, 0))
-        buttonRect = buttonText.get_rect()
-        buttonRect.center = cleanButton.center
-        pygame.draw.rect(screen, (255, 255, 255), cleanButton)
-        screen.blit(buttonText, buttonRect)
-
-        # Reset button
-        resetButton = pygame.Rect(
-            (2 / 3) * width + padding, (1 / 3) * height + 220,
-            (width / 3) - padding * 2, 50
-        )
-        buttonText = mediumFont.render("Reset", True, (0, 0, 0))
-        buttonRect = buttonText.get_rect()
-        buttonRect.center = resetButton.center
-        pygame.draw.rect(screen, (255, 255, 255), resetButton)
-        screen.blit(buttonText, buttonRect)
+        for rect, text, text_rect, _ in buttons:
+            pygame.draw.rect(screen, (255, 255, 255), rect)
+            screen.blit(text, text_rect)
 
-        # Mouse action
-        left, _, right = pygame.mouse.get_pressed()
+        screen.blit(hint, hint_rect)
+        pygame.display.flip()
 
-        if left == 1:
-            mouse = pygame.mouse.get_pos()
+    def paint(cells):
+        for cell in cells:
+            if cell in board.walls or cell in (board.source, board.target):
+                continue
 
-            # DFS button clicked
-            if dfsButton.collidepoint(mouse):
+            if brush is None:
+                board.walls.add(cell)
+                board.dirty[cell] = Cell.WALL
+            else:
+                board.set_cost(cell, brush)
+                board.dirty[cell] = Cell.TERRAIN if brush != 1 else Cell.EMPTY
 
-                if board.source is not None and board.target is not None:
-                    solver = Solver(board)
-                    board.clean()
-                    board.path = solver.search_path(solver.DFS)
+    draw()
 
-                time.sleep(0.2)
+    # Last cell painted while dragging with the left button, None when not painting
+    painting = None
 
-            # BFS button clicked
-            if bfsButton.collidepoint(mouse):
+    # Cost painted by the left button, None to paint walls
+    brush = None
 
-                if board.source is not None and board.target is not None:
-                    solver = Solver(board)
-                    board.clean()
-                    board.path = solver.search_path(solver.BFS)
+    # Search in progress, resumed for a time slice on every frame
+    task = None
 
-                time.sleep(0.2)
+    def cancel():
+        nonlocal task
+        if task is not None:
+            task.cancel()
+            task = None
 
-            # GREEDY BFS button clicked
-            if greedyBfsButton.collidepoint(mouse):
+    while True:
+        # Sleep until something happens while idle, keep searching otherwise
+        events = pygame.event.get() if task is not None else [pygame.event.wait()] + pygame.event.get()
+        redraw = False
 
-                if board.source is not None and board.target is not None:
-                    solver = Solver(board)
-                    board.clean()
-                    board.path = solver.search_path(solver.GREEDY_BFS)
+        for event in events:
 
-                time.sleep(0.2)
+            # Check if game quit
+            if event.type == pygame.QUIT:
+                sys.exit()
 
-            # A STAR button clicked
-            if aStarButton.collidepoint(mouse):
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                action = next((action for rect, _, _, action in buttons if rect.collidepoint(event.pos)), None)
 
-                if board.source is not None and board.target is not None:
-                    solver = Solver(board)
-                    board.clean()
-                    board.path = solver.search_path(solver.A_STAR)
+                # Search button clicked, a running search is replaced
+                if action in (algorithm for _, algorithm, _ in SEARCH_BUTTONS):
+                    if board.source is not None and board.target is not None:
+                        cancel()
+                        board.clean()
+                        task = Solver(searched).iter_search(action, budget=SEARCH_BUDGET, observer=observer)
+                        redraw = True
 
-                time.sleep(0.2)
+                # Clean button clicked
+                elif action == "clean":
+                    cancel()
+                    board.clean()
+                    redraw = True
+
+                # Reset button clicked
+                elif action == "reset":
+                    cancel()
+                    board.reset()
+                    redraw = True
+
+                # Cell left-clicked, start painting walls. The board can not change
+                # under a running search
+                else:
+                    painting = board.cell_at(event.pos)
+                    if painting is not None:
+                        cancel()
+                        paint([painting])
+
+            elif event.type == pygame.KEYDOWN and event.key in TERRAIN_KEYS:
+                brush = TERRAIN_KEYS[event.key]
+
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_w:
+                brush = None
+
+            elif event.type == pygame.MOUSEBUTTONUP and event.button == 1:
+                painting = None
+
+            # Paint every cell the mouse went through since the last event
+            elif event.type == pygame.MOUSEMOTION and painting is not None:
+                cell = board.cell_at(event.pos)
+                if cell is not None:
+                    paint(line(painting, cell))
+                    painting = cell
 
-            # Clean button clicked
-            elif cleanButton.collidepoint(mouse):
-                board.clean()
-                continue
+            # Cell right-clicked
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 3:
+                cell = board.cell_at(event.pos)
 
-            # Reset button clicked
-            elif resetButton.collidepoint(mouse):
-                board.reset()
-                continue
+                if cell is not None and (board.source is None or board.target is None):
+                    cancel()
 
-            # Cell left-clicked
-            else:
-                for row in board.cells:
-                    for cell in row:
-                        if (cell.rect.collidepoint(mouse)):
-                            board.walls.add(cell.position)
+                    if board.source is None:
+                        board.source = cell
+                        board.dirty[cell] = Cell.SOURCE
+                    elif board.target is None:
+                        board.target = cell
+                        board.dirty[cell] = Cell.TARGET
 
-        elif right == 1:
-            mouse = pygame.mouse.get_pos()
+        # Search for the rest of the frame, so events are handled at least once per frame
+        if task is not None:
+            task.run(timeout=1 / MAX_FPS)
 
-            # Cell right-clicked
-            for row in board.cells:
-                for cell in row:
-                    if (cell.rect.collidepoint(mouse)):
-                        if board.source is None:
-                            board.source = cell.position
-                        elif board.target is None:
-                            board.target = cell.position
+            if task.done:
+                board.path = task.path
+                task = None
+                redraw = True
 
-            time.sleep(0.1)
+        if redraw:
+            draw()
+        else:
+            board.update(force=True)
 
-        pygame.display.flip()
+        if task is None:
+            clock.tick(MAX_FPS)
 
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    # An optional map file can be given, in the binary format or a MovingAI .map
+    main(*sys.argv[1:2])
@@ -1,157 +1,1460 @@
 import abc
+import heapq
+import itertools
+import time
+
+from array import array
+from collections import deque
 
 
 class Environment(abc.ABC):
     """Environment class
 
-    This is an abstract class that must be subclassed with application specific methods.
+    This is an abstract class that must be subclassed with application specific methods.
+
+    Attributes:
+        source: Starting state of the system.
+        target: Goal state of the system.
+        explored (set): Set of explored states.
+        fingerprint: Hashable value that changes whenever the state space changes,
+            None if the environment does not keep track of it.
+        weighted (bool): True if some moves cost more than 1. Weighted environments
+            are searched by A* taking the costs into account.
+        min_cost (int): Lower bound of the cost of any move, used to scale heuristics.
+    """
+    source = None
+    target = None
+    explored = set()
+    fingerprint = None
+    weighted = False
+    min_cost = 1
+
+    def goal_test(self, state) -> bool:
+        """Goal test
+
+        Way to determine whether a given state is a goal state.
+
+        Parameters:
+            state: Current state.
+
+        Returns:
+            True: If current state is the goal.
+            False: If current state is not the goal.
+        """
+        return state == self.target
+
+    @abc.abstractmethod
+    def get_actions(self, state) -> list:
+        """Get actions from environment
+
+        Must be implemented in application class.
+
+        Parameters:
+            state: Current state.
+
+        Returns:
+            actions (list): A list of actions that can be taken in a state.
+        """
+        ...
+
+    @abc.abstractmethod
+    def transition_model(self, state, action):
+        """Transition model
+
+        Must be implemented in application class.
+
+        Parameters:
+            state: Current state.
+            action: Action to be taken.
+
+        Returns:
+            new_state: State resulting from performing the action.
+        """
+        ...
+
+    def successors(self, state) -> list:
+        """Get successors
+
+        Returns every state that can be reached from the given state in one step,
+        together with the action that leads to it. Actions that leave the state
+        unchanged are not included.
+
+        By default it is built from get_actions and transition_model, but it can be
+        overridden when the environment has a faster way of enumerating neighbours.
+
+        Parameters:
+            state: Current state.
+
+        Returns:
+            successors (list): A list of pairs of the form (action, new_state).
+        """
+        successors = []
+
+        for action in self.get_actions(state):
+            new_state = self.transition_model(state, action)
+
+            if new_state != state:
+                successors.append((action, new_state))
+
+        return successors
+
+    def weighted_successors(self, state) -> list:
+        """Get weighted successors
+
+        Same as successors, together with the cost of every move. Costs must be
+        positive integers. By default every move costs 1.
+
+        Must be overridden by weighted environments.
+
+        Parameters:
+            state: Current state.
+
+        Returns:
+            successors (list): A list of tuples of the form (action, new_state, cost).
+        """
+        return [(action, new_state, 1) for action, new_state in self.successors(state)]
+
+    def predecessors(self, state) -> list:
+        """Get predecessors
+
+        Reverse of successors, used by the bidirectional algorithms to search
+        backwards from the target.
+
+        Must be implemented if you plan to use one of the bidirectional search algorithms.
+
+        Parameters:
+            state: Current state.
+
+        Returns:
+            predecessors (list): A list of pairs of the form (action, previous_state),
+                where performing action in previous_state leads to state.
+        """
+        raise NotImplementedError
+
+    def weighted_predecessors(self, state) -> list:
+        """Get weighted predecessors
+
+        Same as predecessors, together with the cost of every move from the previous
+        state. By default every move costs 1.
+
+        Must be overridden by weighted environments to be searched with bidirectional A*.
+
+        Parameters:
+            state: Current state.
+
+        Returns:
+            predecessors (list): A list of tuples of the form (action, previous_state, cost).
+        """
+        return [(action, previous, 1) for action, previous in self.predecessors(state)]
+
+    def is_reachable(self, source, target) -> bool:
+        """Is reachable
+
+        Quick check, done before every search, of whether target can be reached from
+        source. It must only return False when there is certainly no path, and it
+        must be much faster than a search, such as a lookup in a connectivity index.
+
+        By default every target is considered reachable.
+
+        Parameters:
+            source: Starting state.
+            target: Goal state.
+
+        Returns:
+            True: If there may be a path from source to target.
+            False: If there is no path.
+        """
+        return True
+
+    def create_explored(self):
+        """Create explored set
+
+        Returns an empty container for the explored states. It must support the
+        `in` operator and an `add` method.
+
+        Returns:
+            explored (set): An empty set.
+        """
+        return set()
+
+    def cost_to_target(self, state) -> int:
+        """Estimate cost to target
+
+        Get estimated cost to reach target state from current state.
+
+        The search will be optimal if this function:
+            - is admissible (never overestimates the true cost), and
+            - is consistent (for every node n and successor n' with step cost c, h(n) <= h(n') + c)
+
+        Must be implemented if you plan to use one of the informed search algorithms (GREEDY_BFS, A*).
+
+        Parameters:
+            state: Current state.
+
+        Returns:
+            cost (int): integer representing the estimated cost.
+        """
+        raise NotImplementedError
+
+    def cost_to_source(self, state) -> int:
+        """Estimate cost from source
+
+        Get estimated cost to reach current state from the source state. It has the
+        same requirements as cost_to_target.
+
+        Must be implemented if you plan to use the bidirectional A* algorithm.
+
+        Parameters:
+            state: Current state.
+
+        Returns:
+            cost (int): integer representing the estimated cost.
+        """
+        raise NotImplementedError
+
+
+class SearchObserver:
+    """SearchObserver class
+
+    Receives notifications while a search is running. Every method does nothing
+    by default, so subclasses only implement the ones they need.
+    """
+    def on_expand(self, node):
+        """Node expanded
+
+        Called when a node is removed from the frontier to be expanded.
+
+        Parameters:
+            node (Node): Node being expanded.
+        """
+        pass
+
+    def on_generate(self, node):
+        """Node generated
+
+        Called when a new node is created for a successor state.
+
+        Parameters:
+            node (Node): Node that was generated.
+        """
+        pass
+
+    def on_path(self, path):
+        """Path found
+
+        Called once when the search reaches the target.
+
+        Parameters:
+            path (list): List of actions of the form (state, action).
+        """
+        pass
+
+
+def complete(search):
+    """Complete search
+
+    Runs a search generator until it finishes.
+
+    Parameters:
+        search (generator): Generator that yields after every expansion and returns the path.
+
+    Returns:
+        path (list): The value returned by the generator.
+    """
+    while True:
+        try:
+            next(search)
+        except StopIteration as stop:
+            return stop.value
+
+
+class Solver:
+    """
+    A generic solver that implements various algorithms to perform a search.
+    It requires an environment that must be subclassed from the base in this file.
+
+    Attributes:
+        environment (Environment): Current application environment subclassed.
+        compact (bool): Store the search tree in flat arrays instead of Node objects.
+            Only used with environments whose states are integers in range(environment.size)
+            and that provide a neighbours method, such as GridEnvironment.
+        node_budget (int): Maximum number of nodes kept in memory by SMA_STAR.
+        peak_nodes (int): Largest number of nodes kept in memory by the last IDA_STAR or
+            SMA_STAR search, None for the other algorithms.
+    """
+    # Supports 10 different search algorithms
+    DFS, BFS, GREEDY_BFS, A_STAR, BIDIRECTIONAL_BFS, BIDIRECTIONAL_A_STAR, JPS, DIJKSTRA, IDA_STAR, SMA_STAR = range(10)
+
+    def __init__(self, environment, compact = False, node_budget = 100000):
+        self.environment = environment
+        self.compact = compact
+        self.node_budget = node_budget
+        self.peak_nodes = None
+
+    def search_path(self, algorithm = A_STAR, observer = None, stats = None):
+        """Search path from source to target
+
+        Returns list of actions that connects source to target using the selected algorithm.
+
+        Parameters:
+            algorithm: Algorithm to be used to perform the search.
+            observer (SearchObserver): Optional object notified of the search progress.
+            stats (SearchStats): Optional object filled with statistics of the search.
+                Without it the search is not instrumented at all.
+
+        Returns:
+            path (list): List of actions of the form (state, action).
+            None: If there is no possible path.
+        """
+        return complete(self._search(algorithm, observer, stats))
+
+    def iter_search(self, algorithm = A_STAR, budget = 1, observer = None, stats = None):
+        """Iterate search from source to target
+
+        Same as search_path, but the search runs step by step through the returned
+        task, which can be resumed later or cancelled. Every step performs at most
+        `budget` expansions, so a long search can be interleaved with rendering
+        frames, run in a background thread or given a time slice.
+
+        The explored set of the environment is shared, so only one search should be
+        running on an environment at a time.
+
+        Parameters:
+            algorithm: Algorithm to be used to perform the search.
+            budget (int): Expansions performed by every step.
+            observer (SearchObserver): Optional object notified of the search progress.
+            stats (SearchStats): Optional object filled with statistics of the search.
+
+        Returns:
+            task (SearchTask): Search that has not started yet.
+        """
+        return SearchTask(self._search(algorithm, observer, stats), budget)
+
+    def _search(self, algorithm, observer, stats = None):
+        """Search generator
+
+        Performs the search selected by algorithm, yielding after every expansion.
+
+        Parameters:
+            algorithm: Algorithm to be used to perform the search.
+            observer (SearchObserver): Optional object notified of the search progress.
+            stats (SearchStats): Optional object filled with statistics of the search.
+
+        Returns:
+            path (list): List of actions of the form (state, action).
+            None: If there is no possible path.
+        """
+        if stats is not None:
+            # The same search runs on an instrumented copy of the solver
+            solver = InstrumentedSolver(self.environment, self.compact, stats, self.node_budget)
+
+            start = time.perf_counter()
+            path = yield from solver._search(algorithm, StatsObserver(stats, observer))
+            stats.elapsed += time.perf_counter() - start
+            stats.searches += 1
+
+            self.peak_nodes = solver.peak_nodes
+            if solver.peak_nodes is not None:
+                stats.peak_nodes = max(stats.peak_nodes, solver.peak_nodes)
+
+            return path
+
+        self.peak_nodes = None
+
+        environment = self.environment
+
+        # Heuristics such as a LandmarkIndex are checked against the environment once
+        # per search, not on every estimate
+        heuristic = getattr(environment, 'heuristic', None)
+        if heuristic is not None:
+            heuristic.refresh(environment)
+
+        # Unreachable targets are answered without exploring the whole component
+        if not environment.is_reachable(environment.source, environment.target):
+            environment.explored = environment.create_explored()
+            return None
+
+        if algorithm == self.BIDIRECTIONAL_BFS:
+            return (yield from self._search_bidirectional_bfs(observer))
+
+        if algorithm == self.BIDIRECTIONAL_A_STAR:
+            return (yield from self._search_bidirectional_a_star(observer))
+
+        # Jump point search only works on grids, which depend on this module, where
+        # every move costs 1. Weighted grids are searched with A* instead
+        if algorithm == self.JPS and not self.environment.weighted:
+            from jps import JumpPointSearch
+            return (yield from JumpPointSearch(self.environment).expansions(observer))
+
+        if algorithm == self.IDA_STAR:
+            return (yield from self._search_ida_star(observer))
+
+        if algorithm == self.SMA_STAR:
+            return (yield from self._search_sma_star(observer))
+
+        if algorithm == self.DIJKSTRA or (algorithm in (self.A_STAR, self.JPS) and self.environment.weighted):
+            return (yield from self._search_weighted(self.A_STAR if algorithm == self.JPS else algorithm, observer))
+
+        if self.compact and hasattr(self.environment, 'neighbours'):
+            return (yield from self._search_compact(algorithm, observer))
+
+        # A greedy frontier decides by itself whether a state it already holds
+        # must be updated, so it is offered every unexplored successor
+        greedy = algorithm not in (self.DFS, self.BFS)
+        frontier = self._create_frontier(algorithm)
+
+        # Initialize frontier with just the starting position
+        start = Node(state=self.environment.source, parent=None, action=None)
+        frontier.add(start)
+
+        # Initilize an empty explored set
+        self.environment.explored = self.environment.create_explored()
+
+        # Keep looping until solution found
+        while True:
+
+            # If there is nothing left in the frontier, then there is no solution
+            if frontier.empty():
+                return None
+
+            # Choose a node from the frontier (implementation changes according to the type of frontier chosen)
+            node = frontier.remove()
+
+            if observer is not None:
+                observer.on_expand(node)
+
+            # Process every state that can be reached from current state
+            for action, state in self.environment.successors(node.state):
+
+                if state in self.environment.explored:
+                    continue
+
+                if greedy or not frontier.contains_state(state):
+                    child = Node(state=state, parent=node, action=action)
+
+                    if observer is not None:
+                        observer.on_generate(child)
+
+                    # If child is the goal, then there is a solution
+                    if self.environment.goal_test(child.state):
+                        path = child.path()
+
+                        if observer is not None:
+                            observer.on_path(path)
+
+                        return path
+                    else:
+                        frontier.add(child)
+
+            # Mark node as explored
+            self.environment.explored.add(node.state)
+
+            yield
+
+    def _create_frontier(self, algorithm):
+        """Create frontier
+
+        Parameters:
+            algorithm: Algorithm to be used to perform the search.
+
+        Returns:
+            frontier: Empty frontier for the algorithm.
+        """
+        # The algorithm selected determines the type of frontier to be used
+        frontier = StackFrontier() if algorithm == self.DFS else \
+                   QueueFrontier() if algorithm == self.BFS else \
+                   GreedyFrontier(lambda node: self.environment.cost_to_target(node.state)) if algorithm == self.GREEDY_BFS else \
+                   BucketFrontier(lambda node: node.cost_from_source) if algorithm == self.DIJKSTRA else \
+                   GreedyFrontier(self._a_star_cost)
+
+        return frontier
+
+    def _search_weighted(self, algorithm, observer):
+        """Search path taking move costs into account
+
+        Used by DIJKSTRA, and by A_STAR on weighted environments. Every node keeps
+        the cost of the path that reaches it, and the goal test is done when the node
+        is expanded instead of when it is generated, because a cheaper path to the
+        target may still be in the frontier. The compact mode is not used.
+
+        Parameters:
+            algorithm: Algorithm to be used to perform the search.
+            observer (SearchObserver): Optional object notified of the search progress.
+
+        Returns:
+            path (list): List of actions of the form (state, action).
+            None: If there is no possible path.
+        """
+        environment = self.environment
+
+        frontier = self._create_frontier(algorithm)
+        frontier.add(Node(state=environment.source, parent=None, action=None))
+
+        environment.explored = environment.create_explored()
+
+        while not frontier.empty():
+            node = frontier.remove()
+
+            if observer is not None:
+                observer.on_expand(node)
+
+            if environment.goal_test(node.state):
+                path = node.path()
+
+                if observer is not None:
+                    observer.on_path(path)
+
+                return path
+
+            environment.explored.add(node.state)
+
+            for action, state, cost in environment.weighted_successors(node.state):
+
+                if state in environment.explored:
+                    continue
+
+                # The frontier only keeps the node if it is the cheapest for its state
+                child = Node(state=state, parent=node, action=action, cost=cost)
+
+                if observer is not None:
+                    observer.on_generate(child)
+
+                frontier.add(child)
+
+            yield
+
+        return None
+
+    def _search_ida_star(self, observer):
+        """Iterative deepening A*
+
+        Depth-first searches limited by the estimated total cost f = g + h, raising
+        the limit to the lowest f that exceeded it until the target is found. Only
+        the current path and the successors of its states are kept in memory, so
+        the memory used grows linearly with the length of the path. The price is
+        that states reached through different paths are expanded again, and the
+        shallower levels are expanded again in every iteration.
+
+        Move costs are taken into account. States already in the current path are
+        skipped, so the search never loops.
+
+        Warning: every iteration goes over all the paths under the limit, whose number
+        grows exponentially with their length, and the limit only rises to the next
+        distinct cost. On grids with terrain costs there are many distinct costs, so
+        even a 12x12 weighted grid can take practically forever. The same happens
+        when the target can not be reached from a large open region, so on grids
+        without a connectivity index the regions are labelled first, and unreachable
+        targets are answered at once.
+
+        Parameters:
+            observer (SearchObserver): Optional object notified of the search progress.
+
+        Returns:
+            path (list): List of actions of the form (state, action).
+            None: If there is no possible path.
+        """
+        environment = self.environment
+
+        # Nothing is remembered between paths
+        environment.explored = environment.create_explored()
+
+        root = Node(state=environment.source, parent=None, action=None)
+        self.peak_nodes = 1
+
+        if environment.goal_test(root.state):
+            return []
+
+        # Grids, which depend on this module, are checked with a connectivity index
+        # built for this search when none is attached
+        if hasattr(environment, 'connectivity') and environment.connectivity is None:
+            from connectivity import ConnectivityIndex
+
+            grid = environment.environment if isinstance(environment, InstrumentedEnvironment) else environment
+
+            if not ConnectivityIndex(grid).is_reachable(environment.source, environment.target):
+                return None
+
+        def children(node):
+            return [
+                Node(state=state, parent=node, action=action, cost=cost)
+                for action, state, cost in environment.weighted_successors(node.state)
+                if state not in path
+            ]
+
+        bound = environment.cost_to_target(root.state)
+
+        while True:
+            next_bound = None
+
+            # Stack of (node, remaining children) for the current path
+            path = {root.state}
+            stack = [(root, iter(children(root)))]
+
+            if observer is not None:
+                observer.on_expand(root)
+
+            while stack:
+                node, remaining = stack[-1]
+                child = next(remaining, None)
+
+                if child is None:
+                    stack.pop()
+                    path.discard(node.state)
+                    continue
+
+                cost = child.cost_from_source + environment.cost_to_target(child.state)
+
+                # Paths over the limit set the limit of the next iteration
+                if cost > bound:
+                    if next_bound is None or cost < next_bound:
+                        next_bound = cost
+                    continue
+
+                if observer is not None:
+                    observer.on_generate(child)
+
+                if environment.goal_test(child.state):
+                    result = child.path()
+
+                    if observer is not None:
+                        observer.on_path(result)
+
+                    return result
+
+                path.add(child.state)
+                stack.append((child, iter(children(child))))
+                self.peak_nodes = max(self.peak_nodes, len(stack))
+
+                if observer is not None:
+                    observer.on_expand(child)
+
+                yield
+
+            # Every path was explored without going over the limit
+            if next_bound is None:
+                return None
+
+            bound = next_bound
+
+    def _search_sma_star(self, observer):
+        """Simplified memory-bounded A*
+
+        A* that keeps at most node_budget nodes in memory. When the budget is hit,
+        the leaf with the highest f (the shallowest one on ties) is removed, and its
+        parent remembers its f as the best cost of its forgotten successors, so the
+        branch can be generated again if it becomes the most promising one. The f of
+        every node is kept up to date with the best f of its successors, so the
+        search moves between branches as A* would.
+
+        Paths that need more nodes than the budget can not be found, since a path
+        must be in memory as a whole. The path returned is optimal among the paths
+        that fit in the budget. Move costs are taken into account. States already in
+        the path of a node are not generated again, so the search ends with None when
+        the target can not be reached.
+
+        Parameters:
+            observer (SearchObserver): Optional object notified of the search progress.
+
+        Returns:
+            path (list): List of actions of the form (state, action).
+            None: If there is no possible path within the budget.
+        """
+        environment = self.environment
+        environment.explored = environment.create_explored()
+
+        budget = max(self.node_budget, 2)
+        infinity = float('inf')
+        counter = itertools.count()
+
+        root = BoundedNode(state=environment.source, parent=None, action=None, cost=0)
+        root.f = environment.cost_to_target(root.state)
+
+        nodes = self.peak_nodes = 1
+
+        # Nodes that may still generate successors, in two heaps: the best (lowest f,
+        # deepest) for expansion and, among the leaves, the worst (highest f,
+        # shallowest) for removal. Entries are skipped when the node left the queue
+        # or its f changed, and leaves are pushed again when they lose their children
+        best, worst = [], []
+
+        def enqueue(node):
+            node.queued = True
+            node.version += 1
+            heapq.heappush(best, (node.f, -node.depth, next(counter), node.version, node))
+            if not node.children:
+                heapq.heappush(worst, (-node.f, node.depth, next(counter), node.version, node))
+
+        def valid(entry):
+            node = entry[-1]
+            return node.queued and entry[-2] == node.version
+
+        def backup(node):
+            # The f of a node is the best f of its successors, once they are all known
+            while node is not None and node.successors is not None and node.pending == len(node.successors):
+                known = [child.f for child in node.children.values()] + list(node.forgotten.values())
+                f = min(known, default=infinity)
+
+                if f == node.f:
+                    break
+
+                node.f = f
+                if node.queued:
+                    enqueue(node)
+
+                node = node.parent
+
+        enqueue(root)
+
+        while True:
+            while best and not valid(best[0]):
+                heapq.heappop(best)
+
+            if not best or best[0][-1].f == infinity:
+                return None
+
+            node = best[0][-1]
+
+            if environment.goal_test(node.state):
+                path = node.path()
+
+                if observer is not None:
+                    observer.on_path(path)
+
+                return path
+
+            if node.successors is None:
+                if observer is not None:
+                    observer.on_expand(node)
+
+                # States already in the path are skipped, going back never helps. A node
+                # without successors left is a dead end
+                ancestors = set()
+                ancestor = node.parent
+                while ancestor is not None:
+                    ancestors.add(ancestor.state)
+                    ancestor = ancestor.parent
+
+                node.successors = [successor for successor in environment.weighted_successors(node.state)
+                                   if successor[1] not in ancestors]
+
+            # Next successor: a new one, or the best forgotten one
+            if node.pending < len(node.successors):
+                action, state, cost = node.successors[node.pending]
+                node.pending += 1
+                forgotten = None
+            elif node.forgotten:
+                state = min(node.forgotten, key=node.forgotten.get)
+                action, _, cost = next(successor for successor in node.successors if successor[1] == state)
+                forgotten = node.forgotten.pop(state)
+            else:
+                # Dead end, it will be removed when memory is needed
+                node.f = infinity
+                enqueue(node)
+                backup(node.parent)
+                yield
+                continue
+
+            child = BoundedNode(state=state, parent=node, action=action, cost=cost)
+
+            # A path through a node at the maximum depth could not be completed
+            if child.depth >= budget - 1 and not environment.goal_test(state):
+                child.f = infinity
+            else:
+                child.f = max(node.f, child.cost_from_source + environment.cost_to_target(state))
+
+            if forgotten is not None:
+                child.f = max(child.f, forgotten)
+
+            if observer is not None:
+                observer.on_generate(child)
+
+            node.children[state] = child
+            nodes += 1
+
+            # Fully expanded nodes leave the queue
+            if node.pending == len(node.successors) and not node.forgotten:
+                node.queued = False
+
+            backup(node)
+            enqueue(child)
+
+            # Remove the worst leaf when the budget is exceeded
+            while nodes > budget:
+                while worst and (not valid(worst[0]) or worst[0][-1].children):
+                    heapq.heappop(worst)
+
+                # The root is never removed
+                if not worst or worst[0][-1].parent is None:
+                    break
+
+                leaf = heapq.heappop(worst)[-1]
+                parent = leaf.parent
+
+                del parent.children[leaf.state]
+                parent.forgotten[leaf.state] = leaf.f
+                leaf.queued = False
+                nodes -= 1
+
+                # The parent can generate the successor again, and may be a leaf now
+                enqueue(parent)
+
+            self.peak_nodes = max(self.peak_nodes, nodes)
+
+            yield
+
+    def _search_compact(self, algorithm, observer):
+        """Search path using flat arrays
+
+        Same search as search_path, but the frontier holds plain integer states and
+        the search tree is kept in a NodeStore. Observers receive nodes without parent.
+
+        Parameters:
+            algorithm: Algorithm to be used to perform the search.
+            observer (SearchObserver): Optional object notified of the search progress.
+
+        Returns:
+            path (list): List of actions of the form (state, action).
+            None: If there is no possible path.
+        """
+        environment = self.environment
+        actions = environment.ACTIONS
+
+        store = NodeStore(environment.size)
+        parents, costs, codes = store.parents, store.costs, store.actions
+
+        explored = environment.explored = environment.create_explored()
+
+        informed = algorithm in (self.GREEDY_BFS, self.A_STAR)
+        counter = itertools.count()
+
+        source = environment.source
+        costs[source] = 0
+
+        if informed:
+            frontier = [(0, 0, next(counter), source, 0)]
+        else:
+            frontier = deque([source])
+            remove = frontier.pop if algorithm == self.DFS else frontier.popleft
+
+        while frontier:
+
+            if informed:
+                *_, state, cost = heapq.heappop(frontier)
+
+                # Skip entries replaced by a cheaper path to the same state
+                if cost != costs[state] or state in explored:
+                    continue
+            else:
+                state = remove()
+
+            if observer is not None:
+                observer.on_expand(Node(state=state, parent=None, action=None))
+
+            cost = costs[state] + 1
+
+            for code, new_state in environment.neighbours(state):
+
+                if new_state in explored:
+                    continue
+
+                # States already generated are only updated by A* when the new path is cheaper
+                if costs[new_state] >= 0 and (algorithm != self.A_STAR or costs[new_state] <= cost):
+                    continue
+
+                parents[new_state] = state
+                costs[new_state] = cost
+                codes[new_state] = code
+
+                if observer is not None:
+                    observer.on_generate(Node(state=new_state, parent=None, action=actions[code]))
+
+                if environment.goal_test(new_state):
+                    path = [(state, actions[code]) for state, code in store.path(new_state)]
+
+                    if observer is not None:
+                        observer.on_path(path)
+
+                    return path
+
+                if informed:
+                    cost_to_target = environment.cost_to_target(new_state)
+                    priority = cost_to_target if algorithm == self.GREEDY_BFS else cost + cost_to_target
+                    heapq.heappush(frontier, (priority, cost_to_target, next(counter), new_state, cost))
+                else:
+                    frontier.append(new_state)
+
+            explored.add(state)
+
+            yield
+
+        return None
+
+    def _search_bidirectional_bfs(self, observer):
+        """Bidirectional breadth-first search
+
+        Runs a BFS from the source and another one backwards from the target,
+        expanding a whole level of the smallest frontier each time. When a level
+        reaches states already seen by the other search, the shortest path through
+        any of them is returned.
+
+        Parameters:
+            observer (SearchObserver): Optional object notified of the search progress.
+
+        Returns:
+            path (list): List of actions of the form (state, action).
+            None: If there is no possible path.
+        """
+        environment = self.environment
+        environment.explored = environment.create_explored()
+
+        source, target = environment.source, environment.target
+
+        if environment.goal_test(source):
+            return []
+
+        # For every state seen: (neighbour state in the path, action, depth)
+        forward = {source: (None, None, 0)}
+        backward = {target: (None, None, 0)}
+
+        forward_level, backward_level = [source], [target]
+
+        while forward_level and backward_level:
+
+            # Expand the smallest level, forwards or backwards
+            if len(forward_level) <= len(backward_level):
+                level, seen, other, neighbours = forward_level, forward, backward, environment.successors
+            else:
+                level, seen, other, neighbours = backward_level, backward, forward, environment.predecessors
+
+            next_level = []
+            meeting, best = None, None
+
+            for state in level:
+
+                if observer is not None:
+                    observer.on_expand(Node(state=state, parent=None, action=None))
+
+                depth = seen[state][2] + 1
+
+                for action, new_state in neighbours(state):
+
+                    if new_state in seen:
+                        continue
+
+                    seen[new_state] = (state, action, depth)
+                    next_level.append(new_state)
+
+                    if observer is not None:
+                        observer.on_generate(Node(state=new_state, parent=None, action=action))
+
+                    if new_state in other and (best is None or depth + other[new_state][2] < best):
+                        meeting, best = new_state, depth + other[new_state][2]
+
+                environment.explored.add(state)
+
+                yield
+
+            if meeting is not None:
+                return self._join_paths(forward, backward, meeting, observer)
+
+            if seen is forward:
+                forward_level = next_level
+            else:
+                backward_level = next_level
+
+        return None
+
+    def _search_bidirectional_a_star(self, observer):
+        """Bidirectional A* search
 
-    Attributes:
-        source: Starting state of the system.
-        target: Goal state of the system.
-        explored (set): Set of explored states.
-    """
-    source = None
-    target = None
-    explored = set()
+        Runs an A* search from the source and another one backwards from the target,
+        both guided by the same averaged potential p(v) = (cost_to_target(v) -
+        cost_to_source(v)) / 2, added to the cost of the forward search and subtracted
+        from the cost of the backward one. Both searches then see the same consistent
+        costs, so every time they reach the same state the best path found so far is
+        updated, and the search stops as soon as the lowest keys of both frontiers add
+        up to the cost of that path. Ties are broken in favour of the deepest states,
+        and the side with the smallest frontier is expanded first.
 
-    def goal_test(self, state) -> bool:
-        """Goal test
+        The averaged potential is only half as informed as the heuristic of A*, so on
+        open maps and rooms this mode usually expands more states than A_STAR; it pays
+        off when both ends are surrounded by dead ends that A* would explore.
 
-        Way to determine whether a given state is a goal state.
+        Move costs are taken into account through weighted_successors and
+        weighted_predecessors, so the path is the cheapest one.
 
         Parameters:
-            state: Current state.
+            observer (SearchObserver): Optional object notified of the search progress.
 
         Returns:
-            True: If current state is the goal.
-            False: If current state is not the goal.
+            path (list): List of actions of the form (state, action).
+            None: If there is no possible path.
         """
-        return state == self.target
+        environment = self.environment
+        environment.explored = environment.create_explored()
 
-    @abc.abstractmethod
-    def get_actions(self, state) -> list:
-        """Get actions from environment
+        source, target = environment.source, environment.target
 
-        Must be implemented in application class.
+        if environment.goal_test(source):
+            return []
+
+        counter = itertools.count()
+
+        # Search state of each direction
+        forward = {source: (None, None, 0)}
+        backward = {target: (None, None, 0)}
+        forward_closed, backward_closed = set(), set()
+        def potential(state):
+            return (environment.cost_to_target(state) - environment.cost_to_source(state)) / 2
+
+        # Entries of the form (key, -cost, order, state, cost), deepest first on equal keys
+        forward_heap = [(potential(source), 0, next(counter), source, 0)]
+        backward_heap = [(-potential(target), 0, next(counter), target, 0)]
+
+        meeting, best = None, None
+
+        while True:
+
+            # Discard entries replaced by a cheaper path or already expanded
+            for heap, seen, closed in ((forward_heap, forward, forward_closed),
+                                       (backward_heap, backward, backward_closed)):
+                while heap and (heap[0][3] in closed or heap[0][4] != seen[heap[0][3]][2]):
+                    heapq.heappop(heap)
+
+            if not forward_heap or not backward_heap:
+                break
+
+            # No path through the frontiers can be cheaper than the best one found
+            if best is not None and forward_heap[0][0] + backward_heap[0][0] >= best:
+                break
+
+            if len(forward_heap) <= len(backward_heap):
+                heap, seen, closed, other, sign = forward_heap, forward, forward_closed, backward, 1
+                neighbours = environment.weighted_successors
+            else:
+                heap, seen, closed, other, sign = backward_heap, backward, backward_closed, forward, -1
+                neighbours = environment.weighted_predecessors
+
+            _, _, _, state, state_cost = heapq.heappop(heap)
+            closed.add(state)
+
+            if observer is not None:
+                observer.on_expand(Node(state=state, parent=None, action=None))
+
+            for action, new_state, move_cost in neighbours(state):
+                cost = state_cost + move_cost
+
+                if new_state in closed or (new_state in seen and seen[new_state][2] <= cost):
+                    continue
+
+                seen[new_state] = (state, action, cost)
+                heapq.heappush(heap, (cost + sign * potential(new_state), -cost, next(counter), new_state, cost))
+
+                if observer is not None:
+                    observer.on_generate(Node(state=new_state, parent=None, action=action))
+
+                if new_state in other and (best is None or cost + other[new_state][2] < best):
+                    meeting, best = new_state, cost + other[new_state][2]
+
+            environment.explored.add(state)
+
+            yield
+
+        if meeting is None:
+            return None
+
+        return self._join_paths(forward, backward, meeting, observer)
+
+    def _join_paths(self, forward, backward, meeting, observer):
+        """Join paths
+
+        Builds the path of a bidirectional search from the state where both searches met.
 
         Parameters:
-            state: Current state.
+            forward (dict): Previous state, action and cost of every state reached from the source.
+            backward (dict): Next state, action and cost of every state reached from the target.
+            meeting: State reached by both searches.
+            observer (SearchObserver): Optional object notified of the path found.
 
         Returns:
-            actions (list): A list of actions that can be taken in a state.
+            path (list): List of actions of the form (state, action).
         """
-        ...
+        path = []
 
-    @abc.abstractmethod
-    def transition_model(self, state, action):
-        """Transition model
+        state = meeting
+        while forward[state][0] is not None:
+            path.append((state, forward[state][1]))
+            state = forward[state][0]
 
-        Must be implemented in application class.
+        path.reverse()
+
+        state = meeting
+        while backward[state][0] is not None:
+            state, action = backward[state][0], backward[state][1]
+            path.append((state, action))
+
+        if observer is not None:
+            observer.on_path(path)
+
+        return path
+
+    def _a_star_cost(self, node):
+        """A* cost function
+
+        Total estimated cost of a path through the node. The heuristic is also
+        returned so that ties are broken in favour of nodes closer to the target.
 
         Parameters:
-            state: Current state.
-            action: Action to be taken.
+            node (Node): Node to be evaluated.
 
         Returns:
-            new_state: State resulting from performing the action.
+            cost (tuple): Pair of the form (estimated total cost, estimated cost to target).
         """
-        ...
+        cost_to_target = self.environment.cost_to_target(node.state)
+        return node.cost_from_source + cost_to_target, cost_to_target
 
-    def cost_to_target(self, state) -> int:
-        """Estimate cost to target
 
-        Get estimated cost to reach target state from current state.
+class SearchStats:
+    """Search statistics
 
-        The search will be optimal if this function:
-            - is admissible (never overestimates the true cost), and
-            - is consistent (for every node n and successor n' with step cost c, h(n) <= h(n') + c)
+    Opt-in statistics of the searches performed by a Solver. When passed to
+    search_path, the environment and frontier are wrapped so that every call is
+    counted and timed, and the search is reported through an internal observer.
+    Searches without stats do not pay any of this cost.
 
-        Must be implemented if you plan to use one of the informed search algorithms (GREEDY_BFS, A*).
+    The values accumulate over every search the object is passed to.
+
+    A profiler, any object with enable and disable methods such as cProfile.Profile
+    or a sampling timer, can be attached. It is enabled only while the frontier or
+    the environment are being called.
+
+    Attributes:
+        searches (int): Searches performed.
+        expanded (int): Nodes expanded.
+        generated (int): Nodes generated.
+        successors (int): Successor states returned by the environment.
+        peak_frontier (int): Largest number of nodes in the frontier. It is exact for
+            frontier based searches, and estimated from the nodes generated and
+            expanded for the others.
+        heuristic_calls (int): Calls to cost_to_target and cost_to_source.
+        environment_calls (int): Calls to the environment.
+        peak_nodes (int): Largest number of nodes kept in memory by the memory-bounded
+            algorithms (IDA_STAR and SMA_STAR).
+        frontier_calls (int): Calls to the frontier.
+        environment_time (float): Seconds spent in the environment.
+        frontier_time (float): Seconds spent in the frontier, including the cost
+            function evaluations it does.
+        elapsed (float): Seconds from the start to the end of the searches.
+        profiler: Optional object enabled around frontier and environment calls.
+    """
+    def __init__(self, profiler = None):
+        self.profiler = profiler
+
+        self.searches = 0
+        self.expanded = 0
+        self.generated = 0
+        self.successors = 0
+        self.peak_frontier = 0
+        self.peak_nodes = 0
+        self.heuristic_calls = 0
+        self.environment_calls = 0
+        self.frontier_calls = 0
+        self.environment_time = 0.0
+        self.frontier_time = 0.0
+        self.elapsed = 0.0
+
+        self.frontier_tracked = False
+
+    @property
+    def duplicates(self):
+        """Successor states rejected because they were already explored or in the frontier."""
+        return max(self.successors - self.generated, 0)
+
+    def as_dict(self):
+        """Statistics as a dictionary
+
+        Returns:
+            stats (dict): Every counter and time.
+        """
+        return {
+            'searches': self.searches,
+            'expanded': self.expanded,
+            'generated': self.generated,
+            'successors': self.successors,
+            'duplicates': self.duplicates,
+            'peak_frontier': self.peak_frontier,
+            'peak_nodes': self.peak_nodes,
+            'heuristic_calls': self.heuristic_calls,
+            'environment_calls': self.environment_calls,
+            'frontier_calls': self.frontier_calls,
+            'environment_time': self.environment_time,
+            'frontier_time': self.frontier_time,
+            'elapsed': self.elapsed,
+        }
+
+    def timed(self, method, kind):
+        """Timed method
 
         Parameters:
-            state: Current state.
+            method: Bound method to be wrapped.
+            kind (str): 'environment' or 'frontier'.
 
         Returns:
-            cost (int): integer representing the estimated cost.
+            wrapper: Function that counts, times and profiles every call to method.
         """
-        raise NotImplementedError
+        profiler = self.profiler
+        calls, elapsed = kind + '_calls', kind + '_time'
 
+        def wrapper(*args):
+            if profiler is not None:
+                profiler.enable()
 
-class Solver:
+            start = time.perf_counter()
+            result = method(*args)
+            end = time.perf_counter()
+
+            if profiler is not None:
+                profiler.disable()
+
+            setattr(self, calls, getattr(self, calls) + 1)
+            setattr(self, elapsed, getattr(self, elapsed) + end - start)
+            return result
+
+        return wrapper
+
+
+class StatsObserver(SearchObserver):
+    """Stats observer
+
+    Counts the nodes expanded and generated into a SearchStats, and forwards every
+    notification to another observer.
     """
-    A generic solver that implements various algorithms to perform a search.
-    It requires an environment that must be subclassed from the base in this file.
+    def __init__(self, stats, observer = None):
+        self.stats = stats
+        self.observer = observer
+
+    def on_expand(self, node):
+        self.stats.expanded += 1
+
+        if self.observer is not None:
+            self.observer.on_expand(node)
+
+    def on_generate(self, node):
+        stats = self.stats
+        stats.generated += 1
+
+        # Without access to the frontier, every node generated and not expanded is in it
+        if not stats.frontier_tracked:
+            stats.peak_frontier = max(stats.peak_frontier, stats.generated - stats.expanded + 1)
+
+        if self.observer is not None:
+            self.observer.on_generate(node)
+
+    def on_path(self, path):
+        if self.observer is not None:
+            self.observer.on_path(path)
+
+
+class InstrumentedEnvironment:
+    """Instrumented environment
+
+    Proxy that forwards everything to an environment, counting and timing the calls
+    to its search methods.
+    """
+    METHODS = ('goal_test', 'get_actions', 'transition_model', 'successors', 'weighted_successors',
+               'predecessors', 'weighted_predecessors', 'neighbours', 'cost_to_target', 'cost_to_source',
+               'is_reachable')
+
+    def __init__(self, environment, stats):
+        object.__setattr__(self, 'environment', environment)
+        object.__setattr__(self, 'stats', stats)
+        object.__setattr__(self, 'methods', {})
+
+    def __getattr__(self, name):
+        value = getattr(self.environment, name)
+
+        if name not in self.METHODS:
+            return value
+
+        if name not in self.methods:
+            stats = self.stats
+            method = stats.timed(value, 'environment')
+
+            if name in ('successors', 'weighted_successors', 'predecessors', 'weighted_predecessors', 'neighbours'):
+                def method(state, timed = method):
+                    successors = timed(state)
+                    stats.successors += len(successors)
+                    return successors
+
+            elif name in ('cost_to_target', 'cost_to_source'):
+                def method(state, timed = method):
+                    stats.heuristic_calls += 1
+                    return timed(state)
+
+            self.methods[name] = method
+
+        return self.methods[name]
+
+    def __setattr__(self, name, value):
+        setattr(self.environment, name, value)
+
+
+class InstrumentedFrontier:
+    """Instrumented frontier
+
+    Proxy that counts and times every call to a frontier and keeps track of its
+    largest size.
+    """
+    def __init__(self, frontier, stats):
+        self.frontier = frontier
+        self.stats = stats
+        self.contains_state = stats.timed(frontier.contains_state, 'frontier')
+        self.empty = stats.timed(frontier.empty, 'frontier')
+        self.remove = stats.timed(frontier.remove, 'frontier')
+        self._add = stats.timed(frontier.add, 'frontier')
+
+    def add(self, node):
+        self._add(node)
+        self.stats.peak_frontier = max(self.stats.peak_frontier, len(self.frontier.nodes))
+
+
+class InstrumentedSolver(Solver):
+    """Instrumented solver
+
+    Solver that searches an InstrumentedEnvironment with instrumented frontiers. It
+    is created by Solver for every search performed with stats.
+    """
+    def __init__(self, environment, compact, stats, node_budget):
+        super().__init__(InstrumentedEnvironment(environment, stats), compact, node_budget)
+        self.stats = stats
+        stats.frontier_tracked = False
+
+    def _create_frontier(self, algorithm):
+        frontier = super()._create_frontier(algorithm)
+        self.stats.frontier_tracked = True
+
+        return InstrumentedFrontier(frontier, self.stats)
+
+    def _search_ida_star(self, observer):
+        # Memory is reported as peak_nodes, there is no frontier to estimate
+        self.stats.frontier_tracked = True
+        return (yield from super()._search_ida_star(observer))
+
+    def _search_sma_star(self, observer):
+        self.stats.frontier_tracked = True
+        return (yield from super()._search_sma_star(observer))
+
+
+class SearchTask:
+    """Search task
+
+    Search that runs step by step. Iterating over the task performs one step at a
+    time and yields the number of expansions performed so far, until the search
+    finishes or is cancelled.
+
+    Example:
+        task = solver.iter_search(Solver.A_STAR, budget=100)
+        for _ in task:
+            draw_frame()
+        path = task.path
 
     Attributes:
-        environment (Environment): Current application environment subclassed.
+        budget (int): Expansions performed by every step.
+        expanded (int): Expansions performed so far.
+        done (bool): The search finished or was cancelled.
+        cancelled (bool): The search was cancelled before finishing.
+        path (list): Result of the search once it is done, None until then.
     """
-    # Supports 4 different search algorithms
-    DFS, BFS, GREEDY_BFS, A_STAR = range(4)
+    def __init__(self, search, budget = 1):
+        if budget < 1:
+            raise ValueError("Budget must be at least 1")
 
-    def __init__(self, environment):
-        self.environment = environment
+        self.search = search
+        self.budget = budget
 
-    def search_path(self, algorithm = A_STAR):
-        """Search path from source to target
+        self.expanded = 0
+        self.done = False
+        self.cancelled = False
+        self.path = None
 
-        Returns list of actions that connects source to target using the selected algorithm.
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.done:
+            raise StopIteration
+
+        self.step()
+        return self.expanded
+
+    def step(self, budget = None):
+        """Step
+
+        Resumes the search for a limited number of expansions.
 
         Parameters:
-            algorithm: Algorithm to be used to perform the search.
+            budget (int): Maximum number of expansions, by default the task budget.
 
         Returns:
-            path (list): List of actions of the form (state, action).
-            None: If there is no possible path.
+            True: If the search is done.
+            False: If the search must be resumed again.
         """
-        # The algorithm selected determines the type of frontier to be used
-        frontier = StackFrontier() if algorithm == self.DFS else \
-                   QueueFrontier() if algorithm == self.BFS else \
-                   GreedyFrontier(lambda node: self.environment.cost_to_target(node.state)) if algorithm == self.GREEDY_BFS else \
-                   GreedyFrontier(lambda node: self.environment.cost_to_target(node.state) + node.cost_from_source)
+        for _ in range(budget or self.budget):
 
-        # Initialize frontier with just the starting position
-        start = Node(state=self.environment.source, parent=None, action=None)
-        frontier.add(start)
+            # Cancelled from another thread, the generator is closed by the one running it
+            if self.cancelled:
+                self.search.close()
+                self.done = True
+                break
 
-        # Initilize an empty explored set
-        self.environment.explored = set()
+            try:
+                next(self.search)
+            except StopIteration as stop:
+                self.path = stop.value
+                self.done = True
+                break
 
-        # Keep looping until solution found
-        while True:
+            self.expanded += 1
 
-            # If there is nothing left in the frontier, then there is no solution
-            if frontier.empty():
-                return None
+        return self.done
 
-            # Choose a node from the frontier (implementation changes according to the type of frontier chosen)
-            node = frontier.remove()
+    def run(self, timeout = None):
+        """Run
 
-            # Process every action that can be taken from current state
-            for action in self.environment.get_actions(node.state):
+        Resumes the search until it is done, cancelled or the timeout expires.
 
-                # Get state resulting from performing given action
-                state = self.environment.transition_model(node.state, action)
+        Parameters:
+            timeout (float): Maximum number of seconds, None to run until done.
 
-                if not frontier.contains_state(state) and state not in self.environment.explored:
-                    child = Node(state=state, parent=node, action=action)
+        Returns:
+            True: If the search is done.
+            False: If the timeout expired before.
+        """
+        deadline = None if timeout is None else time.perf_counter() + timeout
 
-                    # If child is the goal, then there is a solution
-                    if self.environment.goal_test(child.state):
-                        # Returns a list of (state, action) to be taken to reach the target
-                        path = []
+        while not self.done:
+            self.step()
 
-                        while child.parent is not None:
-                            path.append((child.state, child.action))
-                            child = child.parent
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
 
-                        path.reverse()
-                        return path
-                    else:
-                        frontier.add(child)
+        return self.done
 
-            # Mark node as explored
-            self.environment.explored.add(node.state)
+    def cancel(self):
+        """Cancel
+
+        Stops the search. It can be called from another thread, the search stops at
+        the end of the current expansion.
+        """
+        self.cancelled = True
+
+        if not self.done:
+            try:
+                self.search.close()
+                self.done = True
+            except ValueError:
+                # The generator is running in another thread, step will close it
+                pass
 
 
 class Node:
@@ -163,16 +1466,36 @@ class Node:
         action: Action applied to parent to get node.
         cost_from_source (int): a path cost from initial state to node.
     """
-    def __init__(self, state, parent, action):
+    __slots__ = ('state', 'parent', 'action', 'cost_from_source')
+
+    def __init__(self, state, parent, action, cost = 1):
         self.state = state
         self.parent = parent
         self.action = action
 
-        # Calculates the cost to reach this node from the source node
+        # Calculates the cost to reach this node from the source node, cost is the
+        # cost of the action applied to the parent
         if parent is None:
             self.cost_from_source = 0
         else:
-            self.cost_from_source = parent.cost_from_source + 1
+            self.cost_from_source = parent.cost_from_source + cost
+
+    def path(self):
+        """Path to node
+
+        Returns:
+            path (list): List of actions of the form (state, action) to be taken to
+                reach this node from the root.
+        """
+        path = []
+        node = self
+
+        while node.parent is not None:
+            path.append((node.state, node.action))
+            node = node.parent
+
+        path.reverse()
+        return path
 
     def __str__(self):
         return f"state: {self.state}, action: {self.action}, cost: {self.cost_from_source}"
@@ -181,23 +1504,94 @@ class Node:
         return self.__str__()
 
 
+class BoundedNode(Node):
+    """Node of the memory-bounded search (SMA*)
+
+    Node that keeps its successors in memory and remembers the best f of the ones
+    that were removed.
+
+    Attributes:
+        f (float): Estimated total cost, the best of its successors once they are known.
+        depth (int): Number of actions from the root.
+        successors (list): Tuples of the form (action, state, cost), None until expanded.
+        pending (int): Number of successors generated at least once.
+        children (dict): Successor nodes in memory, by state.
+        forgotten (dict): f of every successor removed from memory, by state.
+        queued (bool): Whether the node may still generate successors.
+        version (int): Incremented whenever the node is queued again.
+    """
+    __slots__ = ('f', 'depth', 'successors', 'pending', 'children', 'forgotten', 'queued', 'version')
+
+    def __init__(self, state, parent, action, cost = 1):
+        super().__init__(state, parent, action, cost)
+
+        self.f = 0
+        self.depth = 0 if parent is None else parent.depth + 1
+        self.successors = None
+        self.pending = 0
+        self.children = {}
+        self.forgotten = {}
+        self.queued = False
+        self.version = 0
+
+
+class NodeStore:
+    """Compact search tree
+
+    Stores the search tree for integer states in flat arrays indexed by state,
+    instead of one Node object per state.
+
+    Attributes:
+        parents (array): Parent state of every state, -1 for the root and unreached states.
+        costs (array): Path cost from the source, -1 for states not generated yet.
+        actions (array): Code of the action applied to the parent to reach every state.
+    """
+    def __init__(self, size):
+        self.parents = array('l', [-1]) * size
+        self.costs = array('l', [-1]) * size
+        self.actions = array('b', [-1]) * size
+
+    def path(self, state):
+        """Path to state
+
+        Parameters:
+            state (int): Last state of the path.
+
+        Returns:
+            path (list): List of the form (state, action code) from the root to the state.
+        """
+        path = []
+
+        while self.parents[state] != -1:
+            path.append((state, self.actions[state]))
+            state = self.parents[state]
+
+        path.reverse()
+        return path
+
+
 class StackFrontier:
     """Stack Frontier (LIFO)
 
     Frontier class that always expands the deepest node.
     The deepest node is the last one that was added.
+
+    Nodes are kept in a deque and indexed by state, so adding, removing and
+    checking whether a state is in the frontier take constant time.
     
     Used in: 
         depth-first search algorithm (DFS)
 
     Attributes:
-        list (list): A list of all nodes in the frontier.
+        list (deque): A deque of all nodes in the frontier.
+        nodes (dict): Node in the frontier for every state.
     """
     def __init__(self):
-        self.list = []
+        self.list = deque()
+        self.nodes = {}
 
     def __str__(self):
-        return str(self.list)
+        return str(list(self.list))
 
     def add(self, node):
         """Add node
@@ -206,6 +1600,7 @@ class StackFrontier:
             node (Node): Node to be added.
         """
         self.list.append(node)
+        self.nodes[node.state] = node
 
     def contains_state(self, state):
         """Contains state
@@ -217,7 +1612,7 @@ class StackFrontier:
             True: If state is in the frontier.
             False: If state is not in the frontier.
         """
-        return any(node.state == state for node in self.list)
+        return state in self.nodes
 
     def empty(self):
         """Is empty
@@ -226,7 +1621,7 @@ class StackFrontier:
             True: If there are no nodes in the frontier.
             False: If there are nodes in the frontier.
         """
-        return len(self.list) == 0
+        return len(self.nodes) == 0
 
     def remove(self):
         """Remove node
@@ -237,8 +1632,8 @@ class StackFrontier:
         if self.empty():
             raise Exception("Empty frontier")
         else:
-            node = self.list[-1]
-            self.list = self.list[:-1]
+            node = self.list.pop()
+            del self.nodes[node.state]
             return node      
 
 
@@ -252,7 +1647,8 @@ class QueueFrontier(StackFrontier):
         breath-first search algorithm (BFS)
 
     Attributes:
-        list (list): A list of all nodes in the frontier.
+        list (deque): A deque of all nodes in the frontier.
+        nodes (dict): Node in the frontier for every state.
     """
     def remove(self):
         """Remove node
@@ -263,8 +1659,8 @@ class QueueFrontier(StackFrontier):
         if self.empty():
             raise Exception("Empty frontier")
         else:
-            node = self.list[0]
-            self.list = self.list[1:]
+            node = self.list.popleft()
+            del self.nodes[node.state]
             return node
 
 
@@ -273,36 +1669,146 @@ class GreedyFrontier(StackFrontier):
 
     Frontier class that always expands the node that is closest to the goal,
     as estimated by a heuristic function (cost_function).
-    It does so by adding them in order using the cost function.
+    It does so by keeping the nodes in a binary heap ordered by the cost function,
+    which is evaluated only once per node. Ties are broken by insertion order.
+
+    When a node is added for a state that is already in the frontier, the cheapest
+    of both is kept. The old heap entry is not removed, it is just skipped when it
+    reaches the top of the heap (lazy deletion).
 
     Used in:
         greedy best-first search algorithm (GREEDY BFS)
         A* algorithm (A STAR)
 
     Attributes:
-        list (list): A list of all nodes in the frontier.
+        list (list): A binary heap with entries of the form (cost, counter, node).
+        nodes (dict): Node currently in the frontier for every state.
         cost_function (function): Method for calculating the total cost of each node.
     """
     def __init__(self, cost_function):
         super().__init__()
+        self.list = []
+        self.costs = {}
+        self.counter = itertools.count()
+        self.cost_function = cost_function
+
+    def add(self, new):
+        """Add node
+
+        Insert a node to the heap ordered by the cost function.
+        The lower the cost, the sooner it is removed. If the state is already in
+        the frontier the node is only added when it is cheaper than the current one.
+
+        Parameters:
+            new (Node): Node to be added.
+        """
+        cost = self.cost_function(new)
+
+        if new.state in self.nodes and self.costs[new.state] <= cost:
+            return
+
+        self.nodes[new.state] = new
+        self.costs[new.state] = cost
+        heapq.heappush(self.list, (cost, next(self.counter), new))
+
+    def remove(self):
+        """Remove node
+
+        Returns:
+            node (Node): The node with the lowest cost.
+        """
+        if self.empty():
+            raise Exception("Empty frontier")
+
+        while True:
+            _, _, node = heapq.heappop(self.list)
+
+            # Skip entries replaced by a cheaper node for the same state
+            if self.nodes.get(node.state) is node:
+                del self.nodes[node.state]
+                del self.costs[node.state]
+                return node
+
+
+class BucketFrontier(StackFrontier):
+    """Bucket Frontier
+
+    Frontier class that always expands the node with the lowest integer cost,
+    using a bucket queue (Dial's algorithm) instead of a binary heap. Nodes are
+    grouped in one bucket per cost, and the frontier walks the buckets in
+    increasing order. When costs are small integers, as the path costs of a
+    weighted grid, adding and removing nodes take constant time, plus the empty
+    buckets skipped, which are at most the largest step cost between removals.
+
+    As in GreedyFrontier, only the cheapest node of every state is kept, and
+    replaced nodes are skipped when they are reached (lazy deletion).
+
+    Used in:
+        Dijkstra's algorithm (DIJKSTRA)
+
+    Attributes:
+        buckets (dict): List of nodes added with every cost.
+        nodes (dict): Node currently in the frontier for every state.
+        current (int): Lowest cost that may have nodes in the frontier.
+        cost_function (function): Method for calculating the integer cost of each node.
+    """
+    def __init__(self, cost_function):
+        super().__init__()
+        self.buckets = {}
+        self.costs = {}
+        self.current = None
         self.cost_function = cost_function
 
+    def __str__(self):
+        return str(list(self.nodes.values()))
+
     def add(self, new):
         """Add node
 
-        Insert a node to the list ordered by the cost function.
-        The lower the cost, the higher in the list.
+        Insert a node in the bucket of its cost. If the state is already in the
+        frontier the node is only added when it is cheaper than the current one.
 
         Parameters:
             new (Node): Node to be added.
         """
-        position = 0
+        cost = self.cost_function(new)
+
+        if new.state in self.nodes and self.costs[new.state] <= cost:
+            return
+
+        self.nodes[new.state] = new
+        self.costs[new.state] = cost
+
+        bucket = self.buckets.get(cost)
+        if bucket is None:
+            bucket = self.buckets[cost] = []
+        bucket.append(new)
+
+        if self.current is None or cost < self.current:
+            self.current = cost
+
+    def remove(self):
+        """Remove node
+
+        Returns:
+            node (Node): A node with the lowest cost.
+        """
+        if self.empty():
+            raise Exception("Empty frontier")
+
+        while True:
+            bucket = self.buckets.get(self.current)
 
-        for node in self.list:
-            if self.cost_function(new) <= self.cost_function(node):
-                position += 1
+            # Move on to the next cost once the bucket is exhausted
+            if not bucket:
+                self.buckets.pop(self.current, None)
+                self.current += 1
                 continue
-            else:
-                break
 
-        self.list.insert(position, new)
+            node = bucket.pop()
+
+            # Skip entries replaced by a cheaper node for the same state
+            if self.nodes.get(node.state) is node:
+                del self.nodes[node.state]
+                del self.costs[node.state]
+                return node
@@ -0,0 +1,95 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cache import PathCache
+from grid import GridEnvironment
+from solver import Solver
+
+
+class PathCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.environment = GridEnvironment(10, 10)
+        self.environment.source, self.environment.target = 0, self.environment.size - 1
+        self.solver = Solver(self.environment)
+
+    def test_hit_while_unchanged(self):
+        cache = PathCache()
+
+        path = cache.search_path(self.solver, Solver.BFS)
+        again = cache.search_path(self.solver, Solver.BFS)
+
+        self.assertEqual(again, path)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+        # Changing the returned path does not change the cached one
+        again.clear()
+        self.assertEqual(cache.search_path(self.solver, Solver.BFS), path)
+
+    def test_miss_after_walls_change(self):
+        cache = PathCache()
+        path = cache.search_path(self.solver, Solver.BFS)
+
+        # Wall on the first step of the cached path
+        self.environment.set_wall(path[0][0])
+        new_path = cache.search_path(self.solver, Solver.BFS)
+
+        self.assertEqual(cache.misses, 2)
+        self.assertNotIn(path[0][0], [state for state, _ in new_path])
+        self.assertEqual(new_path, Solver(self.environment).search_path(Solver.BFS))
+
+    def test_keyed_by_source_target_and_algorithm(self):
+        cache = PathCache()
+        cache.search_path(self.solver, Solver.BFS)
+        cache.search_path(self.solver, Solver.A_STAR)
+
+        self.environment.target = 5
+        cache.search_path(self.solver, Solver.BFS)
+
+        self.assertEqual((cache.hits, cache.misses, len(cache)), (0, 3, 3))
+
+    def test_no_path_cached(self):
+        cache = PathCache()
+        for cell in ((0, 1), (1, 0)):
+            self.environment.set_wall(self.environment.encode(cell))
+
+        self.assertIsNone(cache.search_path(self.solver, Solver.BFS))
+        self.assertIsNone(cache.search_path(self.solver, Solver.BFS))
+        self.assertEqual(cache.hits, 1)
+
+    def test_least_recently_used_evicted(self):
+        cache = PathCache(maxsize=2)
+
+        for target in (5, 6, 5, 7):
+            self.environment.target = target
+            cache.search_path(self.solver, Solver.BFS)
+
+        # 6 was the least recently used when 7 was added
+        self.assertEqual(cache.evictions, 1)
+        self.assertEqual({key[2] for key in cache.paths}, {5, 7})
+
+        cache.resize(1)
+        self.assertEqual([key[2] for key in cache.paths], [7])
+        self.assertRaises(ValueError, cache.resize, 0)
+        self.assertRaises(ValueError, PathCache, 0)
+
+    def test_invalidate(self):
+        cache = PathCache()
+        cache.search_path(self.solver, Solver.BFS)
+        fingerprint = self.environment.fingerprint
+
+        self.environment.set_wall(1)
+        cache.search_path(self.solver, Solver.BFS)
+
+        cache.invalidate(fingerprint)
+        self.assertEqual([key[0] for key in cache.paths], [self.environment.fingerprint])
+
+        cache.invalidate()
+        self.assertEqual(len(cache), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import os
+import sys
+import unittest
+
+from collections import deque
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from connectivity import ConnectivityIndex, label_components
+from grid import Grid, GridEnvironment
+from solver import Solver
+
+
+def flood_fill(walls):
+    """Component of every cell found with a breadth-first search from each unlabelled free cell, -1 for walls."""
+    rows, cols = walls.shape
+    labels = np.full((rows, cols), -1)
+    count = 0
+
+    for start in zip(*np.nonzero(walls == 0)):
+        if labels[start] != -1:
+            continue
+
+        labels[start] = count
+        queue = deque([start])
+
+        while queue:
+            i, j = queue.popleft()
+            for cell in ((i - 1, j), (i + 1, j), (i, j - 1), (i, j + 1)):
+                if 0 <= cell[0] < rows and 0 <= cell[1] < cols and not walls[cell] and labels[cell] == -1:
+                    labels[cell] = count
+                    queue.append(cell)
+
+        count += 1
+
+    return labels.reshape(-1), count
+
+
+class ConnectivityIndexTest(unittest.TestCase):
+
+    def assertSameComponents(self, index, walls):
+        expected, count = flood_fill(walls)
+        components = [index.component(state) for state in range(walls.size)]
+
+        self.assertEqual(index.count(), count)
+
+        # Two cells share a component in the index if and only if they share one in the reference
+        pairs = {}
+        for component, label in zip(components, expected.tolist()):
+            self.assertEqual(component is None, label == -1)
+            if component is not None:
+                self.assertEqual(pairs.setdefault(component, label), label)
+
+        self.assertEqual(len(pairs), count)
+
+    def test_label_components(self):
+        rng = np.random.default_rng(9)
+
+        for trial in range(10):
+            walls = rng.random((17, 23)) < 0.4
+            labels, count = label_components(walls)
+            expected, expected_count = flood_fill(walls)
+
+            with self.subTest(trial=trial):
+                self.assertEqual(count, expected_count)
+                free = expected != -1
+                self.assertTrue((labels[~free] == -1).all())
+                self.assertEqual(set(labels[free].tolist()), set(range(count)))
+
+                # Same partition of the free cells
+                pairs = set(zip(labels[free].tolist(), expected[free].tolist()))
+                self.assertEqual(len(pairs), count)
+
+    def test_wall_changes(self):
+        rng = np.random.default_rng(10)
+
+        walls = (rng.random((20, 20)) < 0.35).astype(np.uint8)
+        environment = GridEnvironment(20, 20, walls)
+        index = ConnectivityIndex(environment)
+
+        for step in range(40):
+            for state in rng.integers(0, environment.size, 4).tolist():
+                environment.set_wall(state, not environment.is_wall(state))
+
+            with self.subTest(step=step):
+                self.assertSameComponents(index, environment.walls)
+
+    def test_grid(self):
+        grid = Grid(5, 5)
+        index = ConnectivityIndex(grid)
+        self.assertTrue(index.is_reachable((0, 0), (4, 4)))
+
+        # Wall column cutting the grid in two
+        grid.walls = {(i, 2) for i in range(5)}
+        self.assertFalse(index.is_reachable((0, 0), (4, 4)))
+        self.assertTrue(index.is_reachable((0, 0), (4, 1)))
+        self.assertFalse(index.is_reachable((0, 0), (0, 2)))
+        self.assertEqual(index.count(), 2)
+
+        grid.walls.discard((3, 2))
+        self.assertTrue(index.is_reachable((0, 0), (4, 4)))
+        self.assertEqual(index.count(), 1)
+
+    def test_solver_answers_without_searching(self):
+        environment = GridEnvironment(30, 30)
+        for i in range(30):
+            environment.set_wall(environment.encode((i, 15)))
+        environment.source, environment.target = 0, environment.size - 1
+
+        environment.connectivity = ConnectivityIndex(environment)
+
+        for algorithm in (Solver.BFS, Solver.A_STAR, Solver.DIJKSTRA):
+            with self.subTest(algorithm=algorithm):
+                self.assertIsNone(Solver(environment).search_path(algorithm))
+                self.assertEqual(len(environment.explored), 0)
+
+        environment.set_wall(environment.encode((7, 15)), False)
+        self.assertEqual(len(Solver(environment).search_path(Solver.BFS)), 58)
+
+
+if __name__ == '__main__':
+    unittest.main()
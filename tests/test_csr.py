@@ -0,0 +1,74 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from csr import CompiledGraph, clear_cache, compile_graph
+from solver import Environment
+
+
+class Lines(Environment):
+    """Two lines of states, 0 to 4 and 5 to 9, not connected to each other."""
+    fingerprint = 'lines'
+
+    def __init__(self, source, target):
+        self.source = source
+        self.target = target
+
+    def get_actions(self, state):
+        return [action for action in ('left', 'right') if self.transition_model(state, action) is not None]
+
+    def transition_model(self, state, action):
+        new_state = state - 1 if action == 'left' else state + 1
+        return new_state if 0 <= new_state <= 9 and new_state // 5 == state // 5 else None
+
+
+class CompileGraphTest(unittest.TestCase):
+
+    def setUp(self):
+        clear_cache()
+
+    def test_cached_by_source(self):
+        self.assertEqual(len(compile_graph(Lines(0, 4)).search_path(0, 4)), 4)
+        self.assertEqual(len(compile_graph(Lines(5, 9)).search_path(5, 9)), 4)
+
+    def test_file_without_source(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'lines.npz')
+            compile_graph(Lines(0, 4), path)
+            clear_cache()
+
+            self.assertEqual(len(compile_graph(Lines(6, 9), path).search_path(6, 9)), 3)
+
+    def test_fingerprint_kept_in_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'lines.npz')
+
+            for fingerprint in (42, '42', (3, 'walls'), None):
+                with self.subTest(fingerprint=fingerprint):
+                    graph = CompiledGraph.compile(Lines(0, 4))
+                    graph.fingerprint = fingerprint
+                    graph.save(path)
+
+                    self.assertEqual(CompiledGraph.load(path).fingerprint, fingerprint)
+                    self.assertIs(type(CompiledGraph.load(path).fingerprint), type(fingerprint))
+
+    def test_file_reused(self):
+        environment = Lines(0, 4)
+        environment.fingerprint = ('lines', 1)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'lines.npz')
+            compile_graph(environment, path)
+            clear_cache()
+
+            os.utime(path, (0, 0))
+            compile_graph(environment, path)
+
+            self.assertEqual(os.path.getmtime(path), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
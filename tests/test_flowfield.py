@@ -0,0 +1,118 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flowfield import FlowField
+from grid import Grid, GridEnvironment
+from solver import Solver
+
+
+def random_environment(rng, rows = 15, cols = 20, weighted = True):
+    walls = (rng.random((rows, cols)) < 0.25).astype(np.uint8)
+    costs = rng.integers(1, 8, (rows, cols)) if weighted else None
+
+    environment = GridEnvironment(rows, cols, walls, costs)
+    environment.target = environment.encode((rows // 2, cols // 2))
+    environment.set_wall(environment.target, False)
+
+    return environment
+
+
+class FlowFieldTest(unittest.TestCase):
+
+    def test_cheapest_paths(self):
+        rng = np.random.default_rng(11)
+
+        for trial in range(6):
+            environment = random_environment(rng, weighted=trial % 2 == 1)
+            field = FlowField(environment)
+            costs = environment.costs.reshape(-1)
+
+            for source in rng.integers(0, environment.size, 15).tolist():
+                if environment.is_wall(source):
+                    continue
+
+                environment.source = source
+                cheapest = Solver(environment).search_path(Solver.DIJKSTRA)
+
+                with self.subTest(trial=trial, source=source):
+                    path = field.path_from(source)
+
+                    if cheapest is None:
+                        self.assertIsNone(path)
+                        self.assertIsNone(field.distance(source))
+                        continue
+
+                    cost = sum(int(costs[state]) for state, _ in path)
+                    self.assertEqual(cost, sum(int(costs[state]) for state, _ in cheapest))
+                    self.assertEqual(field.distance(source), cost)
+
+                    # Every step is a valid move ending at the target
+                    state = source
+                    for new_state, action in path:
+                        self.assertIn(action, environment.get_actions(state))
+                        state = environment.transition_model(state, action)
+                        self.assertEqual(state, new_state)
+                    self.assertEqual(state, environment.target)
+
+    def test_step(self):
+        environment = random_environment(np.random.default_rng(12), weighted=False)
+        field = FlowField(environment)
+
+        agents = np.flatnonzero(environment.walls.reshape(-1) == 0)
+        field.refresh()
+        distances = field.distances.reshape(-1)
+
+        moved = field.step(agents)
+
+        # Agents that can reach the target get one step closer, the others stay
+        reachable = distances[agents] > 0
+        np.testing.assert_array_equal(distances[moved[reachable]], distances[agents[reachable]] - 1)
+        np.testing.assert_array_equal(moved[~reachable], agents[~reachable])
+
+        for _ in range(environment.size):
+            agents = field.step(agents)
+        self.assertTrue((distances[agents] <= 0).all())
+
+    def test_rebuilt_when_walls_change(self):
+        environment = GridEnvironment(5, 5)
+        environment.target = environment.encode((4, 4))
+        field = FlowField(environment)
+
+        self.assertEqual(field.distance(0), 8)
+
+        for i in range(5):
+            environment.set_wall(environment.encode((i, 2)))
+        self.assertIsNone(field.distance(0))
+        self.assertIsNone(field.path_from(0))
+        self.assertIsNone(field.next_move(0))
+
+        environment.set_wall(environment.encode((0, 2)), False)
+        self.assertEqual(field.distance(0), 8)
+        self.assertEqual(field.next_move(0), 'right')
+
+    def test_grid(self):
+        grid = Grid(4, 4)
+        grid.walls = {(1, 1), (1, 2), (1, 3)}
+        grid.target = (2, 3)
+
+        field = FlowField(grid)
+        path = field.path_from((0, 3))
+
+        self.assertEqual(field.distance((0, 3)), 8)
+        self.assertEqual(path[-1], ((2, 3), 'right'))
+        self.assertIsNone(field.next_move((2, 3)))
+
+        # A fixed target is used instead of the one of the grid
+        self.assertEqual(FlowField(grid, (0, 0)).distance((0, 3)), 3)
+
+    def test_no_target(self):
+        self.assertRaises(ValueError, FlowField(GridEnvironment(3, 3)).refresh)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from grid import Bitmap, Grid, GridEnvironment
+from solver import Solver
+
+
+class BitmapTest(unittest.TestCase):
+
+    def test_set_operations(self):
+        rng = np.random.default_rng(0)
+        bitmap, states = Bitmap(1003), set()
+
+        for state in rng.integers(0, 1003, 3000).tolist():
+            if state % 3:
+                bitmap.add(state)
+                states.add(state)
+            else:
+                bitmap.discard(state)
+                states.discard(state)
+
+            self.assertEqual(state in bitmap, state in states)
+
+        self.assertEqual(sorted(bitmap), sorted(states))
+        self.assertEqual(len(bitmap), len(states))
+        self.assertEqual(bitmap.mask().sum(), len(states))
+
+    def test_one_bit_per_state(self):
+        self.assertEqual(Bitmap(1000).bits.nbytes, 125)
+        self.assertEqual(Bitmap(1001).bits.nbytes, 126)
+
+
+class GridEnvironmentTest(unittest.TestCase):
+
+    def test_same_paths_as_grid(self):
+        rng = np.random.default_rng(1)
+        walls = (rng.random((20, 30)) < 0.2).astype(np.uint8)
+        walls[0, 0] = walls[-1, -1] = 0
+
+        environment = GridEnvironment(20, 30, walls)
+        environment.source, environment.target = 0, environment.size - 1
+
+        grid = Grid(20, 30)
+        grid.load(environment)
+
+        for algorithm in (Solver.BFS, Solver.A_STAR, Solver.DIJKSTRA):
+            with self.subTest(algorithm=algorithm):
+                path = Solver(environment).search_path(algorithm)
+                expected = Solver(grid).search_path(algorithm)
+
+                self.assertIsNotNone(path)
+
+                self.assertEqual(environment.decode_path(path), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from grid import GridEnvironment
+from hpa import HierarchicalPlanner
+from solver import Solver
+
+
+class HierarchicalPlannerTest(unittest.TestCase):
+
+    def setUp(self):
+        walls = (np.random.default_rng(0).random((40, 40)) < 0.2).astype(np.uint8)
+        walls[0, 0] = walls[-1, -1] = 0
+
+        self.environment = GridEnvironment(40, 40, walls)
+        self.environment.source, self.environment.target = 0, self.environment.size - 1
+
+    def test_path_close_to_shortest(self):
+        shortest = Solver(self.environment).search_path(Solver.BFS)
+        path = HierarchicalPlanner(self.environment, cluster_size=8).search_path()
+
+        self.assertIsNotNone(shortest)
+        self.assertEqual(path[-1][0], self.environment.target)
+        self.assertLessEqual(len(path), len(shortest) * 1.2)
+
+        state = self.environment.source
+        for new_state, action in path:
+            state = self.environment.transition_model(state, action)
+            self.assertEqual(state, new_state)
+
+    def test_weighted_grid(self):
+        planner = HierarchicalPlanner(self.environment, cluster_size=8)
+        self.environment.set_cost(1, 5)
+
+        with self.assertRaises(ValueError):
+            planner.search_path()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from grid import Grid, GridEnvironment
+from incremental import DStarLite
+from solver import Solver
+
+
+class DStarLiteTest(unittest.TestCase):
+
+    def assertShortest(self, path, environment):
+        shortest = Solver(environment).search_path(Solver.BFS)
+
+        self.assertEqual(path is None, shortest is None)
+        if path is not None:
+            self.assertEqual(len(path), len(shortest))
+            self.assertEqual(path[-1][0], environment.target)
+
+    def test_replanning_after_wall_changes(self):
+        rng = np.random.default_rng(6)
+
+        walls = (rng.random((25, 25)) < 0.2).astype(np.uint8)
+        environment = GridEnvironment(25, 25, walls)
+        environment.source, environment.target = 0, environment.size - 1
+        environment.set_wall(environment.source, False)
+        environment.set_wall(environment.target, False)
+
+        planner = DStarLite(environment)
+        self.assertShortest(planner.plan(), environment)
+
+        for step in range(30):
+            for state in rng.integers(1, environment.size - 1, 5).tolist():
+                environment.set_wall(state, not environment.is_wall(state))
+
+            with self.subTest(step=step):
+                self.assertShortest(planner.plan(), environment)
+
+    def test_grid_walls(self):
+        grid = Grid(10, 10)
+        grid.source, grid.target = (0, 0), (9, 9)
+
+        planner = DStarLite(grid)
+        self.assertShortest(planner.plan(), grid)
+
+        grid.walls = {(i, 5) for i in range(9)}
+        self.assertShortest(planner.plan(), grid)
+
+        # Cutting the grid in two leaves no path
+        grid.walls.add((9, 5))
+        self.assertIsNone(planner.plan())
+
+        grid.walls.discard((4, 5))
+        self.assertShortest(planner.plan(), grid)
+
+    def test_moving_source(self):
+        environment = GridEnvironment(20, 20)
+        environment.source, environment.target = 0, environment.size - 1
+
+        planner = DStarLite(environment)
+        path = planner.plan()
+
+        # Follow the path while walls appear ahead
+        for state, _ in path[:10]:
+            environment.source = state
+            environment.set_wall(environment.encode((15, 15)))
+
+            with self.subTest(source=state):
+                self.assertShortest(planner.plan(), environment)
+
+    def test_repair_is_local(self):
+        environment = GridEnvironment(40, 40)
+        environment.source, environment.target = 0, environment.size - 1
+
+        planner = DStarLite(environment)
+        planner.plan()
+        first = planner.expanded
+
+        environment.set_wall(environment.encode((39, 20)))
+        self.assertShortest(planner.plan(), environment)
+        self.assertLess(planner.expanded, first)
+
+    def test_weighted_grid(self):
+        environment = GridEnvironment(5, 5, costs=np.full((5, 5), 2))
+        environment.source, environment.target = 0, environment.size - 1
+
+        self.assertRaises(ValueError, DStarLite(environment).plan)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from grid import Grid, GridEnvironment
+from landmarks import LandmarkIndex
+from solver import Solver
+
+
+class LandmarkIndexTest(unittest.TestCase):
+
+    def test_rebuilt_when_walls_change(self):
+        # Wall column with a gap at the bottom, removed after the index is built
+        walls = [(i, 5) for i in range(9)]
+
+        for environment in (Grid(10, 10), GridEnvironment(10, 10)):
+            with self.subTest(environment=type(environment).__name__):
+                if isinstance(environment, Grid):
+                    environment.walls = walls
+                    environment.source, environment.target = (0, 0), (0, 9)
+                    remove = lambda cell: environment.walls.discard(cell)
+                else:
+                    for cell in walls:
+                        environment.set_wall(environment.encode(cell))
+                    environment.source, environment.target = 0, 9
+                    remove = lambda cell: environment.set_wall(environment.encode(cell), False)
+
+                environment.heuristic = LandmarkIndex.build(environment)
+                self.assertEqual(len(Solver(environment).search_path(Solver.A_STAR)), 27)
+
+                for cell in walls:
+                    remove(cell)
+
+                self.assertEqual(len(Solver(environment).search_path(Solver.A_STAR)), 9)
+
+    def test_refreshed_once_per_search(self):
+        environment = GridEnvironment(10, 10)
+        environment.source, environment.target = 0, 99
+        environment.heuristic = index = LandmarkIndex.build(environment)
+
+        calls = []
+        refresh = index.refresh
+        index.refresh = lambda environment: calls.append(refresh(environment))
+
+        for algorithm in (Solver.A_STAR, Solver.BIDIRECTIONAL_A_STAR, Solver.IDA_STAR):
+            Solver(environment).search_path(algorithm)
+
+        self.assertEqual(len(calls), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,169 @@
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from grid import Grid, GridEnvironment
+from mapio import iter_scenarios, load_map, open_map, read_movingai_map, save_map
+
+MOVINGAI_MAP = """type octile
+height 3
+width 5
+map
+..@..
+.T.W.
+G.S..
+"""
+
+MOVINGAI_SCENARIOS = """version 1
+0\tsmall.map\t5\t3\t0\t0\t4\t2\t6.41421356
+1\tsmall.map\t5\t3\t4\t0\t0\t2\t4.82842712
+"""
+
+
+class BinaryMapTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'grid.bin')
+
+        rng = np.random.default_rng(8)
+        self.walls = (rng.random((13, 17)) < 0.3).astype(np.uint8)
+        self.costs = rng.integers(1, 300, (13, 17))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def assertSameMap(self, loaded, environment):
+        self.assertEqual((loaded.rows, loaded.cols), (environment.rows, environment.cols))
+        np.testing.assert_array_equal(loaded.walls, environment.walls)
+        np.testing.assert_array_equal(loaded.costs, environment.costs)
+        self.assertEqual((loaded.source, loaded.target), (environment.source, environment.target))
+        self.assertEqual(loaded.fingerprint, environment.fingerprint)
+
+    def test_round_trip(self):
+        for packed in (True, False):
+            for costs in (None, self.costs):
+                with self.subTest(packed=packed, costs=costs is not None):
+                    environment = GridEnvironment(13, 17, self.walls, costs)
+                    environment.source, environment.target = 3, environment.size - 2
+
+                    save_map(environment, self.path, packed)
+                    self.assertSameMap(load_map(self.path), environment)
+
+    def test_no_source_nor_target(self):
+        environment = GridEnvironment(13, 17, self.walls)
+        save_map(environment, self.path)
+
+        loaded = load_map(self.path)
+        self.assertIsNone(loaded.source)
+        self.assertIsNone(loaded.target)
+
+    def test_grid_saved(self):
+        grid = Grid(4, 6)
+        grid.walls = {(1, 2), (3, 5)}
+        grid.costs = {(0, 4): 7}
+        grid.source, grid.target = (0, 0), (2, 3)
+
+        save_map(grid, self.path)
+        loaded = load_map(self.path)
+
+        self.assertEqual(loaded.decode(loaded.source), (0, 0))
+        self.assertEqual(loaded.decode(loaded.target), (2, 3))
+        self.assertEqual(loaded.walls.sum(), 2)
+        self.assertTrue(loaded.is_wall(loaded.encode((1, 2))))
+        self.assertEqual(loaded.costs[0, 4], 7)
+
+    def test_changes_written_with_r_plus(self):
+        save_map(GridEnvironment(13, 17, self.walls, self.costs), self.path, packed=False)
+
+        loaded = load_map(self.path, mode='r+')
+        loaded.set_wall(0, not loaded.is_wall(0))
+        loaded.set_cost(1, 42)
+        del loaded
+
+        loaded = load_map(self.path)
+        self.assertEqual(loaded.is_wall(0), not self.walls[0, 0])
+        self.assertEqual(loaded.costs[0, 1], 42)
+
+        # With copy on write the file is left as it was
+        copy = load_map(self.path)
+        copy.set_cost(1, 5)
+        self.assertEqual(load_map(self.path).costs[0, 1], 42)
+
+    def test_not_a_map(self):
+        with open(self.path, 'wb') as file:
+            file.write(b'not a map file, just some bytes here')
+
+        self.assertRaises(ValueError, load_map, self.path)
+
+
+class MovingAITest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.map = os.path.join(self.directory.name, 'small.map')
+        self.scenarios = os.path.join(self.directory.name, 'small.map.scen')
+
+        with open(self.map, 'w') as file:
+            file.write(MOVINGAI_MAP)
+        with open(self.scenarios, 'w') as file:
+            file.write(MOVINGAI_SCENARIOS)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_read_map(self):
+        environment = read_movingai_map(self.map)
+
+        self.assertEqual((environment.rows, environment.cols), (3, 5))
+        np.testing.assert_array_equal(environment.walls, [
+            [0, 0, 1, 0, 0],
+            [0, 1, 0, 1, 0],
+            [0, 0, 0, 0, 0],
+        ])
+
+        np.testing.assert_array_equal(open_map(self.map).walls, environment.walls)
+
+    def test_scenarios(self):
+        scenarios = list(iter_scenarios(self.scenarios))
+
+        self.assertEqual(len(scenarios), 2)
+        self.assertEqual(scenarios[0].map, 'small.map')
+        self.assertEqual((scenarios[0].rows, scenarios[0].cols), (3, 5))
+        self.assertEqual((scenarios[0].source, scenarios[0].target), ((0, 0), (2, 4)))
+        self.assertAlmostEqual(scenarios[1].optimal, 4.82842712)
+
+        environment = read_movingai_map(self.map)
+        scenarios[1].apply(environment)
+        self.assertEqual(environment.decode(environment.source), (0, 4))
+        self.assertEqual(environment.decode(environment.target), (2, 0))
+
+        grid = Grid(3, 5)
+        scenarios[0].apply(grid)
+        self.assertEqual((grid.source, grid.target), ((0, 0), (2, 4)))
+
+    def test_scenario_saved_and_loaded(self):
+        environment = read_movingai_map(self.map)
+        next(iter_scenarios(self.scenarios)).apply(environment)
+
+        path = os.path.join(self.directory.name, 'small.bin')
+        save_map(environment, path)
+        loaded = open_map(path)
+
+        np.testing.assert_array_equal(loaded.walls, environment.walls)
+        self.assertEqual((loaded.source, loaded.target), (environment.source, environment.target))
+
+    def test_wrong_size(self):
+        with open(self.map, 'w') as file:
+            file.write(MOVINGAI_MAP.replace('height 3', 'height 4'))
+
+        self.assertRaises(ValueError, read_movingai_map, self.map)
+
+
+if __name__ == '__main__':
+    unittest.main()
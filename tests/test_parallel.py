@@ -0,0 +1,67 @@
+import gc
+import os
+import sys
+import unittest
+
+from multiprocessing import shared_memory
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from grid import GridEnvironment
+from parallel import ParallelBFS
+from solver import Solver
+
+
+class ParallelBFSTest(unittest.TestCase):
+
+    def test_shortest_paths(self):
+        rng = np.random.default_rng(1)
+
+        # A single cell per worker, so every level wider than one cell is split
+        with ParallelBFS(GridEnvironment(30, 30), processes=3, min_cells=1) as search:
+            for trial in range(10):
+                walls = (rng.random((30, 30)) < 0.25).astype(np.uint8)
+                environment = search.environment = GridEnvironment(30, 30, walls)
+                environment.source, environment.target = 0, environment.size - 1
+                environment.set_wall(environment.source, False)
+                environment.set_wall(environment.target, False)
+
+                with self.subTest(trial=trial):
+                    shortest = Solver(environment).search_path(Solver.BFS)
+                    path = search.search_path()
+
+                    if shortest is None:
+                        self.assertIsNone(path)
+                        continue
+
+                    self.assertEqual(len(path), len(shortest))
+
+                    state = environment.source
+                    for new_state, action in path:
+                        state = environment.transition_model(state, action)
+                        self.assertEqual(state, new_state)
+
+    def test_released_when_dropped(self):
+        environment = GridEnvironment(20, 20)
+        environment.source, environment.target = 0, environment.size - 1
+
+        search = ParallelBFS(environment, processes=2, min_cells=1)
+        search.search_path()
+
+        names = [buffer.name for buffer in search._buffers]
+        workers = list(search._workers)
+
+        del search
+        gc.collect()
+
+        self.assertFalse(any(worker.is_alive() for worker in workers))
+
+        for name in names:
+            with self.assertRaises(FileNotFoundError):
+                shared_memory.SharedMemory(name=name)
+
+
+if __name__ == '__main__':
+    unittest.main()
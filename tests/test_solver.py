@@ -0,0 +1,312 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from grid import Grid, GridEnvironment
+from solver import BucketFrontier, GreedyFrontier, Node, NodeStore, QueueFrontier, SearchStats, Solver, StackFrontier
+
+
+class MemoryBoundedSearchTest(unittest.TestCase):
+
+    def setUp(self):
+        # Free 3x3 region on the left, cut off from the target by a wall column
+        self.grid = Grid(3, 5)
+        self.grid.walls = {(0, 3), (1, 3), (2, 3)}
+        self.grid.source = (0, 0)
+        self.grid.target = (0, 4)
+
+    def test_unreachable_target(self):
+        for algorithm in (Solver.IDA_STAR, Solver.SMA_STAR):
+            for budget in (50, 1000, 100000):
+                with self.subTest(algorithm=algorithm, budget=budget):
+                    solver = Solver(self.grid, node_budget=budget)
+                    self.assertIsNone(solver.search_path(algorithm))
+
+    def test_unreachable_target_in_open_region(self):
+        # Large open region cut off from the target by a wall column
+        environment = GridEnvironment(30, 30)
+        for i in range(30):
+            environment.set_wall(environment.encode((i, 28)))
+        environment.source, environment.target = 0, environment.size - 1
+
+        for stats in (None, SearchStats()):
+            with self.subTest(stats=stats):
+                self.assertIsNone(Solver(environment).search_path(Solver.IDA_STAR, stats=stats))
+
+    def test_reachable_target(self):
+        self.grid.walls = {(1, 3), (2, 3)}
+
+        for algorithm in (Solver.IDA_STAR, Solver.SMA_STAR):
+            with self.subTest(algorithm=algorithm):
+                path = Solver(self.grid, node_budget=50).search_path(algorithm)
+                self.assertEqual(len(path), 4)
+                self.assertEqual(path[-1][0], self.grid.target)
+
+
+class BidirectionalSearchTest(unittest.TestCase):
+
+    def test_cheapest_paths(self):
+        rng = np.random.default_rng(5)
+
+        for trial in range(40):
+            walls = (rng.random((15, 15)) < 0.25).astype(np.uint8)
+            costs = rng.integers(1, 6, (15, 15)) if trial % 2 else None
+
+            environment = GridEnvironment(15, 15, walls, costs)
+            environment.source, environment.target = 0, environment.size - 1
+            environment.set_wall(environment.source, False)
+            environment.set_wall(environment.target, False)
+
+            with self.subTest(trial=trial):
+                cheapest = Solver(environment).search_path(Solver.DIJKSTRA)
+                path = Solver(environment).search_path(Solver.BIDIRECTIONAL_A_STAR)
+
+                if cheapest is None:
+                    self.assertIsNone(path)
+                    continue
+
+                cost = lambda steps: sum(int(environment.costs.reshape(-1)[state]) for state, _ in steps)
+                self.assertEqual(cost(path), cost(cheapest))
+                self.assertEqual(path[-1][0], environment.target)
+
+    def test_open_grid(self):
+        environment = GridEnvironment(50, 50)
+        environment.source, environment.target = 0, environment.size - 1
+
+        solver = Solver(environment)
+        path = solver.search_path(Solver.BIDIRECTIONAL_A_STAR)
+
+        self.assertEqual(len(path), 98)
+        self.assertLess(len(environment.explored), 4 * len(path))
+
+
+
+class GreedyFrontierTest(unittest.TestCase):
+
+    def test_lowest_cost_first(self):
+        frontier = GreedyFrontier(lambda node: node.cost_from_source)
+        root = Node('root', None, None)
+
+        for state, cost in (('a', 5), ('b', 2), ('c', 7), ('d', 2), ('e', 1)):
+            frontier.add(Node(state, root, None, cost))
+
+        # Ties are broken by insertion order
+        order = [frontier.remove().state for _ in range(5)]
+        self.assertEqual(order, ['e', 'b', 'd', 'a', 'c'])
+        self.assertTrue(frontier.empty())
+        self.assertRaises(Exception, frontier.remove)
+
+    def test_cheapest_node_kept(self):
+        frontier = GreedyFrontier(lambda node: node.cost_from_source)
+        root = Node('root', None, None)
+
+        frontier.add(Node('a', root, 'first', 5))
+        frontier.add(Node('b', root, None, 3))
+        frontier.add(Node('a', root, 'second', 1))
+        frontier.add(Node('a', root, 'third', 4))
+
+        node = frontier.remove()
+        self.assertEqual((node.state, node.action), ('a', 'second'))
+        self.assertFalse(frontier.contains_state('a'))
+
+        # The replaced entry of 'a' is skipped
+        self.assertEqual(frontier.remove().state, 'b')
+        self.assertTrue(frontier.empty())
+
+    def test_a_star_shortest_paths(self):
+        rng = np.random.default_rng(2)
+
+        for trial in range(20):
+            walls = (rng.random((20, 20)) < 0.25).astype(np.uint8)
+            environment = GridEnvironment(20, 20, walls)
+            environment.source, environment.target = 0, environment.size - 1
+            environment.set_wall(environment.source, False)
+            environment.set_wall(environment.target, False)
+
+            with self.subTest(trial=trial):
+                shortest = Solver(environment).search_path(Solver.BFS)
+                path = Solver(environment).search_path(Solver.A_STAR)
+
+                self.assertEqual(path is None, shortest is None)
+                if path is not None:
+                    self.assertEqual(len(path), len(shortest))
+
+
+
+class StackQueueFrontierTest(unittest.TestCase):
+
+    def fill(self, frontier):
+        for state in range(5):
+            frontier.add(Node(state, None, None))
+        return frontier
+
+    def test_stack_order(self):
+        frontier = self.fill(StackFrontier())
+        self.assertEqual([frontier.remove().state for _ in range(5)], [4, 3, 2, 1, 0])
+        self.assertRaises(Exception, frontier.remove)
+
+    def test_queue_order(self):
+        frontier = self.fill(QueueFrontier())
+        self.assertEqual([frontier.remove().state for _ in range(5)], [0, 1, 2, 3, 4])
+        self.assertRaises(Exception, frontier.remove)
+
+    def test_contains_state(self):
+        for frontier in (StackFrontier(), QueueFrontier()):
+            with self.subTest(frontier=type(frontier).__name__):
+                self.fill(frontier)
+                self.assertTrue(frontier.contains_state(0))
+                self.assertTrue(frontier.contains_state(4))
+
+                removed = frontier.remove().state
+                self.assertFalse(frontier.contains_state(removed))
+                self.assertFalse(frontier.contains_state(5))
+                self.assertFalse(frontier.empty())
+
+    def test_bfs_shortest_paths(self):
+        rng = np.random.default_rng(3)
+
+        for trial in range(20):
+            walls = (rng.random((15, 15)) < 0.25).astype(np.uint8)
+            environment = GridEnvironment(15, 15, walls)
+            environment.source, environment.target = 0, environment.size - 1
+            environment.set_wall(environment.source, False)
+            environment.set_wall(environment.target, False)
+
+            with self.subTest(trial=trial):
+                shortest = Solver(environment).search_path(Solver.DIJKSTRA)
+                path = Solver(environment).search_path(Solver.BFS)
+                found = Solver(environment).search_path(Solver.DFS)
+
+                self.assertEqual(path is None, shortest is None)
+                self.assertEqual(found is None, shortest is None)
+
+                if path is not None:
+                    self.assertEqual(len(path), len(shortest))
+                    self.assertEqual(found[-1][0], environment.target)
+
+
+
+class CompactSearchTest(unittest.TestCase):
+
+    def test_node_store_path(self):
+        store = NodeStore(5)
+        for state, parent, code in ((1, 0, 2), (3, 1, 0), (4, 3, 1)):
+            store.parents[state] = parent
+            store.actions[state] = code
+
+        self.assertEqual(store.path(4), [(1, 2), (3, 0), (4, 1)])
+        self.assertEqual(store.path(0), [])
+
+    def test_same_paths_as_nodes(self):
+        rng = np.random.default_rng(4)
+
+        for trial in range(10):
+            walls = (rng.random((20, 25)) < 0.25).astype(np.uint8)
+            environment = GridEnvironment(20, 25, walls)
+            environment.source, environment.target = 0, environment.size - 1
+            environment.set_wall(environment.source, False)
+            environment.set_wall(environment.target, False)
+
+            for algorithm in (Solver.DFS, Solver.BFS, Solver.GREEDY_BFS, Solver.A_STAR):
+                with self.subTest(trial=trial, algorithm=algorithm):
+                    expected = Solver(environment).search_path(algorithm)
+                    path = Solver(environment, compact=True).search_path(algorithm)
+
+                    self.assertEqual(path is None, expected is None)
+                    if path is None:
+                        continue
+
+                    # Every step is a valid move and the last one reaches the target
+                    state = environment.source
+                    for new_state, action in path:
+                        self.assertIn(action, environment.get_actions(state))
+                        state = environment.transition_model(state, action)
+                        self.assertEqual(state, new_state)
+                    self.assertEqual(state, environment.target)
+
+                    if algorithm in (Solver.BFS, Solver.A_STAR):
+                        self.assertEqual(len(path), len(expected))
+
+
+
+def cheapest_costs(environment):
+    """Cost of the cheapest path from the source to every cell, relaxing the whole grid until it settles."""
+    costs = np.where(environment.walls.astype(bool), np.inf, environment.costs.astype(float))
+    distances = np.full(costs.shape, np.inf)
+    distances[environment.decode(environment.source)] = 0
+
+    while True:
+        reached = np.full(costs.shape, np.inf)
+        reached[1:, :] = np.minimum(reached[1:, :], distances[:-1, :])
+        reached[:-1, :] = np.minimum(reached[:-1, :], distances[1:, :])
+        reached[:, 1:] = np.minimum(reached[:, 1:], distances[:, :-1])
+        reached[:, :-1] = np.minimum(reached[:, :-1], distances[:, 1:])
+
+        updated = np.minimum(distances, reached + costs)
+        if np.array_equal(updated, distances):
+            return distances
+        distances = updated
+
+
+class WeightedSearchTest(unittest.TestCase):
+
+    def test_bucket_frontier_order(self):
+        frontier = BucketFrontier(lambda node: node.cost_from_source)
+        root = Node('root', None, None)
+
+        for state, cost in (('a', 4), ('b', 1), ('c', 9), ('a', 2), ('d', 1)):
+            frontier.add(Node(state, root, None, cost))
+
+        costs = []
+        while not frontier.empty():
+            node = frontier.remove()
+            costs.append((node.state, node.cost_from_source))
+
+        self.assertEqual(sorted(costs[:2]), [('b', 1), ('d', 1)])
+        self.assertEqual(costs[2:], [('a', 2), ('c', 9)])
+
+    def test_cheapest_paths(self):
+        rng = np.random.default_rng(7)
+
+        for trial in range(20):
+            walls = (rng.random((15, 20)) < 0.2).astype(np.uint8)
+            costs = rng.integers(1, 10, (15, 20))
+
+            environment = GridEnvironment(15, 20, walls, costs)
+            environment.source, environment.target = 0, environment.size - 1
+            environment.set_wall(environment.source, False)
+            environment.set_wall(environment.target, False)
+
+            grid = Grid(15, 20)
+            grid.load(environment)
+
+            expected = cheapest_costs(environment)[-1, -1]
+            cost = lambda steps: sum(int(environment.costs.reshape(-1)[state]) for state, _ in steps)
+
+            for algorithm in (Solver.DIJKSTRA, Solver.A_STAR):
+                with self.subTest(trial=trial, algorithm=algorithm):
+                    path = Solver(environment).search_path(algorithm)
+                    steps = Solver(grid).search_path(algorithm)
+
+                    if np.isinf(expected):
+                        self.assertIsNone(path)
+                        self.assertIsNone(steps)
+                        continue
+
+                    self.assertEqual(cost(path), expected)
+                    self.assertEqual(sum(grid.costs.get(cell, 1) for cell, _ in steps), expected)
+
+    def test_invalid_costs(self):
+        grid = Grid(3, 3)
+
+        for cost in (0, -1, 1.5):
+            with self.subTest(cost=cost):
+                self.assertRaises(ValueError, grid.set_cost, (1, 1), cost)
+
+
+if __name__ == '__main__':
+    unittest.main()